@@ -0,0 +1,28 @@
+from typing import Any
+
+from fastapi.responses import Response
+from pydantic import BaseModel, TypeAdapter
+
+
+class PydanticJSONResponse(Response):
+    """JSON response serialized by pydantic-core straight to bytes.
+
+    Returning it from a route bypasses FastAPI's response_model handling
+    (re-validation, jsonable_encoder, json.dumps), so a model that was built
+    from our own rows is serialized exactly once. `exclude` is passed to the
+    serializer, e.g. to drop password hashes from nested customers.
+    """
+
+    media_type = "application/json"
+
+    def __init__(self, content: BaseModel | Any, exclude: Any = None, status_code: int = 200, headers=None):
+        self.exclude = exclude
+        super().__init__(content, status_code=status_code, headers=headers)
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content, exclude=self.exclude)
+        return _any.dump_json(content, exclude=self.exclude)
+
+
+_any = TypeAdapter(Any)
@@ -0,0 +1,127 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.responses import PydanticJSONResponse
+from crud import get_transfers_page, get_transports_page
+from customer.crud import get_customers_page
+from database import Customers, Hotels, Orders, TourCatalog
+from db_helper import db_helper
+from hotel.crud import get_hotels_page
+from order.crud import get_orders, order_to_schema, orders_report_query
+from pagination import PageParams, page_params
+from schemas import (
+    SCustomerPublic,
+    SHotels,
+    SOrders,
+    SOrdersFilter,
+    SPage,
+    STours,
+    STransfer,
+    STransport,
+)
+from tour.catalog import catalog_to_schema
+from tour.crud import get_tours_page
+from trusted import customer_public_schema, hotel_schema
+
+router = APIRouter(tags=["api"])
+
+# Password hashes never leave the API
+PAGE_CUSTOMER_EXCLUDE = {"items": {"__all__": {"password"}}}
+
+
+def _not_found(what: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{what} not found")
+
+
+@router.get("/tours", response_model=SPage[STours])
+async def api_tours(
+    page: PageParams = Depends(page_params),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
+):
+    return PydanticJSONResponse(await get_tours_page(page, session))
+
+
+@router.get("/tours/{tour_id}", response_model=STours)
+async def api_tour(
+    tour_id: int,
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
+):
+    row = await session.get(TourCatalog, tour_id)
+    if row is None:
+        raise _not_found("Tour")
+    return PydanticJSONResponse(catalog_to_schema(row))
+
+
+@router.get("/hotels", response_model=SPage[SHotels])
+async def api_hotels(
+    page: PageParams = Depends(page_params),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
+):
+    return PydanticJSONResponse(await get_hotels_page(page, session))
+
+
+@router.get("/hotels/{hotel_id}", response_model=SHotels)
+async def api_hotel(
+    hotel_id: int,
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
+):
+    hotel = await session.get(Hotels, hotel_id)
+    if hotel is None:
+        raise _not_found("Hotel")
+    return PydanticJSONResponse(hotel_schema(hotel))
+
+
+@router.get("/transports", response_model=SPage[STransport])
+async def api_transports(
+    page: PageParams = Depends(page_params),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
+):
+    return PydanticJSONResponse(await get_transports_page(page, session))
+
+
+@router.get("/transfers", response_model=SPage[STransfer])
+async def api_transfers(
+    page: PageParams = Depends(page_params),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
+):
+    return PydanticJSONResponse(await get_transfers_page(page, session))
+
+
+@router.get("/orders", response_model=SPage[SOrders])
+async def api_orders(orders_page: SPage[SOrders] = Depends(get_orders)):
+    """Orders with the same filters and cursors as /order/report/"""
+    return PydanticJSONResponse(orders_page)
+
+
+@router.get("/orders/{order_id}", response_model=SOrders)
+async def api_order(
+    order_id: int,
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
+):
+    stmt = orders_report_query(SOrdersFilter()).where(Orders.id == order_id)
+    order = (await session.execute(stmt)).unique().scalar_one_or_none()
+    if order is None:
+        raise _not_found("Order")
+    return PydanticJSONResponse(order_to_schema(order))
+
+
+@router.get("/customers", response_model=SPage[SCustomerPublic])
+async def api_customers(
+    page: PageParams = Depends(page_params),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
+):
+    return PydanticJSONResponse(
+        await get_customers_page(page, session), exclude=PAGE_CUSTOMER_EXCLUDE
+    )
+
+
+@router.get("/customers/{customer_id}", response_model=SCustomerPublic)
+async def api_customer(
+    customer_id: int,
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
+):
+    customer = await session.get(Customers, customer_id)
+    if customer is None:
+        raise _not_found("Customer")
+    return PydanticJSONResponse(customer_public_schema(customer))
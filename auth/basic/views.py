@@ -5,6 +5,8 @@ import uuid
 from fastapi import APIRouter, Cookie, Depends, HTTPException, status, Header,Response
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 
+from session_store import session_store
+
 router = APIRouter(tags=["demo-auth"])
 
 security = HTTPBasic()
@@ -64,31 +66,31 @@ def demo_header_auth(auth_usename: str = Depends(get_username_by_token)):
         "username": auth_usename,
     }
 
-COOKIES={}
 COOKIE_ID="web-app-session-id"
 
 def generate_session_id():
     return uuid.uuid4().hex
 
-def get_session_data(
+async def get_session_data(
         session_id:str=Cookie(alias=COOKIE_ID)
 ):
-    if session_id not in COOKIES:
+    session_data = await session_store.get(session_id)
+    if session_data is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="not authenticated"
         )
-    return COOKIES[session_id]
+    return session_data
 
 @router.post("/login-cookie/")
-def auth_by_cookie(response:Response,
+async def auth_by_cookie(response:Response,
     auth_username: str = Depends(get_auth_username)):
 
     session_id=generate_session_id()
-    COOKIES[session_id]={
+    await session_store.set(session_id, {
         "username":auth_username,
         "login_at":int(time())
-    }
+    })
     response.set_cookie(COOKIE_ID,session_id)
     return {
         "result": "OK",
@@ -101,4 +103,14 @@ def demo_check(
 ):
     return {
         **user_session
-    }
\ No newline at end of file
+    }
+
+@router.post("/logout-cookie/")
+async def logout_cookie(response:Response,
+    session_id:str|None=Cookie(default=None,alias=COOKIE_ID)):
+    if session_id:
+        await session_store.delete(session_id)
+    response.delete_cookie(COOKIE_ID)
+    return {
+        "result": "OK",
+    }
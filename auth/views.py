@@ -3,13 +3,14 @@ from fastapi.responses import RedirectResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from crud import add_customer, get_customer_by_email_password
+from customer_token import COOKIE_NAME as CUSTOMER_COOKIE, set_customer_cookie
 from db_helper import db_helper
 from database import Orders
-from starlette.templating import Jinja2Templates
+from templating import templates
 from schemas import SCustomersAdd, SOrders, SOrdersAdd, STours
 
 router = APIRouter(tags=["Auth"])
-templates = Jinja2Templates(directory="templates")
+
 
 @router.get("/login/")
 async def login_page(request: Request):
@@ -30,17 +31,11 @@ async def login_customer(
         customer = await get_customer_by_email_password(email, password, session)
 
         if customer:
-            # Set cookie with customer info
+            # Persist a password rehash done during verification
+            await session.commit()
+            # Signed token with the customer's id and display fields
             response = RedirectResponse(url="/customer-profile/", status_code=303)
-            response.set_cookie(
-                key="customer_id", value=str(customer["id"]), httponly=True
-            )
-            response.set_cookie(
-                key="customer_name", value=customer["name"], httponly=False
-            )
-            response.set_cookie(
-                key="customer_email", value=customer["email"], httponly=False
-            )
+            set_customer_cookie(response, customer)
             return response
         else:
             return templates.TemplateResponse(
@@ -65,9 +60,7 @@ async def login_customer(
 async def logout():
     """Logout customer and clear cookies"""
     response = RedirectResponse(url="/", status_code=303)
-    response.delete_cookie(key="customer_id")
-    response.delete_cookie(key="customer_name")
-    response.delete_cookie(key="customer_email")
+    response.delete_cookie(key=CUSTOMER_COOKIE)
     return response
 
 @router.get("/register/")
@@ -93,6 +86,7 @@ async def register_customer(
             password=form_data.get("password"),
         )
         await add_customer(customer_schema, session)
+        await session.commit()
 
         return templates.TemplateResponse(
             "registration.html",
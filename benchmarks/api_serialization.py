@@ -0,0 +1,135 @@
+"""JSON API serialization benchmark.
+
+Serves the same SPage[STours] (nested hotel, transfer and transport) three
+ways through FastAPI over ASGI and reports microseconds per request and per
+item:
+
+- response_model: return the model and let FastAPI validate, encode and dump it
+- JSONResponse: model_dump(mode="json") into the stock JSONResponse
+- PydanticJSONResponse: pydantic-core straight to bytes, as /api/v1 does
+
+    python -m benchmarks.api_serialization --items 50,200
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from api.responses import PydanticJSONResponse
+from schemas import SHotels, SPage, STours, STransfer, STransport
+
+
+def build_page(items: int) -> SPage[STours]:
+    tours = [
+        STours(
+            id=i,
+            name=f"Tour {i}",
+            description=f"Seven days in city {i % 97}",
+            hotels_id=i,
+            transfer_id=i,
+            transport_id=i,
+            hotel=SHotels(id=i, name=f"Hotel {i}", location=f"City {i % 97}", rating=4, price=120),
+            transfer=STransfer(id=i, type="bus", price=20),
+            transport=STransport(id=i, type="plane", company="Carrier", price=300),
+            total_cost=440,
+        )
+        for i in range(1, items + 1)
+    ]
+    return SPage(items=tours, next_cursor="eyJrIjpbNTBdLCJkIjoibmV4dCJ9", limit=items)
+
+
+def build_app(page: SPage[STours]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/response-model", response_model=SPage[STours])
+    async def response_model():
+        return page
+
+    @app.get("/json-response")
+    async def json_response():
+        return JSONResponse(page.model_dump(mode="json"))
+
+    @app.get("/pydantic")
+    async def pydantic_response():
+        return PydanticJSONResponse(page)
+
+    return app
+
+
+async def drive(app, path: str, requests: int) -> tuple[float, bytes]:
+    """Seconds per request for `requests` sequential GETs, and the last body"""
+    body = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.append(message["body"])
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "server": ("bench", 80),
+        "client": ("bench", 1234),
+    }
+    started = time.perf_counter()
+    for _ in range(requests):
+        body.clear()
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - started) / requests, b"".join(body)
+
+
+async def main(args) -> None:
+    results = {}
+    for items in [int(n) for n in args.items.split(",")]:
+        app = build_app(build_page(items))
+        paths = {
+            "response_model": "/response-model",
+            "JSONResponse": "/json-response",
+            "PydanticJSONResponse": "/pydantic",
+        }
+        bodies = {}
+        for name, path in paths.items():
+            _, bodies[name] = await drive(app, path, 20)
+        decoded = {name: json.loads(body) for name, body in bodies.items()}
+        assert all(value == decoded["response_model"] for value in decoded.values())
+
+        runs = {name: [] for name in paths}
+        for _ in range(args.rounds):
+            for name, path in paths.items():
+                runs[name].append((await drive(app, path, args.requests))[0])
+        # best round, as timeit does: noise only ever adds time
+        best = {name: min(times) * 1e6 for name, times in runs.items()}
+        baseline = best["response_model"]
+        results[items] = {
+            name: {
+                "us_per_request": round(us, 1),
+                "us_per_item": round(us / items, 2),
+                "speedup": round(baseline / us, 2),
+            }
+            for name, us in best.items()
+        }
+        results[items]["body_bytes"] = len(bodies["PydanticJSONResponse"])
+
+    print(json.dumps({"requests_per_round": args.requests, "rounds": args.rounds, "items": results}, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", default="50,200", help="comma separated page sizes")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
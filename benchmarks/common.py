@@ -0,0 +1,56 @@
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+
+import settings
+
+
+def configure(db_url: str) -> None:
+    """Point the app at `db_url` with SQL echo off; call before importing app modules"""
+    settings.MY_DATABASE_URL = db_url
+    settings.DB_REPLICA_URLS = []
+    settings.DB_ECHO = False
+
+
+def summarize(latencies: list[float], elapsed: float) -> dict:
+    """Request count, throughput and p50/p95/p99 latency in milliseconds"""
+    if not latencies:
+        return {"requests": 0}
+    cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(cuts[49] * 1000, 2),
+        "p95_ms": round(cuts[94] * 1000, 2),
+        "p99_ms": round(cuts[98] * 1000, 2),
+    }
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def environment() -> dict:
+    """Versions and revision a result was produced with"""
+    import fastapi
+    import sqlalchemy
+
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    return {
+        "git_revision": revision,
+        "python": platform.python_version(),
+        "fastapi": fastapi.__version__,
+        "sqlalchemy": sqlalchemy.__version__,
+        "platform": platform.platform(),
+    }
@@ -0,0 +1,45 @@
+"""Compare two benchmark suite result files.
+
+    python -m benchmarks.compare baseline.json candidate.json
+"""
+
+import argparse
+import json
+
+METRICS = ["rps", "p50_ms", "p95_ms", "p99_ms", "queries_per_request", "peak_rss_mb"]
+
+
+def change(old, new) -> str:
+    if old is None or new is None:
+        return "n/a"
+    if not old:
+        return f"{new}"
+    return f"{new} ({(new - old) / old * 100:+.1f}%)"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    print(
+        f"baseline  {baseline['environment']['git_revision']} {baseline['created_at']}\n"
+        f"candidate {candidate['environment']['git_revision']} {candidate['created_at']}"
+    )
+    if baseline["config"] != candidate["config"]:
+        print("warning: runs used different configurations")
+    for name, new in candidate["scenarios"].items():
+        old = baseline["scenarios"].get(name, {})
+        print(f"\n{name}")
+        for metric in METRICS:
+            print(f"  {metric:20} {old.get(metric)!s:>10} -> {change(old.get(metric), new.get(metric))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Login load benchmark.
+
+Fires POST /auth/login/ at a fixed rate while a few clients hammer other
+routes, and reports login latency and the other routes' throughput and
+latency, with and without the login load.
+
+    python -m benchmarks.login_load --rate 100 --duration 10
+    python -m benchmarks.login_load --workers 0   # hash on the event loop
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import settings
+from benchmarks.common import configure, summarize
+
+OTHER_ROUTES = ["/hotel/add/", "/customers/?limit=20"]
+PASSWORD = "benchmark-password"
+
+
+async def seed(users: int) -> None:
+    from database import Base, Customers
+    from db_helper import db_helper
+    from passwords import hash_password
+
+    async with db_helper.engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    hashed = await hash_password(PASSWORD)
+    async with db_helper.async_session() as session:
+        session.add_all(
+            Customers(
+                name="Bench", surname=str(i), status="new",
+                email=f"bench{i}@example.com", phone="0", password=hashed,
+            )
+            for i in range(users)
+        )
+        await session.commit()
+
+
+async def hammer(client, stop: asyncio.Event, latencies: list[float]) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = await client.get(random.choice(OTHER_ROUTES))
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+
+
+async def login(client, users: int, latencies: list[float], failures: list[int]) -> None:
+    started = time.perf_counter()
+    response = await client.post(
+        "/auth/login/",
+        data={"email": f"bench{random.randrange(users)}@example.com", "password": PASSWORD},
+    )
+    latencies.append(time.perf_counter() - started)
+    if response.status_code != 303:
+        failures.append(response.status_code)
+
+
+async def run_phase(client, args, with_logins: bool) -> dict:
+    stop = asyncio.Event()
+    other, logins, failures = [], [], []
+    clients = [asyncio.create_task(hammer(client, stop, other)) for _ in range(args.clients)]
+    in_flight = set()
+    started = time.perf_counter()
+    deadline = started + args.duration
+    next_login = started
+    while time.perf_counter() < deadline:
+        if with_logins:
+            while next_login <= time.perf_counter():
+                task = asyncio.create_task(login(client, args.users, logins, failures))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+                next_login += 1 / args.rate
+            await asyncio.sleep(max(0.0, min(next_login, deadline) - time.perf_counter()))
+        else:
+            await asyncio.sleep(deadline - time.perf_counter())
+    stop.set()
+    await asyncio.gather(*clients, *in_flight)
+    elapsed = time.perf_counter() - started
+    result = {"other_routes": summarize(other, elapsed)}
+    if with_logins:
+        result["logins"] = summarize(logins, elapsed)
+        result["login_failures"] = len(failures)
+    return result
+
+
+async def main(args) -> None:
+    import httpx
+
+    from db_helper import db_helper
+    from main import app
+
+    await seed(args.users)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        results = {
+            "config": {
+                "rate": args.rate,
+                "duration": args.duration,
+                "clients": args.clients,
+                "hash_workers": settings.PASSWORD_HASH_WORKERS,
+                "scrypt_n": settings.PASSWORD_SCRYPT_N,
+            },
+            "baseline": await run_phase(client, args, with_logins=False),
+            "under_login_load": await run_phase(client, args, with_logins=True),
+        }
+    await db_helper.engine.dispose()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db-url", default="sqlite+aiosqlite:///login_bench.db")
+    parser.add_argument("--rate", type=float, default=100, help="logins per second")
+    parser.add_argument("--duration", type=float, default=10, help="seconds per phase")
+    parser.add_argument("--clients", type=int, default=4, help="concurrent clients on other routes")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--workers", type=int, help="override PASSWORD_HASH_WORKERS")
+    args = parser.parse_args()
+
+    configure(args.db_url)
+    if args.workers is not None:
+        settings.PASSWORD_HASH_WORKERS = args.workers
+    asyncio.run(main(args))
@@ -0,0 +1,96 @@
+"""Metrics instrumentation overhead benchmark.
+
+Drives a trivial FastAPI route straight through ASGI with and without
+MetricsMiddleware and reports the per-request cost it adds, plus the
+cost of a single histogram observation.
+
+    python -m benchmarks.metrics_overhead --requests 20000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from fastapi import FastAPI
+
+from metrics import Histogram, MetricsMiddleware
+
+
+def build_app(instrumented: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def read_item(item_id: int):
+        return {"id": item_id}
+
+    if instrumented:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def drive(app, requests: int) -> float:
+    """Seconds per request for `requests` sequential GETs"""
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for i in range(requests):
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": f"/items/{i}",
+            "raw_path": f"/items/{i}".encode(),
+            "root_path": "",
+            "query_string": b"",
+            "headers": [],
+            "server": ("bench", 80),
+            "client": ("bench", 1234),
+        }
+        await app(scope, receive, send)
+    return (time.perf_counter() - started) / requests
+
+
+async def main(args) -> None:
+    plain, instrumented = build_app(False), build_app(True)
+    # warm up routing and middleware stacks
+    await drive(plain, 200)
+    await drive(instrumented, 200)
+
+    plain_runs, instrumented_runs = [], []
+    for _ in range(args.rounds):
+        plain_runs.append(await drive(plain, args.requests))
+        instrumented_runs.append(await drive(instrumented, args.requests))
+    # best round, as timeit does: noise only ever adds time
+    plain_us = min(plain_runs) * 1e6
+    instrumented_us = min(instrumented_runs) * 1e6
+
+    histogram = Histogram("bench_seconds", "benchmark", ("route",))
+    started = time.perf_counter()
+    for i in range(args.requests):
+        histogram.observe(i * 1e-5, "/items/{item_id}")
+    observe_ns = (time.perf_counter() - started) / args.requests * 1e9
+
+    print(json.dumps({
+        "requests_per_round": args.requests,
+        "rounds": args.rounds,
+        "plain_us_per_request": round(plain_us, 2),
+        "instrumented_us_per_request": round(instrumented_us, 2),
+        "overhead_us_per_request": round(instrumented_us - plain_us, 2),
+        "overhead_percent": round((instrumented_us / plain_us - 1) * 100, 2),
+        "histogram_observe_ns": round(observe_ns, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
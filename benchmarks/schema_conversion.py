@@ -0,0 +1,179 @@
+"""ORM-to-schema conversion benchmark.
+
+Loads `--rows` synthetic rows into an in-memory SQLite database and reports
+nanoseconds per row for fetching them (ORM objects vs column rows) and for
+turning them into schemas.py models: per-row `model_validate`, one batch
+`TypeAdapter(list[...])` validation, and the trusted builders in trusted.py.
+
+    python -m benchmarks.schema_conversion --rows 100000
+"""
+
+import argparse
+import gc
+import json
+import time
+from datetime import datetime
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from database import Base, Customers, Hotels, Managers, Orders, TourCatalog
+from order.crud import order_to_schema, orders_report_query
+from schemas import SCustomers, SHotels, SOrders, SOrdersFilter, STours, STransfer, STransport
+from tour.catalog import CATALOG_ROW, catalog_row_to_schema, catalog_to_schema
+from trusted import customer_schema, hotel_schema
+
+
+def validated_catalog_to_schema(row) -> STours:
+    """catalog_to_schema as it was, going through every model's validator"""
+    return STours(
+        id=row.id,
+        name=row.name,
+        description=row.description,
+        hotels_id=row.hotels_id,
+        transfer_id=row.transfer_id,
+        transport_id=row.transport_id,
+        hotel=SHotels(
+            id=row.hotels_id,
+            name=row.hotel_name,
+            location=row.hotel_location,
+            rating=row.hotel_rating,
+            price=row.hotel_price,
+            description=row.hotel_description,
+        ),
+        transfer=STransfer(id=row.transfer_id, type=row.transfer_type, price=row.transfer_price),
+        transport=STransport(
+            id=row.transport_id,
+            type=row.transport_type,
+            company=row.transport_company,
+            price=row.transport_price,
+            from_location=row.transport_from_location,
+            to_location=row.transport_to_location,
+            from_date=row.transport_from_date,
+            to_date=row.transport_to_date,
+        ),
+        total_cost=row.total_cost,
+    )
+
+
+def validated_order_to_schema(order: Orders) -> SOrders:
+    """order_to_schema as it was: validate, then patch the tour in"""
+    order_schema = SOrders.model_validate(order)
+    order_schema.tour = validated_catalog_to_schema(order.tour_catalog)
+    order_schema.total_amount = order_schema.tour.total_cost
+    return order_schema
+
+
+def load(engine, rows: int) -> None:
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Hotels), [
+            {"id": i, "name": f"Hotel {i}", "location": f"City {i % 97}", "rating": i % 5 + 1, "price": 100 + i % 400}
+            for i in range(1, rows + 1)
+        ])
+        conn.execute(insert(Customers), [
+            {"id": i, "name": "Ann", "surname": f"Smith{i}", "status": "new", "email": f"ann{i}@example.com",
+             "phone": "+100000000", "password": "scrypt$x"}
+            for i in range(1, rows + 1)
+        ])
+        conn.execute(insert(Managers), [
+            {"id": i, "name": "Bob", "surname": "Lee", "email": f"bob{i}@example.com", "phone": "+1"}
+            for i in range(1, 101)
+        ])
+        conn.execute(insert(TourCatalog), [
+            {"id": i, "name": f"Tour {i}", "description": "Seven days", "hotels_id": i, "has_hotel": True, "hotel_name": f"Hotel {i}",
+             "hotel_location": "City", "hotel_rating": 4, "hotel_price": 120, "transfer_id": i, "has_transfer": True,
+             "transfer_type": "bus", "transfer_price": 20, "transport_id": i, "has_transport": True, "transport_type": "plane",
+             "transport_company": "Carrier", "transport_price": 300, "total_cost": 440}
+            for i in range(1, rows + 1)
+        ])
+        conn.execute(insert(Orders), [
+            {"id": i, "order_date": datetime(2024, 1, i % 28 + 1), "customer_id": i, "tour_id": i,
+             "total_amount": 440, "payment_status": bool(i % 2), "manager_id": i % 100 + 1}
+            for i in range(1, rows + 1)
+        ])
+
+
+def best(fn, rounds: int) -> tuple[float, object]:
+    """Fastest of `rounds` runs in seconds, with the garbage collector off as timeit does"""
+    times, result = [], None
+    for _ in range(rounds):
+        gc.collect()
+        gc.disable()
+        started = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - started)
+        gc.enable()
+    return min(times), result
+
+
+def main(args) -> None:
+    engine = create_engine("sqlite://")
+    load(engine, args.rows)
+    results = {}
+
+    def measure(name: str, fetch_orm, fetch_rows, cases: dict) -> None:
+        def fetch(query):
+            # A new session each round so the identity map never answers for the database
+            with Session(engine) as session:
+                return query(session)
+
+        timings, sources = {}, {}
+        timings["fetch_orm_objects"], sources["orm"] = best(lambda: fetch(fetch_orm), args.rounds)
+        if fetch_rows is not None:
+            timings["fetch_column_rows"], sources["rows"] = best(lambda: fetch(fetch_rows), args.rounds)
+        outputs = {}
+        for case, (convert, source) in cases.items():
+            timings[case], outputs[case] = best(lambda: convert(sources[source]), args.rounds)
+        dumps = [items[len(items) // 2].model_dump() for items in outputs.values()]
+        assert all(dump == dumps[0] for dump in dumps), name
+        results[name] = {case: round(seconds / args.rows * 1e9) for case, seconds in timings.items()}
+
+    for name, schema, trusted, entity in [
+        ("hotels", SHotels, hotel_schema, Hotels),
+        ("customers", SCustomers, customer_schema, Customers),
+    ]:
+        adapter = TypeAdapter(list[schema])
+        measure(
+            name,
+            lambda s, entity=entity: s.execute(select(entity)).scalars().all(),
+            lambda s, trusted=trusted, entity=entity: s.execute(select(*trusted.columns(entity))).all(),
+            {
+                "model_validate_per_row": (lambda rows, schema=schema: [schema.model_validate(r) for r in rows], "orm"),
+                "type_adapter_batch": (lambda rows, adapter=adapter: adapter.validate_python(rows, from_attributes=True), "orm"),
+                "trusted_per_row_orm": (lambda rows, trusted=trusted: [trusted(r) for r in rows], "orm"),
+                "trusted_from_rows": (lambda rows, trusted=trusted: trusted.from_rows(rows), "rows"),
+            },
+        )
+
+    measure(
+        "tour_catalog",
+        lambda s: s.execute(select(TourCatalog)).scalars().all(),
+        lambda s: s.execute(select(*CATALOG_ROW)).all(),
+        {
+            "validated_constructors": (lambda rows: [validated_catalog_to_schema(r) for r in rows], "orm"),
+            "trusted_orm": (lambda rows: [catalog_to_schema(r) for r in rows], "orm"),
+            "trusted_rows": (lambda rows: [catalog_row_to_schema(r) for r in rows], "rows"),
+        },
+    )
+
+    report = orders_report_query(SOrdersFilter()).order_by(Orders.id)
+    measure(
+        "orders_report",
+        lambda s: s.execute(report).unique().scalars().all(),
+        None,
+        {
+            "validate_then_patch": (lambda rows: [validated_order_to_schema(r) for r in rows], "orm"),
+            "trusted": (lambda rows: order_to_schema.many(rows), "orm"),
+        },
+    )
+
+    print(json.dumps({"rows": args.rows, "rounds": args.rounds, "ns_per_row": results}, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=3)
+    main(parser.parse_args())
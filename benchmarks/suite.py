@@ -0,0 +1,170 @@
+"""Benchmark suite for the hot pages and CRUD paths.
+
+Seeds a deterministic dataset into a local database, drives the real app
+in-process through ASGI and writes throughput, latency percentiles,
+queries per request and peak RSS per scenario to a JSON file.
+
+    python -m benchmarks.suite --size small
+    python -m benchmarks.suite --size large --db-url mysql+aiomysql://root:pw@localhost/bench
+    python -m benchmarks.suite --skip-seed --scenarios tours_page,orders_page
+    python -m benchmarks.compare benchmarks/results/old.json benchmarks/results/new.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from datetime import UTC, datetime
+
+from benchmarks.common import configure, environment, peak_rss_mb, summarize
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+PASSWORD = "benchmark-password"
+
+
+class Scenario:
+    """One request shape; `build(rng)` returns (method, url, form data)"""
+
+    def __init__(self, name, build, expect_status=200, expect_text=None):
+        self.name = name
+        self.build = build
+        self.expect_status = expect_status
+        self.expect_text = expect_text
+
+
+def build_scenarios(sizes: dict, tours: list) -> dict[str, Scenario]:
+    from seeding import customer_email
+
+    def order_form(rng):
+        tour = rng.choice(tours)
+        return "POST", "/customer/", {
+            "selected_tour_id": tour.id,
+            "customer_id": rng.randint(1, sizes["customers"]),
+            "hotels_id": tour.hotels_id or "",
+            "transfer_id": tour.transfer_id or "",
+            "transport_id": tour.transport_id or "",
+        }
+
+    scenarios = [
+        Scenario("tours_page", lambda rng: ("GET", "/", None)),
+        Scenario(
+            "customer_page",
+            lambda rng: ("GET", f"/customer/?tour_id={rng.randint(1, sizes['tours'])}", None),
+        ),
+        Scenario("customer_order", order_form, expect_text="Order created successfully"),
+        Scenario("tour_detail", lambda rng: ("GET", f"/tour/{rng.randint(1, sizes['tours'])}", None)),
+        Scenario("orders_page", lambda rng: ("GET", "/order/", None)),
+        Scenario(
+            "login",
+            lambda rng: ("POST", "/auth/login/", {
+                "email": customer_email(rng.randint(1, sizes["customers"])),
+                "password": PASSWORD,
+            }),
+            expect_status=303,
+        ),
+    ]
+    return {scenario.name: scenario for scenario in scenarios}
+
+
+async def run_scenario(client, scenario: Scenario, requests: int, concurrency: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    latencies, queries, errors = [], [], []
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            method, url, data = scenario.build(rng)
+            started = time.perf_counter()
+            response = await client.request(method, url, data=data)
+            latencies.append(time.perf_counter() - started)
+            queries.append(int(response.headers.get("x-db-queries", 0)))
+            if response.status_code != scenario.expect_status or (
+                scenario.expect_text and scenario.expect_text not in response.text
+            ):
+                errors.append(response.status_code)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    return {
+        **summarize(latencies, elapsed),
+        "errors": len(errors),
+        "queries_per_request": round(sum(queries) / len(queries), 2) if queries else 0,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+async def main(args) -> None:
+    import httpx
+    from sqlalchemy import select
+
+    from database import Tours
+    from db_helper import db_helper
+    from main import app
+    from seeding import PRESETS, seed_database
+
+    sizes = PRESETS[args.size]
+    if not args.skip_seed:
+        started = time.perf_counter()
+        await seed_database(db_helper.engine, sizes, args.seed, reset=True, password=PASSWORD)
+        print(f"seeded {args.size} dataset in {time.perf_counter() - started:.1f}s")
+
+    async with db_helper.async_session() as session:
+        sample = await session.execute(select(Tours).order_by(Tours.id).limit(200))
+        tours = sample.scalars().all()
+    scenarios = build_scenarios(sizes, tours)
+    selected = args.scenarios.split(",") if args.scenarios else list(scenarios)
+
+    results = {
+        "created_at": datetime.now(UTC).isoformat(timespec="seconds"),
+        "environment": environment(),
+        "config": {
+            "size": args.size,
+            "sizes": sizes,
+            "dialect": db_helper.engine.dialect.name,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+        },
+        "scenarios": {},
+    }
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name in selected:
+            scenario = scenarios[name]
+            await run_scenario(client, scenario, args.warmup, args.concurrency, args.seed)
+            result = await run_scenario(
+                client, scenario, args.requests, args.concurrency, args.seed + 1
+            )
+            results["scenarios"][name] = result
+            print(f"{name:16} {json.dumps(result)}")
+    results["peak_rss_mb"] = peak_rss_mb()
+    await db_helper.dispose()
+
+    output = args.output or os.path.join(
+        RESULTS_DIR,
+        f"{datetime.now(UTC):%Y%m%dT%H%M%S}-{results['environment']['git_revision'] or 'local'}.json",
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db-url", default="sqlite+aiosqlite:///benchmark.db")
+    parser.add_argument("--size", choices=["small", "medium", "large"], default="small")
+    parser.add_argument("--skip-seed", action="store_true", help="reuse the data already in --db-url")
+    parser.add_argument("--scenarios", help="comma separated subset of scenarios to run")
+    parser.add_argument("--requests", type=int, default=500, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="result file (default: benchmarks/results/<time>-<rev>.json)")
+    args = parser.parse_args()
+
+    configure(args.db_url)
+    asyncio.run(main(args))
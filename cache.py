@@ -0,0 +1,169 @@
+import asyncio
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from data_version import DataVersionStore, data_versions, touch_on_commit
+from settings import (
+    REFERENCE_CACHE_MAX_ROWS,
+    REFERENCE_CACHE_MAXSIZE,
+    REFERENCE_CACHE_TTL,
+)
+
+INVALIDATE_KEY = "invalidate_cache"
+
+
+class TTLCache:
+    """Small in-process LRU cache whose entries expire after `ttl` seconds.
+
+    `get_or_load` runs one load per missing key at a time and does not
+    store a value whose key was invalidated while it was being loaded.
+    With `versions`, each key is also an entity of the data version store:
+    an entry is only served while the entity's version is the one read
+    before loading it, so writes committed by other workers are seen within
+    the store's TTL instead of this cache's.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        max_rows: int | None = None,
+        versions: DataVersionStore | None = None,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.versions = versions
+        # key -> (expires, data version, value)
+        self._data: OrderedDict[str, tuple[float, Any, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Bumped by invalidate(); a load only stores its value if neither moved
+        self._epoch = 0
+        self._generations: dict[str, int] = {}
+        # key -> (data version, future) of the load in progress
+        self._pending: dict[str, tuple[Any, asyncio.Future]] = {}
+
+    def get(self, key: str, version: Any = None) -> Any | None:
+        entry = self._data.get(key)
+        if entry is None or entry[0] < monotonic() or entry[1] != version:
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[2]
+
+    def set(self, key: str, value: Any, version: Any = None) -> None:
+        # Very large reference sets are not worth pinning in every worker
+        if self.max_rows is not None and len(value) > self.max_rows:
+            return
+        self._data[key] = (monotonic() + self.ttl, version, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, *keys: str) -> None:
+        """Drop the given keys, or everything if no keys are given"""
+        if not keys:
+            self._data.clear()
+            self._pending.clear()
+            self._epoch += 1
+        for key in keys:
+            self._data.pop(key, None)
+            self._pending.pop(key, None)
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    def _generation(self, key: str) -> tuple[int, int]:
+        return self._epoch, self._generations.get(key, 0)
+
+    async def _version(self, key: str) -> Any:
+        if self.versions is None:
+            return None
+        return (await self.versions.get(key))[key][0]
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[list]]) -> list:
+        # Read before loading: a write committed during the load leaves the
+        # stored version behind, and the next get loads again
+        version = await self._version(key)
+        while True:
+            value = self.get(key, version)
+            if value is not None:
+                return list(value)
+            version_pending = self._pending.get(key)
+            # A load that started before a newer version may have missed its write
+            if version_pending is None or version_pending[0] != version:
+                break
+            pending = version_pending[1]
+            try:
+                return list(await asyncio.shield(pending))
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The request loading it failed or went away; load it here instead
+
+        generation = self._generation(key)
+        pending = asyncio.get_running_loop().create_future()
+        self._pending[key] = (version, pending)
+        try:
+            value = await loader()
+        except BaseException:
+            pending.cancel()
+            raise
+        finally:
+            if self._pending.get(key, (None, None))[1] is pending:
+                del self._pending[key]
+        pending.set_result(value)
+        # A write committed during the load may have been missed by it
+        if self._generation(key) == generation:
+            self.set(key, value, version)
+        return list(value)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+reference_cache = TTLCache(
+    maxsize=REFERENCE_CACHE_MAXSIZE,
+    ttl=REFERENCE_CACHE_TTL,
+    max_rows=REFERENCE_CACHE_MAX_ROWS,
+    versions=data_versions,
+)
+
+
+def invalidate_on_commit(session, *keys: str) -> None:
+    """Invalidate reference cache keys now and again once `session` commits.
+
+    The second invalidation drops anything another request cached from the
+    old data between this write and its commit. The keys' data versions are
+    bumped by the commit as well.
+    """
+    reference_cache.invalidate(*keys)
+    touch_on_commit(session, *keys)
+    session.info.setdefault(INVALIDATE_KEY, set()).update(keys)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    keys = session.info.pop(INVALIDATE_KEY, None)
+    if keys:
+        reference_cache.invalidate(*keys)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(INVALIDATE_KEY, None)
@@ -0,0 +1,116 @@
+from datetime import UTC
+from email.utils import format_datetime, parsedate_to_datetime
+from hashlib import blake2b
+
+from starlette.datastructures import Headers
+from starlette.requests import cookie_parser
+from starlette.routing import compile_path
+
+from customer_token import COOKIE_NAME, verify_customer_token
+from data_version import data_versions
+from db_helper import primary_reads
+
+
+class ConditionalPage:
+    """A GET page whose output only depends on `entities` (and, if
+    `personal`, on the logged-in customer from the signed cookie)"""
+
+    def __init__(self, path: str, entities: tuple[str, ...], personal: bool = False):
+        self.path = path
+        self.regex = compile_path(path)[0]
+        self.entities = entities
+        self.personal = personal
+
+
+def _customer_fields(headers: Headers) -> str:
+    token = cookie_parser(headers.get("cookie", "")).get(COOKIE_NAME)
+    customer = verify_customer_token(token)
+    if customer is None:
+        return "anonymous"
+    return f"{customer.id}:{customer.name}:{customer.surname}:{customer.email}"
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # Weak comparison (RFC 9110 13.1.2): W/ prefixes are ignored
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def _not_modified_since(if_modified_since: str, last_modified) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since).replace(tzinfo=None)
+    except (TypeError, ValueError):
+        return False
+    return last_modified <= since
+
+
+class ConditionalGetMiddleware:
+    """Pure ASGI middleware adding ETag / Last-Modified to registered pages and
+    answering matching conditional GETs with 304 before routing, so neither
+    the database nor Jinja is touched.
+
+    The weak ETag hashes the path, query string, the pages' data versions and,
+    for personal pages, the customer's identity fields. Personal pages get no
+    Last-Modified since a date cannot tell two customers apart. Pages that
+    are rendered read from the primary, where the versions come from, so a
+    lagging replica cannot put old content under a new ETag.
+    """
+
+    def __init__(self, app, pages: list[ConditionalPage]):
+        self.app = app
+        self.pages = pages
+
+    def _match(self, path: str) -> ConditionalPage | None:
+        for page in self.pages:
+            if page.regex.match(path):
+                return page
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            return await self.app(scope, receive, send)
+        page = self._match(scope["path"])
+        if page is None:
+            return await self.app(scope, receive, send)
+
+        headers = Headers(scope=scope)
+        versions = await data_versions.get(*page.entities)
+        digest = blake2b(digest_size=12)
+        digest.update(scope["path"].encode())
+        digest.update(b"?" + scope["query_string"])
+        for entity in page.entities:
+            digest.update(f"|{entity}={versions[entity][0]}".encode())
+        if page.personal:
+            digest.update(_customer_fields(headers).encode())
+        etag = f'W/"{digest.hexdigest()}"'
+
+        response_headers = [
+            (b"etag", etag.encode()),
+            (b"cache-control", b"private, no-cache" if page.personal else b"no-cache"),
+        ]
+        if page.personal:
+            response_headers.append((b"vary", b"Cookie"))
+        else:
+            last_modified = max(updated for _, updated in versions.values())
+            http_date = format_datetime(last_modified.replace(tzinfo=UTC), usegmt=True)
+            response_headers.append((b"last-modified", http_date.encode()))
+
+        if_none_match = headers.get("if-none-match")
+        if if_none_match is not None:
+            not_modified = _etag_matches(if_none_match, etag)
+        elif not page.personal and headers.get("if-modified-since"):
+            not_modified = _not_modified_since(headers["if-modified-since"], last_modified)
+        else:
+            not_modified = False
+        if not_modified:
+            await send({"type": "http.response.start", "status": 304, "headers": response_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_validators(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                message["headers"] = [*message.get("headers", []), *response_headers]
+            await send(message)
+
+        with primary_reads():
+            await self.app(scope, receive, send_with_validators)
@@ -24,9 +24,19 @@ from schemas import (
     SOrders,
     SManagers,
     SManagersAdd,
+    SPage,
+    SImportReport,
 )
+from csv_import import import_csv
+from tour.catalog import refresh_tour_catalog
 from db_helper import db_helper
-from fastapi import Depends
+from pagination import PageParams, paginate
+from cache import reference_cache, invalidate_on_commit
+from dataloader import get_loader
+from trusted import customer_schema, transfer_schema, transport_schema
+from order.stats import order_rollup_keys, record_order_change, tour_price
+from passwords import hash_password, verify_password
+from fastapi import Depends, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
@@ -38,15 +48,45 @@ async def add_transport(
     new_transport = Transportations(**transport.model_dump())
     session.add(new_transport)
     await session.flush()
+    invalidate_on_commit(session, "transports")
     return new_transport
 
 
 async def get_transports(
     session: AsyncSession = Depends(db_helper.session_dependency),
 ) -> list[STransport]:
-    """Fetch all transportations"""
-    transports = await session.execute(select(Transportations))
-    return [STransport.model_validate(transport) for transport in transports.scalars().all()]
+    """Fetch all transportations, served from the reference cache when fresh"""
+
+    async def load():
+        transports = await session.execute(select(*transport_schema.columns(Transportations)))
+        return transport_schema.from_rows(transports)
+
+    return await reference_cache.get_or_load("transports", load)
+
+
+async def import_transports(upload: UploadFile, session: AsyncSession) -> SImportReport:
+    """Bulk insert/update transportations from a CSV upload, keeping tour_catalog in step"""
+
+    async def on_chunk(session: AsyncSession, ids: list[int]) -> None:
+        if ids:
+            await refresh_tour_catalog(session, Tours.transport_id.in_(ids))
+        invalidate_on_commit(session, "transports")
+
+    return await import_csv(upload, session, Transportations.__table__, STransportAdd, on_chunk)
+
+
+async def get_transports_page(
+    page: PageParams,
+    session: AsyncSession = Depends(db_helper.session_dependency),
+) -> SPage[STransport]:
+    """Fetch one page of transportations"""
+    return await paginate(
+        session,
+        select(*transport_schema.columns(Transportations)),
+        page,
+        Transportations.id,
+        to_schema=transport_schema.from_row,
+    )
 
 
 async def add_transfer(
@@ -57,30 +97,51 @@ async def add_transfer(
     new_transfer = Transfers(**transfer.model_dump())
     session.add(new_transfer)
     await session.flush()
+    invalidate_on_commit(session, "transfers")
     return new_transfer
 
 
 async def get_transfers(
     session: AsyncSession = Depends(db_helper.session_dependency),
 ) -> list[STransfer]:
-    """Fetch all transfers"""
-    transfers = await session.execute(select(Transfers))
-    return [STransfer.model_validate(transfer) for transfer in transfers.scalars().all()]
+    """Fetch all transfers, served from the reference cache when fresh"""
+
+    async def load():
+        transfers = await session.execute(select(*transfer_schema.columns(Transfers)))
+        return transfer_schema.from_rows(transfers)
+
+    return await reference_cache.get_or_load("transfers", load)
+
+
+async def get_transfers_page(
+    page: PageParams,
+    session: AsyncSession = Depends(db_helper.session_dependency),
+) -> SPage[STransfer]:
+    """Fetch one page of transfers"""
+    return await paginate(
+        session,
+        select(*transfer_schema.columns(Transfers)),
+        page,
+        Transfers.id,
+        to_schema=transfer_schema.from_row,
+    )
 
 async def get_transfers_by_id(
         transfer_id:int, 
         session:AsyncSession=Depends(db_helper.session_dependency),        
-)->STransfer:
-    transfer_by_id=await session.execute(select(Transfers).where(Transfers.id==transfer_id))
-    transfer_by_id=transfer_by_id.scalar_one_or_none()
-    return STransfer.model_validate(transfer_by_id)
+)->STransfer | None:
+    """Fetch a transfer by ID, batched with other lookups in the same request"""
+    loader = get_loader(session, Transfers, transfer_schema)
+    return await loader.load(transfer_id)
 
 async def add_customer(
     customer: SCustomersAdd,
     session: AsyncSession = Depends(db_helper.session_dependency),
 ) -> Customers:
-    """Add a new customer to the database"""
-    new_customer = Customers(**customer.model_dump())
+    """Add a new customer to the database, storing a hash of the password"""
+    data = customer.model_dump()
+    data["password"] = await hash_password(customer.password)
+    new_customer = Customers(**data)
     session.add(new_customer)
     await session.flush()
     await session.refresh(new_customer)
@@ -98,10 +159,13 @@ async def get_customers(
 async def add_order(
     order: SOrdersAdd, session: AsyncSession = Depends(db_helper.session_dependency)
 ) -> Orders:
-    """Add a new order to the database"""
+    """Add a new order to the database and count it in the revenue rollups"""
     new_order = Orders(**order.model_dump())
+    if new_order.total_amount is None:
+        new_order.total_amount = await tour_price(session, new_order.tour_id)
     session.add(new_order)
     await session.flush()
+    await record_order_change(session, None, order_rollup_keys(new_order))
     return new_order
 
 
@@ -124,6 +188,7 @@ async def update_order(
 
     if not order_obj:
         return None
+    old_keys = order_rollup_keys(order_obj)
 
     # Update fields
     order_obj.order_date = order.order_date
@@ -132,9 +197,12 @@ async def update_order(
     order_obj.total_amount = order.total_amount
     order_obj.payment_status = order.payment_status
     order_obj.manager_id = order.manager_id
+    if order_obj.total_amount is None:
+        order_obj.total_amount = await tour_price(session, order_obj.tour_id)
 
     session.add(order_obj)
     await session.flush()
+    await record_order_change(session, old_keys, order_rollup_keys(order_obj))
     return order_obj
 
 
@@ -143,24 +211,28 @@ async def get_customer_by_email_password(
     password: str,
     session: AsyncSession = Depends(db_helper.session_dependency),
 ) -> SCustomers | None:
-    """Fetch a customer by email and password for login verification"""
+    """Fetch a customer by email and password for login verification.
+
+    Plaintext or outdated hashes are replaced on a successful login; the
+    caller commits.
+    """
     customer = await session.execute(select(Customers).where(Customers.email == email))
     customer = customer.scalar_one_or_none()
 
-    if customer and customer.password == password:
-        return SCustomers.model_validate(customer)
-    return None
+    matches, needs_rehash = await verify_password(
+        password or "", customer.password if customer else None
+    )
+    if not matches:
+        return None
+    if needs_rehash:
+        customer.password = await hash_password(password)
+        await session.flush()
+    return customer_schema(customer)
 
 
 async def get_customer_by_id(
     customer_id: int, session: AsyncSession = Depends(db_helper.session_dependency)
 ) -> SCustomers | None:
-    """Fetch a customer by ID"""
-    customer = await session.execute(
-        select(Customers).where(Customers.id == customer_id)
-    )
-    customer = customer.scalar_one_or_none()
-
-    if customer:
-       return SCustomers.model_validate(customer)
-    return None
+    """Fetch a customer by ID, batched with other lookups in the same request"""
+    loader = get_loader(session, Customers, customer_schema)
+    return await loader.load(int(customer_id))
@@ -0,0 +1,166 @@
+import csv
+import io
+from itertools import islice
+from typing import Awaitable, Callable
+
+from fastapi import UploadFile
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from sqlalchemy import Table, insert, select
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from query_stats import batched_queries
+from schemas import SImportReport, SImportRowError
+from settings import CSV_IMPORT_BATCH_SIZE, CSV_IMPORT_MAX_ERRORS
+
+OnChunk = Callable[[AsyncSession, list[int]], Awaitable[None]]
+
+
+def _format_error(error: dict) -> str:
+    field = ".".join(str(part) for part in error["loc"][1:])
+    return f"{field}: {error['msg']}" if field else error["msg"]
+
+
+def upsert_statement(dialect_name: str, table: Table, rows: list[dict]):
+    """Multi-row INSERT that updates the existing row on an id conflict"""
+    columns = [column for column in rows[0] if column != "id"]
+    if dialect_name == "mysql":
+        stmt = mysql.insert(table).values(rows)
+        return stmt.on_duplicate_key_update({c: stmt.inserted[c] for c in columns})
+    stmt = sqlite.insert(table).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.id], set_={c: stmt.excluded[c] for c in columns}
+    )
+
+
+def _fail(report: SImportReport, row: int, errors: list[str]) -> None:
+    report.failed += 1
+    if len(report.errors) < CSV_IMPORT_MAX_ERRORS:
+        report.errors.append(SImportRowError(row=row, errors=errors))
+    else:
+        report.errors_truncated = True
+
+
+def _validate(adapter: TypeAdapter, batch: list[tuple[int, dict]], report: SImportReport) -> list[tuple[int, dict]]:
+    """Validate a batch in one call; returns (row number, values) for the rows that passed"""
+    records = [record for _, record in batch]
+    try:
+        models = adapter.validate_python(records)
+    except ValidationError as e:
+        failures: dict[int, list[str]] = {}
+        for error in e.errors():
+            failures.setdefault(error["loc"][0], []).append(_format_error(error))
+        for index in sorted(failures):
+            _fail(report, batch[index][0], failures[index])
+        batch = [item for index, item in enumerate(batch) if index not in failures]
+        models = adapter.validate_python([record for _, record in batch])
+
+    valid = []
+    for (line, record), model in zip(batch, models):
+        values = model.model_dump()
+        if record.get("id") is not None:
+            try:
+                values["id"] = int(record["id"])
+            except ValueError:
+                _fail(report, line, ["id: Input should be a valid integer"])
+                continue
+        valid.append((line, values))
+    return valid
+
+
+def _dedupe(rows: list[tuple[int, dict]], report: SImportReport) -> list[tuple[int, dict]]:
+    """Keep the last row for each id; earlier rows with the same id count as superseded"""
+    last = {values["id"]: line for line, values in rows if "id" in values}
+    kept = [(line, values) for line, values in rows if "id" not in values or last[values["id"]] == line]
+    report.superseded += len(rows) - len(kept)
+    return kept
+
+
+async def _write_rows(
+    session: AsyncSession, table: Table, rows: list[tuple[int, dict]], on_chunk: OnChunk | None
+) -> int:
+    """Insert or upsert `rows` in one transaction; returns how many ids already existed"""
+    with_id = [values for _, values in rows if "id" in values]
+    without_id = [values for _, values in rows if "id" not in values]
+    ids = [values["id"] for values in with_id]
+    existing = 0
+    if with_id:
+        found = await session.execute(select(table.c.id).where(table.c.id.in_(ids)))
+        existing = len(found.all())
+        await session.execute(upsert_statement(session.get_bind().dialect.name, table, with_id))
+    if without_id:
+        await session.execute(insert(table).values(without_id))
+    if on_chunk:
+        await on_chunk(session, ids)
+    await session.commit()
+    return existing
+
+
+async def _write_chunk(
+    session: AsyncSession, table: Table, rows: list[tuple[int, dict]], report: SImportReport, on_chunk: OnChunk | None
+) -> None:
+    """Write one chunk of valid rows in its own transaction.
+
+    If the database rejects the chunk, its rows are retried one per
+    transaction so the error is reported against the rows that caused it.
+    """
+    rows = _dedupe(rows, report)
+    try:
+        existing = await _write_rows(session, table, rows, on_chunk)
+    except DBAPIError as e:
+        await session.rollback()
+        if len(rows) == 1:
+            _fail(report, rows[0][0], [f"database: {e.orig}"])
+        else:
+            for row in rows:
+                await _write_chunk(session, table, [row], report, on_chunk)
+        return
+    report.updated += existing
+    report.inserted += len(rows) - existing
+
+
+async def import_csv(
+    upload: UploadFile,
+    session: AsyncSession,
+    table: Table,
+    schema: type[BaseModel],
+    on_chunk: OnChunk | None = None,
+) -> SImportReport:
+    """Stream `upload` into `table`, CSV_IMPORT_BATCH_SIZE rows at a time.
+
+    The header names the `schema` fields; an optional `id` column makes a
+    row update the existing record instead of adding one. Rows are read
+    incrementally from the spooled upload, validated per batch and written
+    with one multi-row statement per batch, committed chunk by chunk, so a
+    failed chunk does not undo the ones before it; its rows are retried one
+    by one to find the ones the database rejects. Within a chunk the last
+    row for an id wins and earlier ones are counted as superseded.
+    `on_chunk(session, ids)` runs inside each chunk's transaction with the
+    ids that were upserted (empty when the chunk only added rows).
+    Rows are numbered by their line in the file.
+    """
+    adapter = TypeAdapter(list[schema])
+    report = SImportReport()
+    text = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+
+    def read_batch() -> list[tuple[int, dict]]:
+        return [
+            (reader.line_num, {key.strip(): value or None for key, value in row.items() if key})
+            for row in islice(reader, CSV_IMPORT_BATCH_SIZE)
+        ]
+
+    try:
+        with batched_queries():
+            while batch := await run_in_threadpool(read_batch):
+                report.rows += len(batch)
+                valid = _validate(adapter, batch, report)
+                if valid:
+                    await _write_chunk(session, table, valid, report, on_chunk)
+    except (UnicodeDecodeError, csv.Error) as e:
+        _fail(report, reader.line_num, [f"file: {e}"])
+    finally:
+        text.detach()
+    return report
@@ -3,26 +3,35 @@ from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from database import Customers
-from schemas import SCustomers
+from schemas import SCustomers, SPage
+from pagination import PageParams, paginate
+from dataloader import get_loader
+from trusted import customer_schema
 
 
 async def get_customers(
     session: AsyncSession = Depends(db_helper.session_dependency)
 ) -> list[SCustomers]:
     """Fetch all customers from the database"""
-    customers = await session.execute(select(Customers))
-    customers = customers.scalars().all()
-    return [SCustomers.model_validate(customer) for customer in customers]
+    customers = await session.execute(select(*customer_schema.columns(Customers)))
+    return customer_schema.from_rows(customers)
+
+async def get_customers_page(
+    page: PageParams,
+    session: AsyncSession = Depends(db_helper.session_dependency),
+) -> SPage[SCustomers]:
+    """Fetch one page of customers"""
+    return await paginate(
+        session,
+        select(*customer_schema.columns(Customers)),
+        page,
+        Customers.id,
+        to_schema=customer_schema.from_row,
+    )
 
 async def get_customer_by_id(
     customer_id: int, session: AsyncSession = Depends(db_helper.session_dependency)
 ) -> SCustomers | None:
-    """Fetch a customer by ID"""
-    customer = await session.execute(
-        select(Customers).where(Customers.id == customer_id)
-    )
-    customer = customer.scalar_one_or_none()
-
-    if customer:
-       return SCustomers.model_validate(customer)
-    return None
\ No newline at end of file
+    """Fetch a customer by ID, batched with other lookups in the same request"""
+    loader = get_loader(session, Customers, customer_schema)
+    return await loader.load(int(customer_id))
\ No newline at end of file
@@ -0,0 +1,87 @@
+import base64
+import binascii
+import hmac
+import json
+from time import time
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from schemas import SCustomerIdentity
+from settings import CUSTOMER_TOKEN_KEY_ID, CUSTOMER_TOKEN_KEYS, CUSTOMER_TOKEN_TTL
+
+COOKIE_NAME = "customer_token"
+
+_KEYS = {kid: secret.encode() for kid, secret in CUSTOMER_TOKEN_KEYS.items()}
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _signature(key: bytes, signed_part: str) -> str:
+    return _b64encode(hmac.digest(key, signed_part.encode(), "sha256"))
+
+
+def sign_customer_token(customer, ttl: int = CUSTOMER_TOKEN_TTL) -> str:
+    """Compact `<key id>.<payload>.<hmac>` token for a logged-in customer"""
+    payload = {
+        "id": customer.id,
+        "n": customer.name,
+        "s": customer.surname,
+        "e": customer.email,
+        "exp": int(time()) + ttl,
+    }
+    body = _b64encode(json.dumps(payload, separators=(",", ":")).encode())
+    signed_part = f"{CUSTOMER_TOKEN_KEY_ID}.{body}"
+    return f"{signed_part}.{_signature(_KEYS[CUSTOMER_TOKEN_KEY_ID], signed_part)}"
+
+
+def verify_customer_token(token: str | None) -> SCustomerIdentity | None:
+    """Identity carried by a valid, unexpired token, otherwise None.
+
+    Any key still listed in CUSTOMER_TOKEN_KEYS is accepted, so a new key
+    can be made current while tokens signed with the old one keep working
+    until they expire or the old key is removed.
+    """
+    if not token:
+        return None
+    try:
+        kid, body, signature = token.split(".")
+    except ValueError:
+        return None
+    key = _KEYS.get(kid)
+    if key is None:
+        return None
+    # Compared as bytes: compare_digest raises on non-ASCII str, which a tampered cookie may hold
+    expected = _signature(key, f"{kid}.{body}")
+    if not hmac.compare_digest(signature.encode(), expected.encode()):
+        return None
+    try:
+        payload = json.loads(_b64decode(body))
+    except (binascii.Error, ValueError):
+        return None
+    if payload.get("exp", 0) < time():
+        return None
+    return SCustomerIdentity(
+        id=payload["id"], name=payload["n"], surname=payload["s"], email=payload["e"]
+    )
+
+
+def set_customer_cookie(response: Response, customer) -> None:
+    response.set_cookie(
+        key=COOKIE_NAME,
+        value=sign_customer_token(customer),
+        max_age=CUSTOMER_TOKEN_TTL,
+        httponly=True,
+        samesite="lax",
+    )
+
+
+async def current_customer(request: Request) -> SCustomerIdentity | None:
+    """Dependency: the logged-in customer from the signed cookie, without a database query"""
+    return verify_customer_token(request.cookies.get(COOKIE_NAME))
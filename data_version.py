@@ -0,0 +1,99 @@
+import asyncio
+from datetime import UTC, datetime
+from time import monotonic
+
+from sqlalchemy import event, select
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from database import DataVersions
+from settings import DATA_VERSION_TTL
+
+CHANGED_KEY = "changed_entities"
+BUMPED_KEY = "data_versions_bumped"
+EPOCH = datetime(1970, 1, 1)
+
+
+class DataVersionStore:
+    """Per-entity change counters from the data_versions table.
+
+    Each worker keeps a copy for `ttl` seconds, so checking a version costs
+    no query; its own commits expire the copy at once, writes from other
+    workers are seen within `ttl`.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._versions: dict[str, tuple[int, datetime]] = {}
+        self._expires = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get(self, *entities: str) -> dict[str, tuple[int, datetime]]:
+        """(version, updated_at) of each entity; (0, EPOCH) for one never written"""
+        if monotonic() >= self._expires:
+            async with self._lock:
+                if monotonic() >= self._expires:
+                    await self._load()
+        return {entity: self._versions.get(entity, (0, EPOCH)) for entity in entities}
+
+    async def _load(self) -> None:
+        from db_helper import db_helper
+
+        async with db_helper.engine.connect() as conn:
+            rows = await conn.execute(
+                select(DataVersions.entity, DataVersions.version, DataVersions.updated_at)
+            )
+            self._versions = {entity: (version, updated) for entity, version, updated in rows}
+        self._expires = monotonic() + self.ttl
+
+    def expire(self) -> None:
+        self._expires = 0.0
+
+
+data_versions = DataVersionStore(DATA_VERSION_TTL)
+
+
+def touch_on_commit(session, *entities: str) -> None:
+    """Bump the version of `entities` in the same transaction as the write"""
+    session.info.setdefault(CHANGED_KEY, set()).update(entities)
+
+
+def _upsert_bump(dialect: str):
+    """INSERT of version 1 that increments the existing counter instead, so
+    two transactions writing an entity for the first time cannot collide"""
+    table = DataVersions.__table__
+    if dialect == "mysql":
+        stmt = mysql.insert(table)
+        return stmt.on_duplicate_key_update(
+            version=table.c.version + 1, updated_at=stmt.inserted.updated_at
+        )
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    stmt = insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=["entity"],
+        set_={"version": table.c.version + 1, "updated_at": stmt.excluded.updated_at},
+    )
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_versions(session: Session) -> None:
+    entities = session.info.pop(CHANGED_KEY, None)
+    if not entities:
+        return
+    # Whole seconds, the resolution of Last-Modified
+    now = datetime.now(UTC).replace(tzinfo=None, microsecond=0)
+    rows = [{"entity": entity, "version": 1, "updated_at": now} for entity in sorted(entities)]
+    session.execute(_upsert_bump(session.get_bind().dialect.name).values(rows))
+    session.info[BUMPED_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _expire_versions(session: Session) -> None:
+    if session.info.pop(BUMPED_KEY, False):
+        data_versions.expire()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session: Session) -> None:
+    session.info.pop(CHANGED_KEY, None)
+    session.info.pop(BUMPED_KEY, None)
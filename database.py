@@ -1,9 +1,42 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    Text,
+    ForeignKey,
+    Date,
+    DateTime,
+    Boolean,
+    Index,
+    TypeDecorator,
+    UniqueConstraint,
+    false,
+)
 from sqlalchemy.orm import DeclarativeBase, relationship, Mapped, mapped_column
 from typing import Optional, List
 from datetime import datetime
 
 
+class LenientDateTime(TypeDecorator):
+    """DATETIME that also reads the ISO strings these columns held before
+    migration 3, so the app runs while the conversion is in progress"""
+
+    impl = DateTime
+    cache_ok = True
+
+    def result_processor(self, dialect, coltype):
+        def process(value):
+            if not isinstance(value, str):
+                return value
+            try:
+                return datetime.fromisoformat(value.strip()) if value.strip() else None
+            except ValueError:
+                # Shown as missing; migration 3 stops and lists these rows
+                return None
+
+        return process
+
+
 class Base(DeclarativeBase):
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
 
@@ -21,6 +54,10 @@ class Tours(Base):
         Integer, ForeignKey("transportations.id")
     )
 
+    hotel: Mapped[Optional["Hotels"]] = relationship()
+    transfer: Mapped[Optional["Transfers"]] = relationship()
+    transport: Mapped[Optional["Transportations"]] = relationship()
+
     def __repr__(self):
         return f"(id={self.id}, name={self.name}, description={self.description}, transfer_id={self.transfer_id}, hotels_id={self.hotels_id}, transport_id={self.transport_id})"
 
@@ -31,7 +68,7 @@ class Customers(Base):
     name = Column(String(255))
     surname = Column(String(255))
     status = Column(String(50))
-    email = Column(String(255))
+    email = Column(String(255), unique=True, index=True)
     phone = Column(String(20))
     order_id = Column(Integer, ForeignKey("orders.id"))
     password: Mapped[str]
@@ -42,8 +79,14 @@ class Customers(Base):
 
 class Orders(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        Index("ix_orders_customer_id_order_date", "customer_id", "order_date"),
+        Index("ix_orders_manager_id_order_date", "manager_id", "order_date"),
+        Index("ix_orders_tour_id", "tour_id"),
+        Index("ix_orders_order_date", "order_date"),
+    )
 
-    order_date = Column(String(50))
+    order_date = Column(LenientDateTime)
     customer_id = Column(Integer, ForeignKey("customers.id"))
     tour_id = Column(Integer, ForeignKey("tours.id"))
     total_amount = Column(Integer)
@@ -52,6 +95,14 @@ class Orders(Base):
         Integer, ForeignKey("managers.id")
     )
 
+    customer: Mapped[Optional["Customers"]] = relationship(
+        foreign_keys="Orders.customer_id"
+    )
+    manager: Mapped[Optional["Managers"]] = relationship()
+    tour_catalog: Mapped[Optional["TourCatalog"]] = relationship(
+        primaryjoin="foreign(Orders.tour_id) == TourCatalog.id", viewonly=True
+    )
+
     def __repr__(self):
         return f"(id={self.id}, order_date={self.order_date}, customer_id={self.customer_id}, tour_id={self.tour_id}, total_amount={self.total_amount}, payment_status={self.payment_status}, manager_id={self.manager_id})"
 
@@ -89,8 +140,8 @@ class Transportations(Base):
     price = Column(Integer)
     from_location = Column(String(255))
     to_location = Column(String(255))
-    from_date = Column(String(50))
-    to_date = Column(String(50))
+    from_date = Column(LenientDateTime)
+    to_date = Column(LenientDateTime)
 
     def __repr__(self):
         return f"(id={self.id}, type={self.type}, company={self.company}, price={self.price})"
@@ -104,3 +155,145 @@ class Transfers(Base):
 
     def __repr__(self):
         return f"(id={self.id}, type={self.type}, company={self.company}, price={self.price})"
+
+
+class TourCatalog(Base):
+    """Denormalized read model of Tours joined with its hotel, transfer and transport.
+
+    Rows are kept in sync by tour.catalog on every write that changes an
+    input; `python -m tour.catalog` rebuilds the whole table.
+    """
+
+    __tablename__ = "tour_catalog"
+
+    name = Column(String(255), nullable=False)
+    description = Column(String(1000))
+    hotels_id = Column(Integer)
+    # Whether the joined row exists; its own columns may all be NULL
+    has_hotel = Column(Boolean, nullable=False, default=False, server_default=false())
+    hotel_name = Column(String(255))
+    hotel_location = Column(String(255))
+    hotel_rating = Column(Integer)
+    hotel_price = Column(Integer)
+    hotel_description = Column(String(1000))
+    transfer_id = Column(Integer)
+    has_transfer = Column(Boolean, nullable=False, default=False, server_default=false())
+    transfer_type = Column(String(50))
+    transfer_price = Column(Integer)
+    transport_id = Column(Integer)
+    has_transport = Column(Boolean, nullable=False, default=False, server_default=false())
+    transport_type = Column(String(50))
+    transport_company = Column(String(255))
+    transport_price = Column(Integer)
+    transport_from_location = Column(String(255))
+    transport_to_location = Column(String(255))
+    transport_from_date = Column(LenientDateTime)
+    transport_to_date = Column(LenientDateTime)
+    total_cost = Column(Integer, nullable=False, default=0, index=True)
+
+    def __repr__(self):
+        return f"(id={self.id}, name={self.name}, total_cost={self.total_cost})"
+
+
+class RevenueDailyTour(Base):
+    """Orders count and revenue per day and tour, maintained by order.stats"""
+
+    __tablename__ = "revenue_daily_tour"
+    __table_args__ = (UniqueConstraint("day", "tour_id"),)
+
+    day = Column(Date, nullable=False)
+    tour_id = Column(Integer, nullable=False)
+    orders_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Integer, nullable=False, default=0)
+
+
+class RevenueDailyManager(Base):
+    """Orders count and revenue per day and manager (0 = no manager)"""
+
+    __tablename__ = "revenue_daily_manager"
+    __table_args__ = (UniqueConstraint("day", "manager_id"),)
+
+    day = Column(Date, nullable=False)
+    manager_id = Column(Integer, nullable=False)
+    orders_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Integer, nullable=False, default=0)
+
+
+class RevenueDailyPayment(Base):
+    """Orders count and revenue per day and payment status"""
+
+    __tablename__ = "revenue_daily_payment"
+    __table_args__ = (UniqueConstraint("day", "payment_status"),)
+
+    day = Column(Date, nullable=False)
+    payment_status = Column(Boolean, nullable=False)
+    orders_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Integer, nullable=False, default=0)
+
+
+class RevenueDailyTourRebuild(Base):
+    """Staging copy of revenue_daily_tour filled by order.stats.backfill_rollups"""
+
+    __tablename__ = "revenue_daily_tour_rebuild"
+    __table_args__ = (UniqueConstraint("day", "tour_id"),)
+
+    day = Column(Date, nullable=False)
+    tour_id = Column(Integer, nullable=False)
+    orders_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Integer, nullable=False, default=0)
+
+
+class RevenueDailyManagerRebuild(Base):
+    """Staging copy of revenue_daily_manager"""
+
+    __tablename__ = "revenue_daily_manager_rebuild"
+    __table_args__ = (UniqueConstraint("day", "manager_id"),)
+
+    day = Column(Date, nullable=False)
+    manager_id = Column(Integer, nullable=False)
+    orders_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Integer, nullable=False, default=0)
+
+
+class RevenueDailyPaymentRebuild(Base):
+    """Staging copy of revenue_daily_payment"""
+
+    __tablename__ = "revenue_daily_payment_rebuild"
+    __table_args__ = (UniqueConstraint("day", "payment_status"),)
+
+    day = Column(Date, nullable=False)
+    payment_status = Column(Boolean, nullable=False)
+    orders_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Integer, nullable=False, default=0)
+
+
+class RollupRebuild(Base):
+    """Progress of a running rollup rebuild; no row when none runs.
+
+    `scanned_upto` is the last order id counted into the staging tables,
+    NULL once every order is.
+    """
+
+    __tablename__ = "rollup_rebuild"
+
+    scanned_upto = Column(Integer)
+
+
+class WebSessions(Base):
+    """Server-side sessions shared by all workers, see session_store.DatabaseSessionStore"""
+
+    __tablename__ = "web_sessions"
+
+    session_id = Column(String(64), nullable=False, unique=True)
+    data = Column(Text, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class DataVersions(Base):
+    """Change counter per entity ("tours", "hotels", ...) for conditional GETs, see data_version.py"""
+
+    __tablename__ = "data_versions"
+
+    entity = Column(String(50), nullable=False, unique=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False)
@@ -0,0 +1,130 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Hashable, Iterable
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import async_scoped_session
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+LOADERS_KEY = "loaders"
+LOADERS_LOCK_KEY = "loaders_lock"
+
+BatchLoadFn = Callable[[list[Hashable]], Awaitable[dict[Hashable, Any]]]
+
+
+class DataLoader:
+    """Coalesce `load(key)` calls made in the same event-loop tick into one batch.
+
+    Every key is fetched at most once per loader; later calls for the same
+    key return the memoized result (None if the row does not exist).
+    """
+
+    def __init__(self, batch_load: BatchLoadFn):
+        self.batch_load = batch_load
+        self._futures: dict[Hashable, asyncio.Future] = {}
+        self._queue: list[Hashable] = []
+        # Running batches; the loop only keeps weak references to tasks
+        self._tasks: set[asyncio.Task] = set()
+
+    def load(self, key: Hashable) -> asyncio.Future:
+        future = self._futures.get(key)
+        if future is not None:
+            return future
+        loop = asyncio.get_running_loop()
+        future = self._futures[key] = loop.create_future()
+        self._queue.append(key)
+        if len(self._queue) == 1:
+            # Give the other coroutines of this tick a chance to queue their keys
+            loop.call_soon(self._dispatch)
+        return future
+
+    async def load_many(self, keys: Iterable[Hashable]) -> list[Any]:
+        return await asyncio.gather(*[self.load(key) for key in keys])
+
+    def clear(self) -> None:
+        """Forget memoized results, e.g. after the underlying rows changed"""
+        self._futures = {key: f for key, f in self._futures.items() if not f.done()}
+
+    async def close(self) -> None:
+        """Wait for the running batches and drop queued keys, before the session closes"""
+        for key in self._queue:
+            self._futures.pop(key).cancel()
+        self._queue = []
+        # Finished tasks may still be waiting for _task_done; only wait on the rest
+        pending = [task for task in self._tasks if not task.done()]
+        if pending:
+            await asyncio.wait(pending)
+
+    def _dispatch(self) -> None:
+        if not self._queue:
+            return
+        keys, self._queue = self._queue, []
+        futures = [self._futures[key] for key in keys]
+        task = asyncio.ensure_future(self._run(keys, futures))
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+
+    def _task_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("DataLoader batch failed", exc_info=task.exception())
+
+    async def _run(self, keys: list[Hashable], futures: list[asyncio.Future]) -> None:
+        try:
+            results = await self.batch_load(keys)
+        except Exception as e:
+            for key, future in zip(keys, futures):
+                self._futures.pop(key, None)
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key, future in zip(keys, futures):
+            if not future.done():
+                future.set_result(results.get(key))
+
+
+def attach_loaders(session) -> None:
+    """Give `session` a fresh, empty set of loaders for the current request"""
+    session.info[LOADERS_KEY] = {}
+    session.info[LOADERS_LOCK_KEY] = asyncio.Lock()
+
+
+async def close_loaders(session) -> None:
+    """Let the batches still running on `session` finish; call before closing it"""
+    for loader in list(session.info.get(LOADERS_KEY, {}).values()):
+        await loader.close()
+
+
+def get_loader(session, model, to_schema=None, options=()) -> DataLoader:
+    """Return the by-id loader for `model` bound to `session`, creating it on first use.
+
+    Batches for different models share a lock because an AsyncSession
+    cannot run two statements at once.
+    """
+    if isinstance(session, async_scoped_session):
+        # Batches run in their own task, where the task-scoped proxy would
+        # resolve to a different session; bind to the caller's session instead
+        session = session()
+    loaders = session.info.setdefault(LOADERS_KEY, {})
+    loader = loaders.get(model)
+    if loader is None:
+        lock = session.info.setdefault(LOADERS_LOCK_KEY, asyncio.Lock())
+
+        async def batch_load(ids: list[Hashable]) -> dict[Hashable, Any]:
+            stmt = select(model).options(*options).where(model.id.in_(ids))
+            async with lock:
+                rows = await session.execute(stmt)
+            rows = rows.unique().scalars().all()
+            return {row.id: to_schema(row) if to_schema else row for row in rows}
+
+        loader = loaders[model] = DataLoader(batch_load)
+    return loader
+
+
+@event.listens_for(Session, "after_flush")
+@event.listens_for(Session, "after_rollback")
+def _clear_loaders(session: Session, *args) -> None:
+    for loader in session.info.get(LOADERS_KEY, {}).values():
+        loader.clear()
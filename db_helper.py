@@ -1,34 +1,248 @@
+import itertools
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from time import monotonic, time
+
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     async_sessionmaker,
     async_scoped_session,
     AsyncSession,
 )
-from settings import MY_DATABASE_URL, DB_ECHO
+from sqlalchemy.orm import Session
+from settings import (
+    MY_DATABASE_URL,
+    DB_ECHO,
+    DB_READ_ROUTING,
+    DB_REPLICA_RETRY_SECONDS,
+    DB_REPLICA_URLS,
+    DB_STICKY_SECONDS,
+)
 from asyncio import current_task
+from dataloader import attach_loaders, close_loaders
+from metrics import engine_pool_options, instrument_engine
+
+READ_ONLY_KEY = "read_only"
+WROTE_KEY = "wrote"
+STICKY_COOKIE = "db-primary-until"
+
+
+@dataclass
+class ReadState:
+    """Per-request routing state; reads go to the primary until `primary_until`"""
+
+    primary_until: float = 0.0
+    wrote: bool = False
+
+
+_read_state: ContextVar[ReadState | None] = ContextVar("read_state", default=None)
+_primary_reads: ContextVar[bool] = ContextVar("primary_reads", default=False)
+
+
+def reads_pinned_to_primary() -> bool:
+    if _primary_reads.get():
+        return True
+    state = _read_state.get()
+    return state is not None and state.primary_until > time()
+
+
+@contextmanager
+def primary_reads():
+    """Send every read inside the block to the primary.
+
+    Pages validated or cached by data version render under it: the versions
+    come from the primary, and a lagging replica could otherwise produce a
+    body older than the ETag or cache key it is stored under.
+    """
+    token = _primary_reads.set(True)
+    try:
+        yield
+    finally:
+        _primary_reads.reset(token)
+
+
+def pin_reads_to_primary() -> None:
+    """Send this request's (and, via a cookie, this client's) reads to the primary
+    for DB_STICKY_SECONDS so they see the write that was just committed"""
+    state = _read_state.get()
+    if state is None:
+        state = ReadState()
+        _read_state.set(state)
+    state.primary_until = time() + DB_STICKY_SECONDS
+    state.wrote = True
+
+
+def _make_sessionmaker(engine):
+    return async_sessionmaker(
+        engine, autoflush=False, autocommit=False, expire_on_commit=False
+    )
+
+
+class Replica:
+    """Read-only engine with its health and the number of sessions in use"""
+
+    def __init__(self, url: str, name: str = "replica"):
+        self.url = url
+        self.engine = create_async_engine(url, echo=DB_ECHO, **engine_pool_options(url))
+        instrument_engine(self.engine, name)
+        self.async_session = _make_sessionmaker(self.engine)
+        self.active = 0
+        self.down_until = 0.0
+
+    @property
+    def healthy(self) -> bool:
+        return self.down_until <= monotonic()
+
+    def mark_down(self) -> None:
+        self.down_until = monotonic() + DB_REPLICA_RETRY_SECONDS
 
 
 class DBHelper:
-    """Database helper class to manage engine and session creation."""
+    """Database helper class to manage engine and session creation.
+
+    Writes always use the primary `engine`; reads taken through
+    `read_session()` are spread over the replicas.
+    """
 
-    def __init__(self, url: str = MY_DATABASE_URL):
-        self.engine = create_async_engine(url, echo=DB_ECHO)
-        self.async_session = async_sessionmaker(
-            self.engine, autoflush=False, autocommit=False, expire_on_commit=False
-        )
+    def __init__(
+        self,
+        url: str = MY_DATABASE_URL,
+        replica_urls: list[str] | tuple[str, ...] = (),
+        routing: str = DB_READ_ROUTING,
+    ):
+        self.engine = create_async_engine(url, echo=DB_ECHO, **engine_pool_options(url))
+        instrument_engine(self.engine, "primary")
+        self.async_session = _make_sessionmaker(self.engine)
+        self.replicas = [
+            Replica(replica_url, f"replica-{i}")
+            for i, replica_url in enumerate(replica_urls, start=1)
+        ]
+        if routing not in ("round_robin", "least_connections"):
+            raise ValueError(f"Unknown read routing {routing!r}")
+        self.routing = routing
+        self._round_robin = itertools.count()
 
     def get_scoped_session(self):
         """Create and return a new asynchronous session."""
         session = async_scoped_session(self.async_session, scopefunc=current_task)
         return session
- 
+
     async def session_dependency(self) -> AsyncSession:
         """Dependency to provide a session for FastAPI routes."""
         session = self.get_scoped_session()
+        attach_loaders(session)
         try:
             yield session
         finally:
+            await close_loaders(session)
             await session.remove()
 
+    def choose_replica(self) -> Replica | None:
+        """Replica for the next read, or None to read from the primary"""
+        if reads_pinned_to_primary():
+            return None
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        if self.routing == "least_connections":
+            return min(healthy, key=lambda replica: replica.active)
+        return healthy[next(self._round_robin) % len(healthy)]
+
+    @asynccontextmanager
+    async def read_session(self):
+        """Read-only session on a replica, falling back to the primary.
+
+        The connection is taken up front so a replica that cannot be reached
+        is marked down for DB_REPLICA_RETRY_SECONDS and the read goes to the
+        primary instead of failing.
+        """
+        replica = self.choose_replica()
+        session = None
+        if replica is not None:
+            session = replica.async_session()
+            try:
+                await session.connection()
+            except (DBAPIError, OSError):
+                await session.close()
+                replica.mark_down()
+                replica, session = None, None
+        if session is None:
+            session = self.async_session()
+        session.info[READ_ONLY_KEY] = True
+        attach_loaders(session)
+        if replica is not None:
+            replica.active += 1
+        try:
+            yield session
+        finally:
+            await close_loaders(session)
+            if replica is not None:
+                replica.active -= 1
+            await session.close()
+
+    async def read_session_dependency(self) -> AsyncSession:
+        """Dependency to provide a read-only session for GET routes."""
+        async with self.read_session() as session:
+            yield session
+
+    async def read_your_writes_middleware(self, request, call_next):
+        """HTTP middleware keeping a client's reads on the primary shortly after it wrote"""
+        if not self.replicas:
+            return await call_next(request)
+        try:
+            primary_until = float(request.cookies.get(STICKY_COOKIE, 0))
+        except ValueError:
+            primary_until = 0.0
+        state = ReadState(primary_until=primary_until)
+        token = _read_state.set(state)
+        try:
+            response = await call_next(request)
+        finally:
+            _read_state.reset(token)
+        if state.wrote:
+            response.set_cookie(
+                STICKY_COOKIE,
+                str(state.primary_until),
+                max_age=DB_STICKY_SECONDS,
+                httponly=True,
+            )
+        return response
+
+    async def dispose(self) -> None:
+        await self.engine.dispose()
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+@event.listens_for(Session, "before_flush")
+def _reject_replica_writes(session: Session, *args) -> None:
+    if session.info.get(READ_ONLY_KEY) and (session.new or session.dirty or session.deleted):
+        raise RuntimeError("Attempted to write through a read-only session")
+
+
+@event.listens_for(Session, "after_flush")
+def _flag_flush(session: Session, *args) -> None:
+    session.info[WROTE_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _flag_dml(state) -> None:
+    if state.is_insert or state.is_update or state.is_delete:
+        state.session.info[WROTE_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _stick_after_write(session: Session) -> None:
+    if session.info.pop(WROTE_KEY, False):
+        pin_reads_to_primary()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_writes(session: Session) -> None:
+    session.info.pop(WROTE_KEY, None)
+
 
-db_helper = DBHelper(url=MY_DATABASE_URL)
+db_helper = DBHelper(url=MY_DATABASE_URL, replica_urls=DB_REPLICA_URLS)
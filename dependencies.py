@@ -9,13 +9,14 @@ from database import Hotels, Transfers, Transportations
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from db_helper import db_helper
+from dataloader import get_loader
 from database import Tours
 from schemas import SOrders, STours,SCustomers,SHotels,STransfer,STransport,SManagers
 
 
 async def get_hotels_dependency(
-    session: AsyncSession = Depends(db_helper.session_dependency),
-) -> list[Hotels]:
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
+) -> list[SHotels]:
     """Dependency to fetch all hotels"""
     return await get_hotels(session)
 
@@ -23,43 +24,40 @@ async def get_hotel_by_id_dependency(
     hotel_id: int,
     session: AsyncSession = Depends(db_helper.session_dependency),
 ) -> Hotels | None:
-    """Dependency to fetch a hotel by its ID"""
-    hotel = await session.execute(
-        select(Hotels).where(Hotels.id == hotel_id)
-    )
-    return hotel.scalar_one_or_none()
+    """Dependency to fetch a hotel by its ID, batched with other lookups in the same request"""
+    return await get_loader(session, Hotels).load(hotel_id)
 
 async def get_transfers_dependency(
-    session: AsyncSession = Depends(db_helper.session_dependency),
-) -> list[Transfers]:
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
+) -> list[STransfer]:
     """Dependency to fetch all transfers"""
     return await get_transfers(session)
 
 async def get_transports_dependency(
-    session: AsyncSession = Depends(db_helper.session_dependency),
-) -> list[Transportations]:
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
+) -> list[STransport]:
     """Dependency to fetch all transportations"""
     return await get_transports(session)
 
 async def get_tours_dependency(
-    session: AsyncSession = Depends(db_helper.session_dependency),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
 ) -> list[STours]:
     """Dependency to fetch all tours"""
     return await get_tours_detailed(session)
 
 async def get_customers_dependency(
-    session: AsyncSession = Depends(db_helper.session_dependency),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
 ) -> list[SCustomers]:
     """Dependency to fetch all customers"""
     return await get_customers(session)
 async def get_managers_dependency(
-    session: AsyncSession = Depends(db_helper.session_dependency),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
 ) -> list[SManagers]:
     """Dependency to fetch all managers"""
     return await get_managers(session)
 async def get_manager_by_id_dependency(
     manager_id: int,
-    session: AsyncSession = Depends(db_helper.session_dependency),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
 ) -> SManagers | None:
     """Dependency to fetch a manager by ID"""
     return await get_manager_by_id(manager_id, session)
@@ -0,0 +1,64 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import AsyncIterator, Literal
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+
+from db_helper import db_helper
+from settings import EXPORT_BATCH_SIZE
+
+ExportFormat = Literal["csv", "ndjson"]
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+async def stream_rows(stmt: Select, fmt: ExportFormat) -> AsyncIterator[bytes]:
+    """Yield `stmt` results encoded as CSV or NDJSON, one batch of rows per chunk.
+
+    Rows come from a server-side cursor in batches of EXPORT_BATCH_SIZE and
+    the next batch is only fetched once the previous chunk has been sent,
+    so memory use does not depend on the number of rows.
+    """
+    async with db_helper.read_session() as session:
+        result = await session.stream(
+            stmt.execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        columns = list(result.keys())
+
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            yield buffer.getvalue().encode()
+
+        async for rows in result.partitions():
+            buffer = io.StringIO()
+            if fmt == "csv":
+                writer = csv.writer(buffer)
+                writer.writerows(rows)
+            else:
+                for row in rows:
+                    buffer.write(json.dumps(dict(zip(columns, row)), default=_json_default))
+                    buffer.write("\n")
+            yield buffer.getvalue().encode()
+
+
+def export_response(stmt: Select, filename: str, fmt: ExportFormat) -> StreamingResponse:
+    """StreamingResponse that downloads `stmt` as `<filename>.csv` or `.ndjson`"""
+    return StreamingResponse(
+        stream_rows(stmt, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
@@ -1,8 +1,13 @@
-from schemas import SHotelsAdd, SHotels
-from database import Hotels
+from schemas import SHotelsAdd, SHotels, SImportReport, SPage
+from database import Hotels, Tours
 from sqlalchemy import select
 from db_helper import db_helper
-from fastapi import Depends
+from pagination import PageParams, paginate
+from trusted import hotel_schema
+from cache import reference_cache, invalidate_on_commit
+from csv_import import import_csv
+from tour.catalog import refresh_tour_catalog
+from fastapi import Depends, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
@@ -14,13 +19,43 @@ async def add_hotel(
     new_hotel = Hotels(**hotel.model_dump())
     session.add(new_hotel)
     await session.flush()
+    invalidate_on_commit(session, "hotels")
 
     return new_hotel
 
 
 async def get_hotels(
     session: AsyncSession = Depends(db_helper.session_dependency),
-) -> list[Hotels]:
-    """Fetch all hotels"""
-    hotels = await session.execute(select(Hotels))
-    return hotels.scalars().all()
+) -> list[SHotels]:
+    """Fetch all hotels, served from the reference cache when fresh"""
+
+    async def load():
+        hotels = await session.execute(select(*hotel_schema.columns(Hotels)))
+        return hotel_schema.from_rows(hotels)
+
+    return await reference_cache.get_or_load("hotels", load)
+
+
+async def get_hotels_page(
+    page: PageParams,
+    session: AsyncSession = Depends(db_helper.session_dependency),
+) -> SPage[SHotels]:
+    """Fetch one page of hotels"""
+    return await paginate(
+        session,
+        select(*hotel_schema.columns(Hotels)),
+        page,
+        Hotels.id,
+        to_schema=hotel_schema.from_row,
+    )
+
+
+async def import_hotels(upload: UploadFile, session: AsyncSession) -> SImportReport:
+    """Bulk insert/update hotels from a CSV upload, keeping tour_catalog in step"""
+
+    async def on_chunk(session: AsyncSession, ids: list[int]) -> None:
+        if ids:
+            await refresh_tour_catalog(session, Tours.hotels_id.in_(ids))
+        invalidate_on_commit(session, "hotels")
+
+    return await import_csv(upload, session, Hotels.__table__, SHotelsAdd, on_chunk)
@@ -1,9 +1,9 @@
 from fastapi import FastAPI, Depends
-from fastapi.templating import Jinja2Templates
+from templating import templates
 from starlette.requests import Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from db_helper import db_helper
-from fastapi import APIRouter, Request, Depends
+from fastapi import APIRouter, Request, Depends, UploadFile
 from database import (
     Tours,
     Customers,
@@ -20,22 +20,27 @@ from sqlalchemy import select
 from hotel.crud import (
     add_hotel,
     get_hotels,
+    get_hotels_page,
+    import_hotels,
 )
+from pagination import PageParams, page_params
+from tour.catalog import refresh_catalog_for_hotel
+from cache import invalidate_on_commit
 
 from schemas import (
     SHotelsAdd,
     SHotels,
+    SImportReport,
+    SPage,
 )
 
 router = APIRouter(tags=["hotel"])
-templates = Jinja2Templates(directory="templates")
-
 
 @router.get("/{hotel_id}", response_model=SHotels)
 async def read_hotel(
     request: Request,
     hotel_id: int,
-    session: AsyncSession = Depends(db_helper.session_dependency),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
 ):
     hotel = await session.execute(select(Hotels).where(Hotels.id == hotel_id))
     hotel = hotel.scalar_one_or_none()
@@ -47,12 +52,22 @@ async def read_hotel(
         return {"error": "Hotel not found"}
 
 
-@router.get("/", response_model=list[SHotels])
+@router.get("/", response_model=SPage[SHotels])
 async def read_hotels(
-    request: Request, hotels: list[SHotels] = Depends(get_hotels_dependency)
+    request: Request,
+    page: PageParams = Depends(page_params),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
 ):
+    hotels = await get_hotels_page(page, session)
     return templates.TemplateResponse(
-        "hotel.html", {"request": request, "hotels": hotels}
+        "hotel.html",
+        {
+            "request": request,
+            "hotels": hotels.items,
+            "next_cursor": hotels.next_cursor,
+            "prev_cursor": hotels.prev_cursor,
+            "limit": hotels.limit,
+        },
     )
 
 
@@ -106,6 +121,15 @@ async def create_hotel(
             },
         )
 
+@router.post("/import", response_model=SImportReport)
+async def import_hotels_csv(
+    file: UploadFile,
+    session: AsyncSession = Depends(db_helper.session_dependency),
+):
+    """Bulk insert/update hotels from a CSV file; returns a per-row error report"""
+    return await import_hotels(file, session)
+
+
 @router.patch("/{hotel_id}/update/", response_model=SHotels)
 async def update_hotel(
     hotel_id: int,
@@ -121,6 +145,9 @@ async def update_hotel(
         setattr(hotel, key, value)
 
     session.add(hotel)
+    await session.flush()
+    await refresh_catalog_for_hotel(session, hotel_id)
+    invalidate_on_commit(session, "hotels")
     await session.commit()
     await session.refresh(hotel)
 
@@ -137,6 +164,9 @@ async def delete_hotel(
         return {"error": "Hotel not found"}
 
     await session.delete(hotel)
+    await session.flush()
+    await refresh_catalog_for_hotel(session, hotel_id)
+    invalidate_on_commit(session, "hotels")
     await session.commit()
 
     return {"success": f"Hotel with ID {hotel_id} has been deleted."}
\ No newline at end of file
@@ -1,10 +1,12 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from fastapi.templating import Jinja2Templates
+from templating import precompile_templates, templates
 from starlette.requests import Request
 from starlette.responses import RedirectResponse
-from fastapi.responses import Response
+from fastapi.responses import PlainTextResponse, Response
 from database import (
     Tours,
     Customers,
@@ -30,11 +32,29 @@ from tour.crud import (
     add_tour,
     get_tour_by_id,
     get_tours_detailed,
+    get_tours_page,
     update_tour,
     delete_tour,
 )
 
 from hotel.crud import get_hotels
+from customer.crud import get_customers_page
+from manager.crud import get_managers_page
+from pagination import PageParams, page_params
+from cache import reference_cache
+from session_store import session_store
+from page_data import load_page_data
+from customer_token import current_customer
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, registry as metrics_registry
+from query_stats import QueryStatsMiddleware
+from conditional import ConditionalGetMiddleware, ConditionalPage
+from page_cache import PageCacheMiddleware, page_cache
+from settings import (
+    CONDITIONAL_GET_ENABLED,
+    METRICS_ENABLED,
+    PAGE_CACHE_ENABLED,
+    QUERY_STATS_ENABLED,
+)
 
 from schemas import (
     SToursAdd,
@@ -43,6 +63,10 @@ from schemas import (
     SHotelsAdd,
     SCustomersAdd,
     SOrdersAdd,
+    SCustomers,
+    SCustomerIdentity,
+    SManagers,
+    SPage,
 )
 import uvicorn
 from datetime import datetime
@@ -50,65 +74,131 @@ from tour.views import router as tour_router
 from hotel.views import router as hotel_router
 from order.views import router as order_router
 from auth import router as auth_router
+from api import router as api_router
 from db_helper import db_helper
 
-templates = Jinja2Templates(directory="templates")
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    precompile_templates()
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
+app.middleware("http")(db_helper.read_your_writes_middleware)
+# "tours" covers tour_catalog, which every tour, hotel, transfer and
+# transport price change refreshes
+CATALOG_PAGES = [
+    ConditionalPage("/", ("tours",)),
+    ConditionalPage("/tour/update/", ("tours",)),
+    ConditionalPage("/customer-profile/", ("tours",), personal=True),
+    ConditionalPage("/hotel/", ("hotels",)),
+    ConditionalPage("/hotel/{hotel_id:int}", ("hotels",)),
+]
+if PAGE_CACHE_ENABLED:
+    app.add_middleware(PageCacheMiddleware, pages=CATALOG_PAGES)
+if CONDITIONAL_GET_ENABLED:
+    app.add_middleware(ConditionalGetMiddleware, pages=CATALOG_PAGES)
+if QUERY_STATS_ENABLED:
+    app.add_middleware(QueryStatsMiddleware)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
 app.include_router(tour_router, prefix="/tour")
 app.include_router(hotel_router, prefix="/hotel")
 app.include_router(order_router, prefix="/order")
 app.include_router(auth_router,prefix="/auth")
+app.include_router(api_router, prefix="/api/v1")
 
 @app.get("/")
 async def tours_page(
-    request: Request, session: AsyncSession = Depends(db_helper.session_dependency)
+    request: Request,
+    page: PageParams = Depends(page_params),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
 ):
-    result = await get_tours_detailed(session)
+    result = await get_tours_page(page, session)
+
+    return templates.TemplateResponse(
+        "tours.html",
+        {
+            "request": request,
+            "tours": result.items,
+            "next_cursor": result.next_cursor,
+            "prev_cursor": result.prev_cursor,
+            "limit": result.limit,
+        },
+    )
 
-    return templates.TemplateResponse("tours.html", {"request": request, "tours": result})
 
 
 
 
+@app.get("/customers/", response_model=SPage[SCustomers])
+async def read_customers(
+    page: PageParams = Depends(page_params),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
+):
+    return await get_customers_page(page, session)
+
+
+@app.get("/managers/", response_model=SPage[SManagers])
+async def read_managers(
+    page: PageParams = Depends(page_params),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
+):
+    return await get_managers_page(page, session)
+
+
+
 
-@app.get("/customers/")
-async def read_customers(session: AsyncSession = Depends(db_helper.session_dependency)):
-    customers = await session.execute(select(Customers))
-    return customers.scalars().all()
 
+@app.get("/cache-stats/")
+async def read_cache_stats():
+    """Hit/miss counters of the reference data cache"""
+    return reference_cache.stats()
 
-@app.get("/managers/")
-async def read_managers(session: AsyncSession = Depends(db_helper.session_dependency)):
-    managers = await session.execute(select(Managers))
-    return managers.scalars().all()
 
+@app.get("/page-cache-stats/")
+async def read_page_cache_stats():
+    """Hit/miss counters of the rendered page cache"""
+    return page_cache.stats()
 
 
+@app.get("/metrics", include_in_schema=False)
+async def read_metrics():
+    """Request latency and connection pool metrics in Prometheus text format"""
+    return PlainTextResponse(metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/session-stats/")
+async def read_session_stats():
+    """Size, evictions and lookup latency of the server-side session store"""
+    return await session_store.stats()
 
 
 @app.get("/customer-profile/")
 async def customer_profile(
-    request: Request, session: AsyncSession = Depends(db_helper.session_dependency)
+    request: Request,
+    page: PageParams = Depends(page_params),
+    customer: SCustomerIdentity | None = Depends(current_customer),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
 ):
     """Display customer profile with available tours"""
-    customer_id = request.cookies.get("customer_id")
-    customer_name = request.cookies.get("customer_name")
-    customer_email = request.cookies.get("customer_email")
-
-    if not customer_id:
+    if customer is None:
         return RedirectResponse(url="/login/", status_code=303)
 
-    tours_list = await get_tours_detailed(session)
+    tours_page = await get_tours_page(page, session)
 
     return templates.TemplateResponse(
         "customer_profile.html",
         {
             "request": request,
-            "customer_id": customer_id,
-            "customer_name": customer_name,
-            "customer_email": customer_email,
-            "tours": tours_list,
+            "customer_id": customer.id,
+            "customer_name": customer.name,
+            "customer_email": customer.email,
+            "tours": tours_page.items,
+            "next_cursor": tours_page.next_cursor,
+            "prev_cursor": tours_page.prev_cursor,
+            "limit": tours_page.limit,
         },
     )
 
@@ -118,48 +208,58 @@ async def customer_profile(
 
 @app.get("/customer/")
 async def customer_page(
-    request: Request, session: AsyncSession = Depends(db_helper.session_dependency)
+    request: Request,
+    customer: SCustomerIdentity | None = Depends(current_customer),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
 ):
     """Customer dashboard to choose and edit tours"""
     selected_id = request.query_params.get("tour_id")
     selected_tour_id = int(selected_id) if selected_id else None
     selected_customer_id = request.query_params.get("customer_id")
-
-    selected_customer = (
-        await get_customer_by_id(selected_customer_id, session)
-        if selected_customer_id
-        else None
+    if customer and selected_customer_id in (None, "", str(customer.id)):
+        # The logged-in customer comes from the signed cookie, no lookup needed
+        selected_customer, selected_customer_id = customer, None
+    else:
+        selected_customer = None
+
+    queries = dict(
+        tours=(get_tours_detailed,),
+        hotels=(get_hotels,),
+        transfers=(get_transfers,),
+        transportations=(get_transports,),
     )
+    if selected_customer_id:
+        queries["selected_customer"] = (get_customer_by_id, selected_customer_id)
+    if selected_tour_id:
+        queries["selected_tour"] = (get_tour_by_id, selected_tour_id)
+    data = await load_page_data(**queries)
 
-    tours_list = await get_tours_detailed(session)
+    tours_list = data["tours"]
+    selected_tour = data.get("selected_tour")
     if not selected_tour_id and tours_list:
-        selected_tour_id = tours_list[0]["id"]
-
-    selected_tour = None
-    if selected_tour_id:
+        selected_tour_id = tours_list[0].id
         selected_tour = await get_tour_by_id(selected_tour_id, session)
 
-    hotels_list = await get_hotels(session)
-    transfers_list = await get_transfers(session)
-    transportations_list = await get_transports(session)
     return templates.TemplateResponse(
         "customer.html",
         {
             "request": request,
             "tours": tours_list,
             "selected_tour": selected_tour,
-            "hotels": hotels_list,
-            "transfers": transfers_list,
-            "transportations": transportations_list,
+            "hotels": data["hotels"],
+            "transfers": data["transfers"],
+            "transportations": data["transportations"],
             "selected_tour_id": selected_tour_id,
-            "selected_customer": selected_customer,
+            "selected_customer": data.get("selected_customer", selected_customer),
         },
     )
 
 
 @app.post("/customer/")
 async def customer_update(
-    request: Request, session: AsyncSession = Depends(db_helper.session_dependency)
+    request: Request,
+    customer: SCustomerIdentity | None = Depends(current_customer),
+    session: AsyncSession = Depends(db_helper.session_dependency),
 ):
     """Allow customers to pick options and create orders. If tour params are modified, create a new tour; otherwise use existing."""
     form_data = await request.form()
@@ -172,29 +272,31 @@ async def customer_update(
     transfer_id = to_int(form_data.get("transfer_id"))
     transport_id = to_int(form_data.get("transport_id"))
     selected_customer_id = to_int(form_data.get("customer_id"))
-    selected_customer = (
-        await get_customer_by_id(selected_customer_id, session)
-        if selected_customer_id
-        else None
-    )
+    if customer and selected_customer_id == customer.id:
+        selected_customer = customer
+    elif selected_customer_id:
+        selected_customer = await get_customer_by_id(selected_customer_id, session)
+    else:
+        selected_customer = None
     is_modified = form_data.get("is_modified", "false").lower() == "true"
 
     # Basic validation: a tour and customer must be selected
     if not selected_tour_id or not selected_customer_id:
-        tours_list = await get_tours_detailed(session)
-        hotels_list = await get_hotels(session)
-        transfers_list = await get_transfers(session)
-        transportations_list = await get_transports(session)
-        customers_list = await get_customers(session)
+        data = await load_page_data(
+            tours=(get_tours_detailed,),
+            hotels=(get_hotels,),
+            transfers=(get_transfers,),
+            transportations=(get_transports,),
+        )
         return templates.TemplateResponse(
             "customer.html",
             {
                 "request": request,
-                "tours": tours_list,
+                "tours": data["tours"],
                 "selected_tour": None,
-                "hotels": hotels_list,
-                "transfers": transfers_list,
-                "transportations": transportations_list,
+                "hotels": data["hotels"],
+                "transfers": data["transfers"],
+                "transportations": data["transportations"],
                 "selected_tour_id": None,
                 "selected_customer": selected_customer,
                 "error": "Please choose a tour and customer before creating an order.",
@@ -251,22 +353,23 @@ async def customer_update(
         success_message = None
         error_message = f"Error creating order: {str(e)}"
 
-    # Refresh data for the page using a new session factory
-    tours_list = await get_tours_detailed(session)
-    selected_tour = await get_tour_by_id(selected_tour_id, session)
-    hotels_list = await get_hotels(session)
-    transfers_list = await get_transfers(session)
-    transportations_list = await get_transports(session)
-    customers_list = await get_customers(session)
+    # Refresh data for the page concurrently, each query on its own session
+    data = await load_page_data(
+        tours=(get_tours_detailed,),
+        selected_tour=(get_tour_by_id, selected_tour_id),
+        hotels=(get_hotels,),
+        transfers=(get_transfers,),
+        transportations=(get_transports,),
+    )
     return templates.TemplateResponse(
         "customer.html",
         {
             "request": request,
-            "tours": tours_list,
-            "selected_tour": selected_tour,
-            "hotels": hotels_list,
-            "transfers": transfers_list,
-            "transportations": transportations_list,
+            "tours": data["tours"],
+            "selected_tour": data["selected_tour"],
+            "hotels": data["hotels"],
+            "transfers": data["transfers"],
+            "transportations": data["transportations"],
             "selected_tour_id": selected_tour_id,
             "selected_customer": selected_customer,
             "success": success_message,
@@ -3,25 +3,34 @@ from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from database import Orders,Managers
-from schemas import SOrders,SManagers
+from schemas import SOrders,SManagers,SPage
+from pagination import PageParams, paginate
+from dataloader import get_loader
+from trusted import manager_schema
 
 async def get_managers(
     session: AsyncSession = Depends(db_helper.session_dependency)
 ) -> list[SManagers]:
     """Fetch all managers"""
-    managers = await session.execute(select(Managers))
-    managers = managers.scalars().all()
-    return [SManagers.model_validate(manager) for manager in managers]
+    managers = await session.execute(select(*manager_schema.columns(Managers)))
+    return manager_schema.from_rows(managers)
+
+async def get_managers_page(
+    page: PageParams,
+    session: AsyncSession = Depends(db_helper.session_dependency),
+) -> SPage[SManagers]:
+    """Fetch one page of managers"""
+    return await paginate(
+        session,
+        select(*manager_schema.columns(Managers)),
+        page,
+        Managers.id,
+        to_schema=manager_schema.from_row,
+    )
 
 async def get_manager_by_id(
     manager_id: int, session: AsyncSession = Depends(db_helper.session_dependency)
 ) -> SManagers | None:
-    """Fetch a manager by ID"""
-    manager = await session.execute(
-        select(Managers).where(Managers.id == manager_id)
-    )
-    manager = manager.scalar_one_or_none()
-
-    if manager:
-        return SManagers.model_validate(manager)
-    return None
\ No newline at end of file
+    """Fetch a manager by ID, batched with other lookups in the same request"""
+    loader = get_loader(session, Managers, manager_schema)
+    return await loader.load(manager_id)
\ No newline at end of file
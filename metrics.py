@@ -0,0 +1,257 @@
+from bisect import bisect_left
+from time import perf_counter
+from typing import Callable
+
+from sqlalchemy import event, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from settings import METRICS_LATENCY_BUCKETS
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name, self.help, self.labels = name, help, labels
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for values, total in self._values.items():
+            lines.append(f"{self.name}{_format_labels(self.labels, values)} {total}")
+        return lines
+
+
+class Gauge:
+    """Gauge set with `inc`/`dec`, or read from `collect()` at scrape time"""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        collect: Callable[[], dict] | None = None,
+    ):
+        self.name, self.help, self.labels = name, help, labels
+        self.collect = collect
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def dec(self, *label_values, amount: float = 1) -> None:
+        self.inc(*label_values, amount=-amount)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        series = self.collect() if self.collect else self._values
+        for values, value in series.items():
+            lines.append(f"{self.name}{_format_labels(self.labels, values)} {value}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram; `observe` is a bisect and two additions"""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = METRICS_LATENCY_BUCKETS,
+    ):
+        self.name, self.help, self.labels = name, help, labels
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *label_values) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for values, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                labels = _format_labels(self.labels, values, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, values)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+HTTP_DURATION = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "HTTP request latency by route template and status",
+        ("method", "route", "status"),
+    )
+)
+HTTP_IN_PROGRESS = registry.register(
+    Gauge("http_requests_in_progress", "HTTP requests currently being served")
+)
+
+TEMPLATE_RENDER = registry.register(
+    Histogram(
+        "template_render_seconds",
+        "Jinja2 render time by template",
+        ("template",),
+        buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+    )
+)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware timing every HTTP request.
+
+    The route label is the matched route's path template (`/tour/{tour_id}`),
+    which FastAPI leaves in the scope, so ids never create new series.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = perf_counter()
+        HTTP_IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_PROGRESS.dec()
+            route = scope.get("route")
+            HTTP_DURATION.observe(
+                perf_counter() - started,
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                status,
+            )
+
+
+POOL_CHECKOUT_WAIT = registry.register(
+    Histogram(
+        "db_pool_checkout_wait_seconds",
+        "Time to get a connection from the pool, including opening a new one",
+        ("pool",),
+        buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+    )
+)
+POOL_EVENTS = registry.register(
+    Counter(
+        "db_pool_events_total",
+        "Pool connects, checkouts and invalidations",
+        ("pool", "event"),
+    )
+)
+# pool label -> engine; the engine's current pool is read at scrape time
+# because dispose() replaces it
+_engines: dict[str, object] = {}
+
+
+def _pool_gauge(name: str, help: str, read: Callable) -> None:
+    registry.register(
+        Gauge(
+            name,
+            help,
+            ("pool",),
+            lambda: {
+                (label,): read(engine.sync_engine.pool)
+                for label, engine in _engines.items()
+                # only queue pools report sizes
+                if hasattr(engine.sync_engine.pool, "checkedout")
+            },
+        )
+    )
+
+
+_pool_gauge("db_pool_connections_in_use", "Connections checked out of the pool", lambda p: p.checkedout())
+_pool_gauge("db_pool_connections_idle", "Connections idle in the pool", lambda p: p.checkedin())
+_pool_gauge("db_pool_overflow", "Connections open beyond pool_size (negative: unopened slots)", lambda p: p.overflow())
+_pool_gauge("db_pool_size", "Configured pool_size", lambda p: p.size())
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long each checkout waited"""
+
+    metrics_name = "default"
+
+    def _do_get(self):
+        started = perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_CHECKOUT_WAIT.observe(perf_counter() - started, self.metrics_name)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics_name = self.metrics_name
+        return pool
+
+
+def instrument_engine(engine, name: str) -> None:
+    """Export pool gauges and counters for `engine` under the label pool=`name`"""
+    pool = engine.sync_engine.pool
+    if isinstance(pool, InstrumentedAsyncPool):
+        pool.metrics_name = name
+    _engines[name] = engine
+
+    for event_name in ("connect", "checkout", "invalidate"):
+        event.listen(pool, event_name, lambda *args, e=event_name: POOL_EVENTS.inc(name, e))
+
+
+def engine_pool_options(url: str) -> dict:
+    """create_async_engine keyword arguments that enable checkout-wait timing.
+
+    In-memory SQLite keeps its default single-connection pool.
+    """
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+    return {"poolclass": InstrumentedAsyncPool}
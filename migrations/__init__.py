@@ -0,0 +1 @@
+from .runner import applied_versions, discover_migrations, upgrade
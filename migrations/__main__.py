@@ -0,0 +1,31 @@
+import argparse
+import asyncio
+
+from db_helper import db_helper
+
+from .runner import applied_versions, discover_migrations, upgrade
+
+
+async def main():
+    parser = argparse.ArgumentParser(prog="python -m migrations")
+    parser.add_argument("command", choices=["upgrade", "status"], nargs="?", default="upgrade")
+    parser.add_argument("--target", type=int, help="stop after this version")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "status":
+            done = await applied_versions(db_helper.engine)
+            for module in discover_migrations():
+                mark = "x" if module.VERSION in done else " "
+                print(f"[{mark}] {module.VERSION:04d} {module.DESCRIPTION}")
+        else:
+            applied = await upgrade(db_helper.engine, args.target)
+            descriptions = {module.VERSION: module.DESCRIPTION for module in discover_migrations()}
+            for version in applied:
+                print(f"applied {version:04d}: {descriptions[version]}")
+            print(f"{len(applied)} migration(s) applied")
+    finally:
+        await db_helper.engine.dispose()
+
+
+asyncio.run(main())
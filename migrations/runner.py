@@ -0,0 +1,72 @@
+import importlib
+import pkgutil
+from datetime import datetime
+from types import ModuleType
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from . import versions
+
+metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def discover_migrations() -> list[ModuleType]:
+    """Import every `migrations/versions/mNNNN_*.py` module, ordered by VERSION.
+
+    Each module defines VERSION (int), DESCRIPTION (str) and
+    `async def upgrade(engine: AsyncEngine)`.
+    """
+    modules = [
+        importlib.import_module(f"{versions.__name__}.{info.name}")
+        for info in pkgutil.iter_modules(versions.__path__)
+        if info.name.startswith("m")
+    ]
+    modules.sort(key=lambda module: module.VERSION)
+    seen = set()
+    for module in modules:
+        if module.VERSION in seen:
+            raise RuntimeError(f"Duplicate migration version {module.VERSION}")
+        seen.add(module.VERSION)
+    return modules
+
+
+async def applied_versions(engine: AsyncEngine) -> set[int]:
+    async with engine.begin() as conn:
+        await conn.run_sync(schema_migrations.create, checkfirst=True)
+        rows = await conn.execute(select(schema_migrations.c.version))
+        return {row.version for row in rows}
+
+
+async def upgrade(engine: AsyncEngine, target: int | None = None) -> list[int]:
+    """Apply pending migrations up to `target` (default: latest), in order.
+
+    A migration is recorded only after its upgrade() returns, so a failed
+    one is retried on the next run; upgrades therefore have to be safe to
+    re-run after a partial failure. Returns the versions applied; the
+    migrations before a failed one stay recorded.
+    """
+    done = await applied_versions(engine)
+    applied = []
+    for module in discover_migrations():
+        if module.VERSION in done or (target is not None and module.VERSION > target):
+            continue
+        await module.upgrade(engine)
+        async with engine.begin() as conn:
+            await conn.execute(
+                insert(schema_migrations).values(
+                    version=module.VERSION,
+                    description=module.DESCRIPTION,
+                    applied_at=datetime.now(),
+                )
+            )
+        applied.append(module.VERSION)
+    return applied
@@ -0,0 +1,102 @@
+"""The schema as it was before migrations existed, frozen here.
+
+Later migrations change these tables and add new ones; this module must
+not import the models, or a fresh database would skip those steps.
+"""
+
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, MetaData, String, Table
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+VERSION = 1
+DESCRIPTION = "baseline tables (tours, customers, orders, managers, hotels, transportations, transfers)"
+
+metadata = MetaData()
+
+
+def _id() -> Column:
+    return Column("id", Integer, primary_key=True, index=True)
+
+
+Table(
+    "tours",
+    metadata,
+    _id(),
+    Column("name", String(255), nullable=False),
+    Column("description", String(255)),
+    Column("transfer_id", Integer, ForeignKey("transfers.id")),
+    Column("hotels_id", Integer, ForeignKey("hotels.id")),
+    Column("transport_id", Integer, ForeignKey("transportations.id")),
+)
+
+Table(
+    "customers",
+    metadata,
+    _id(),
+    Column("name", String(255)),
+    Column("surname", String(255)),
+    Column("status", String(50)),
+    Column("email", String(255)),
+    Column("phone", String(20)),
+    Column("order_id", Integer, ForeignKey("orders.id")),
+    Column("password", String(255), nullable=False),
+)
+
+Table(
+    "orders",
+    metadata,
+    _id(),
+    Column("order_date", String(50)),
+    Column("customer_id", Integer, ForeignKey("customers.id")),
+    Column("tour_id", Integer, ForeignKey("tours.id")),
+    Column("total_amount", Integer),
+    Column("payment_status", Boolean, nullable=False),
+    Column("manager_id", Integer, ForeignKey("managers.id")),
+)
+
+Table(
+    "managers",
+    metadata,
+    _id(),
+    Column("name", String(255)),
+    Column("surname", String(255)),
+    Column("email", String(255)),
+    Column("phone", String(20)),
+)
+
+Table(
+    "hotels",
+    metadata,
+    _id(),
+    Column("name", String(255)),
+    Column("location", String(255)),
+    Column("rating", Integer),
+    Column("price", Integer),
+    Column("description", String(1000)),
+)
+
+Table(
+    "transportations",
+    metadata,
+    _id(),
+    Column("type", String(50)),
+    Column("company", String(255)),
+    Column("price", Integer),
+    Column("from_location", String(255)),
+    Column("to_location", String(255)),
+    Column("from_date", String(50)),
+    Column("to_date", String(50)),
+)
+
+Table(
+    "transfers",
+    metadata,
+    _id(),
+    Column("type", String(50)),
+    Column("price", Integer),
+)
+
+
+async def upgrade(engine: AsyncEngine) -> None:
+    # Existing databases already have these tables and are left untouched
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all, checkfirst=True)
@@ -0,0 +1,32 @@
+from sqlalchemy import func, inspect, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from database import Customers
+
+VERSION = 2
+DESCRIPTION = "unique index on customers.email (login lookup)"
+
+
+async def upgrade(engine: AsyncEngine) -> None:
+    index = next(ix for ix in Customers.__table__.indexes if ix.name == "ix_customers_email")
+    async with engine.begin() as conn:
+        existing = await conn.run_sync(
+            lambda sync_conn: {ix["name"] for ix in inspect(sync_conn).get_indexes("customers")}
+        )
+        if index.name in existing:
+            return
+
+        duplicates = await conn.execute(
+            select(Customers.email)
+            .where(Customers.email.is_not(None))
+            .group_by(Customers.email)
+            .having(func.count() > 1)
+            .limit(10)
+        )
+        duplicates = duplicates.scalars().all()
+        if duplicates:
+            raise RuntimeError(
+                "Cannot add unique index, duplicate customer emails: "
+                + ", ".join(duplicates)
+            )
+        await conn.run_sync(index.create)
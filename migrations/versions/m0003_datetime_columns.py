@@ -0,0 +1,185 @@
+"""Convert the date strings to DATETIME while the app keeps serving.
+
+Deploy the code first: the models map these columns with
+database.LenientDateTime, which also reads the old ISO strings, so the app
+works against either column type. Then, per column:
+
+1. add a nullable `<name>_dt` shadow column and a trigger that clears it
+   whenever the string column changes; inserts leave it NULL as well, so
+   every row written during the copy is picked up again
+2. copy the parsed values in id-ordered batches, one transaction each,
+   then run a second pass for the rows written meanwhile
+3. with the table write-locked: a last catch-up pass, drop the trigger
+   and swap the column names, which changes metadata only
+4. drop the old column, now `<name>_old`, without the lock
+
+Values that cannot be parsed abort the migration before the swap, listing
+the ids; fix or clear those rows and run it again, it resumes where it
+stopped.
+"""
+
+from contextlib import nullcontext
+from datetime import datetime
+from functools import partial
+
+from sqlalchemy import DateTime, bindparam, column, inspect, select, table, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from settings import MIGRATION_BATCH_SIZE
+
+VERSION = 3
+DESCRIPTION = "convert orders.order_date and transportations.from_date/to_date to DATETIME"
+
+COLUMNS = [
+    ("orders", "order_date"),
+    ("transportations", "from_date"),
+    ("transportations", "to_date"),
+]
+
+
+def parse_datetime(value: str | None) -> datetime | None:
+    """None for an empty value; ValueError if it is not an ISO date/datetime"""
+    if not value or not value.strip():
+        return None
+    return datetime.fromisoformat(value.strip())
+
+
+async def _column_types(engine: AsyncEngine, table_name: str) -> dict:
+    async with engine.connect() as conn:
+        columns = await conn.run_sync(
+            lambda sync_conn: inspect(sync_conn).get_columns(table_name)
+        )
+    return {c["name"]: c["type"] for c in columns}
+
+
+def _trigger_name(table_name: str, name: str) -> str:
+    return f"{table_name}_{name}_dt_sync"
+
+
+async def _add_shadow(engine: AsyncEngine, table_name: str, name: str, types: dict) -> None:
+    """Add the shadow column and the trigger keeping it honest; safe to re-run"""
+    new, trigger = f"{name}_dt", _trigger_name(table_name, name)
+    async with engine.begin() as conn:
+        if conn.dialect.name == "mysql":
+            if new not in types:
+                await conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {new} DATETIME NULL"))
+            exists = await conn.execute(
+                text(
+                    "SELECT 1 FROM information_schema.triggers"
+                    " WHERE trigger_schema = DATABASE() AND trigger_name = :name"
+                ),
+                {"name": trigger},
+            )
+            if exists.first() is None:
+                await conn.execute(text(
+                    f"CREATE TRIGGER {trigger} BEFORE UPDATE ON {table_name} FOR EACH ROW"
+                    f" SET NEW.{new} = IF(NEW.{name} <=> OLD.{name}, NEW.{new}, NULL)"
+                ))
+        else:
+            if new not in types:
+                await conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {new} TIMESTAMP NULL"))
+            await conn.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS {trigger} AFTER UPDATE OF {name} ON {table_name}"
+                f" WHEN NEW.{name} IS NOT OLD.{name}"
+                f" BEGIN UPDATE {table_name} SET {new} = NULL WHERE id = NEW.id; END"
+            ))
+
+
+async def _copy_batches(
+    begin, table_name: str, old: str, new: str
+) -> tuple[int, list[tuple[int, str]]]:
+    """Copy parsed values of the rows whose shadow is still empty into `new`,
+    in id-ordered batches, each in its own `begin()` block.
+
+    Returns how many values could not be parsed and (id, value) of the first ten.
+    """
+    t = table(table_name, column("id"), column(old), column(new, DateTime))
+    last_id, unparsed, examples = 0, 0, []
+    while True:
+        async with begin() as conn:
+            rows = await conn.execute(
+                select(t.c.id, t.c[old])
+                .where(t.c.id > last_id, t.c[old].is_not(None), t.c[new].is_(None))
+                .order_by(t.c.id)
+                .limit(MIGRATION_BATCH_SIZE)
+            )
+            rows = rows.all()
+            if not rows:
+                return unparsed, examples
+            params = []
+            for row_id, raw in rows:
+                try:
+                    value = parse_datetime(raw)
+                except ValueError:
+                    unparsed += 1
+                    if len(examples) < 10:
+                        examples.append((row_id, raw))
+                    continue
+                if value is not None:
+                    params.append({"row_id": row_id, "raw": raw, "value": value})
+            if params:
+                # A row the app changed since the SELECT keeps an empty shadow
+                # and is copied again by the next pass
+                await conn.execute(
+                    t.update()
+                    .where(t.c.id == bindparam("row_id"), t.c[old] == bindparam("raw"))
+                    .values({new: bindparam("value")}),
+                    params,
+                )
+            last_id = rows[-1][0]
+
+
+def _check_parsed(table_name: str, name: str, unparsed: int, examples: list) -> None:
+    if unparsed:
+        raise RuntimeError(
+            f"Cannot convert {table_name}.{name}, {unparsed} unparseable value(s): "
+            + ", ".join(f"id {row_id}: {raw!r}" for row_id, raw in examples)
+        )
+
+
+async def _lock_and_swap(conn: AsyncConnection, table_name: str, name: str) -> None:
+    """Catch up on the last writes and swap the columns while nobody can write"""
+    new, old, trigger = f"{name}_dt", f"{name}_old", _trigger_name(table_name, name)
+    same_conn = partial(nullcontext, conn)
+    if conn.dialect.name == "mysql":
+        await conn.execute(text(f"LOCK TABLES {table_name} WRITE"))
+        try:
+            unparsed, examples = await _copy_batches(same_conn, table_name, name, new)
+            _check_parsed(table_name, name, unparsed, examples)
+            await conn.execute(text(f"DROP TRIGGER {trigger}"))
+            await conn.execute(text(
+                f"ALTER TABLE {table_name} RENAME COLUMN {name} TO {old}, RENAME COLUMN {new} TO {name}"
+            ))
+        finally:
+            await conn.execute(text("UNLOCK TABLES"))
+    else:
+        await conn.exec_driver_sql("BEGIN IMMEDIATE")
+        unparsed, examples = await _copy_batches(same_conn, table_name, name, new)
+        _check_parsed(table_name, name, unparsed, examples)
+        await conn.execute(text(f"DROP TRIGGER {trigger}"))
+        await conn.execute(text(f"ALTER TABLE {table_name} RENAME COLUMN {name} TO {old}"))
+        await conn.execute(text(f"ALTER TABLE {table_name} RENAME COLUMN {new} TO {name}"))
+        await conn.commit()
+
+
+async def convert_column(engine: AsyncEngine, table_name: str, name: str) -> None:
+    types = await _column_types(engine, table_name)
+    if not isinstance(types.get(name), DateTime):
+        await _add_shadow(engine, table_name, name, types)
+        # The first pass copies the bulk, the second what was written meanwhile;
+        # both refuse to go on while a value cannot be converted
+        for _ in range(2):
+            unparsed, examples = await _copy_batches(engine.begin, table_name, name, f"{name}_dt")
+            _check_parsed(table_name, name, unparsed, examples)
+        async with engine.connect() as conn:
+            await _lock_and_swap(conn, table_name, name)
+        types = await _column_types(engine, table_name)
+
+    if f"{name}_old" in types:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"ALTER TABLE {table_name} DROP COLUMN {name}_old"))
+
+
+async def upgrade(engine: AsyncEngine) -> None:
+    for table_name, name in COLUMNS:
+        await convert_column(engine, table_name, name)
@@ -0,0 +1,17 @@
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from database import Orders
+
+VERSION = 4
+DESCRIPTION = "indexes for orders by customer, manager, tour and date"
+
+
+async def upgrade(engine: AsyncEngine) -> None:
+    async with engine.begin() as conn:
+        existing = await conn.run_sync(
+            lambda sync_conn: {ix["name"] for ix in inspect(sync_conn).get_indexes("orders")}
+        )
+        for index in Orders.__table__.indexes:
+            if index.name not in existing:
+                await conn.run_sync(index.create)
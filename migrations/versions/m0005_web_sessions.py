@@ -0,0 +1,11 @@
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from database import WebSessions
+
+VERSION = 5
+DESCRIPTION = "web_sessions table for the shared session store"
+
+
+async def upgrade(engine: AsyncEngine) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(WebSessions.__table__.create, checkfirst=True)
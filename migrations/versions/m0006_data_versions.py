@@ -0,0 +1,11 @@
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from database import DataVersions
+
+VERSION = 6
+DESCRIPTION = "data_versions table for ETag / Last-Modified responses"
+
+
+async def upgrade(engine: AsyncEngine) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(DataVersions.__table__.create, checkfirst=True)
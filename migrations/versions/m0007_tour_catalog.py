@@ -0,0 +1,11 @@
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from database import TourCatalog
+
+VERSION = 7
+DESCRIPTION = "tour_catalog read model (fill it with python -m tour.catalog)"
+
+
+async def upgrade(engine: AsyncEngine) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(TourCatalog.__table__.create, checkfirst=True)
@@ -0,0 +1,12 @@
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from database import RevenueDailyManager, RevenueDailyPayment, RevenueDailyTour
+
+VERSION = 8
+DESCRIPTION = "revenue rollup tables (fill them with python -m order.stats)"
+
+
+async def upgrade(engine: AsyncEngine) -> None:
+    async with engine.begin() as conn:
+        for model in (RevenueDailyTour, RevenueDailyManager, RevenueDailyPayment):
+            await conn.run_sync(model.__table__.create, checkfirst=True)
@@ -0,0 +1,35 @@
+from sqlalchemy import delete, inspect, insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.schema import CreateColumn
+
+from database import TourCatalog
+from tour.catalog import CATALOG_COLUMNS, catalog_select
+
+VERSION = 9
+DESCRIPTION = "tour_catalog join flags and transport route/dates, then refill it"
+
+NEW_COLUMNS = [
+    "has_hotel",
+    "has_transfer",
+    "has_transport",
+    "transport_from_location",
+    "transport_to_location",
+    "transport_from_date",
+    "transport_to_date",
+]
+
+
+async def upgrade(engine: AsyncEngine) -> None:
+    async with engine.begin() as conn:
+        existing = await conn.run_sync(
+            lambda sync_conn: {c["name"] for c in inspect(sync_conn).get_columns("tour_catalog")}
+        )
+        for name in NEW_COLUMNS:
+            if name not in existing:
+                ddl = CreateColumn(TourCatalog.__table__.c[name]).compile(dialect=conn.dialect)
+                await conn.exec_driver_sql(f"ALTER TABLE tour_catalog ADD COLUMN {ddl}")
+
+    # One transaction: readers keep the old rows until the new ones are complete
+    async with engine.begin() as conn:
+        await conn.execute(delete(TourCatalog))
+        await conn.execute(insert(TourCatalog).from_select(CATALOG_COLUMNS, catalog_select()))
@@ -0,0 +1,22 @@
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from database import (
+    RevenueDailyManagerRebuild,
+    RevenueDailyPaymentRebuild,
+    RevenueDailyTourRebuild,
+    RollupRebuild,
+)
+
+VERSION = 10
+DESCRIPTION = "staging and progress tables for rebuilding the revenue rollups online"
+
+
+async def upgrade(engine: AsyncEngine) -> None:
+    async with engine.begin() as conn:
+        for model in (
+            RevenueDailyTourRebuild,
+            RevenueDailyManagerRebuild,
+            RevenueDailyPaymentRebuild,
+            RollupRebuild,
+        ):
+            await conn.run_sync(model.__table__.create, checkfirst=True)
@@ -1,41 +1,209 @@
+from datetime import datetime, time, timedelta
+from typing import Annotated
+
 from db_helper import db_helper
-from fastapi import Depends
+from fastapi import Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from database import Orders
-from schemas import SOrders, STours, SCustomers, SManagers
-from dependencies import (
-    get_tours_dependency,
-    get_managers_dependency,
-    get_customers_dependency,
+from sqlalchemy import insert, literal, select, text, union_all
+from sqlalchemy.orm import contains_eager
+from database import Orders, Customers, Managers, TourCatalog
+from schemas import SOrders, SOrdersAdd, SOrdersFilter, SPage, STours
+from pagination import NullsAs, PageParams, page_params, paginate
+from tour.catalog import catalog_to_schema
+from order.stats import apply_rollup_changes, order_rollup_keys
+from trusted import TrustedSchema, customer_public_schema, manager_schema
+
+
+class InvalidOrderReferences(ValueError):
+    """Orders of a batch that point at customers, tours or managers that do not exist"""
+
+    def __init__(self, errors: list[dict]):
+        super().__init__(f"{len(errors)} invalid reference(s)")
+        self.errors = errors
+
+
+def _tour(order: Orders) -> STours | None:
+    return catalog_to_schema(order.tour_catalog) if order.tour_catalog else None
+
+
+def _total_amount(order: Orders) -> int:
+    return order.tour_catalog.total_cost if order.tour_catalog else 0
+
+
+def _payment_status(order: Orders) -> int | None:
+    # Stored as a boolean, served as 0/1
+    return None if order.payment_status is None else int(order.payment_status)
+
+
+# Orders row with eagerly joined customer, manager and catalog tour -> SOrders
+order_to_schema = TrustedSchema(
+    SOrders,
+    total_amount=_total_amount,
+    payment_status=_payment_status,
+    customer=customer_public_schema.optional("customer"),
+    tour=_tour,
+    manager=manager_schema.optional("manager"),
 )
 
 
+# Orders without a date sort (and page) as the oldest; 1000-01-01 is the
+# smallest MySQL DATETIME
+NULL_ORDER_DATE = NullsAs(Orders.order_date, datetime(1000, 1, 1))
+
+
+def order_filters(filters: Annotated[SOrdersFilter, Query()]) -> SOrdersFilter:
+    """Dependency to read orders report filters from the query string"""
+    return filters
+
+
+def apply_order_filters(stmt, filters: SOrdersFilter):
+    if filters.customer_id is not None:
+        stmt = stmt.where(Orders.customer_id == filters.customer_id)
+    if filters.manager_id is not None:
+        stmt = stmt.where(Orders.manager_id == filters.manager_id)
+    if filters.payment_status is not None:
+        stmt = stmt.where(Orders.payment_status == filters.payment_status)
+    if filters.date_from:
+        stmt = stmt.where(Orders.order_date >= datetime.combine(filters.date_from, time.min))
+    if filters.date_to:
+        day_after = datetime.combine(filters.date_to + timedelta(days=1), time.min)
+        stmt = stmt.where(Orders.order_date < day_after)
+    return stmt
+
+
+def orders_report_query(filters: SOrdersFilter):
+    """Single SELECT of orders joined to customer, manager and tour cost, with filters applied"""
+    stmt = (
+        select(Orders)
+        .outerjoin(Orders.customer)
+        .outerjoin(Orders.manager)
+        .outerjoin(Orders.tour_catalog)
+        .options(
+            contains_eager(Orders.customer),
+            contains_eager(Orders.manager),
+            contains_eager(Orders.tour_catalog),
+        )
+    )
+    return apply_order_filters(stmt, filters)
+
+
+def orders_export_query(filters: SOrdersFilter):
+    """Flat column SELECT of the orders report for streaming exports"""
+    stmt = (
+        select(
+            Orders.id.label("order_id"),
+            Orders.order_date,
+            Orders.payment_status,
+            Orders.customer_id,
+            Customers.name.label("customer_name"),
+            Customers.surname.label("customer_surname"),
+            Customers.email.label("customer_email"),
+            Orders.manager_id,
+            Managers.email.label("manager_email"),
+            Orders.tour_id,
+            TourCatalog.name.label("tour_name"),
+            TourCatalog.total_cost,
+        )
+        .select_from(Orders)
+        .outerjoin(Customers, Customers.id == Orders.customer_id)
+        .outerjoin(Managers, Managers.id == Orders.manager_id)
+        .outerjoin(TourCatalog, TourCatalog.id == Orders.tour_id)
+        .order_by(Orders.id)
+    )
+    return apply_order_filters(stmt, filters)
+
+
 async def get_orders(
-    tours: list[STours] = Depends(get_tours_dependency),
-    managers: list[SManagers] = Depends(get_managers_dependency),
-    customers: list[SCustomers] = Depends(get_customers_dependency),
-    session: AsyncSession = Depends(db_helper.session_dependency),
-) -> list[SOrders]:
-    """Fetch all orders from the database"""
-    orders = await session.execute(select(Orders))
-    orders = orders.scalars().all()
-    orders_schemas = [SOrders.model_validate(order) for order in orders]
-    for order_schema in orders_schemas:
-        if order_schema.tour_id:
-            for tour in tours:
-                if tour.id == order_schema.tour_id:
-                    order_schema.tour = tour
-                    break
-        if order_schema.manager_id:
-            for mgr in managers:
-                if mgr.id == order_schema.manager_id:
-                    order_schema.manager = mgr
-                    break
-        if order_schema.customer_id:
-            for cust in customers:
-                if cust.id == order_schema.customer_id:
-                    order_schema.customer = cust
-                    break
-        order_schema.total_amount = order_schema.tour.total_cost if order_schema.tour else 0
-    return orders_schemas
+    filters: SOrdersFilter = Depends(order_filters),
+    page: PageParams = Depends(page_params),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
+) -> SPage[SOrders]:
+    """Fetch one page of the orders report"""
+    sort_keys = [NULL_ORDER_DATE] if filters.sort == "order_date" else []
+    return await paginate(
+        session,
+        orders_report_query(filters),
+        page,
+        Orders.id,
+        sort_keys=sort_keys,
+        descending=filters.direction == "desc",
+        to_schema=order_to_schema,
+        entities=True,
+    )
+
+
+async def _existing_references(session: AsyncSession, orders: list[SOrdersAdd]) -> dict:
+    """Ids that exist among those referenced by `orders`, and tour prices, in one query"""
+    wanted = {
+        field: {getattr(order, field) for order in orders} - {None}
+        for field in ("customer_id", "tour_id", "manager_id")
+    }
+    parts = [
+        select(literal(field), model.id, price).where(model.id.in_(ids))
+        for field, model, price in (
+            ("customer_id", Customers, literal(0)),
+            ("tour_id", TourCatalog, TourCatalog.total_cost),
+            ("manager_id", Managers, literal(0)),
+        )
+        if (ids := wanted[field])
+    ]
+    found = {field: {} for field in wanted}
+    if parts:
+        for field, id_, price in await session.execute(union_all(*parts)):
+            found[field][id_] = price
+    return found
+
+
+async def add_orders(orders: list[SOrdersAdd], session: AsyncSession) -> list[int]:
+    """Insert a batch of orders with a constant number of statements.
+
+    Every referenced customer, tour and manager is checked in one query and
+    InvalidOrderReferences lists the ones that do not exist; nothing is
+    written then. Orders without an amount are priced from tour_catalog,
+    rows go in multi-row INSERTs whose RETURNING ids SQLAlchemy ties back
+    to their input rows (one INSERT per row on SQLite, which cannot do that
+    in a batch, and on MySQL servers with auto_increment_increment above 1)
+    and the rollups get one upsert per table. Returns the new ids in input order.
+    """
+    found = await _existing_references(session, orders)
+    errors = [
+        {"index": index, "field": field, "value": value}
+        for index, order in enumerate(orders)
+        for field in ("customer_id", "tour_id", "manager_id")
+        if (value := getattr(order, field)) is not None and value not in found[field]
+    ]
+    if errors:
+        raise InvalidOrderReferences(errors)
+
+    orders = [
+        order if order.total_amount is not None
+        else order.model_copy(update={"total_amount": found["tour_id"].get(order.tour_id, 0)})
+        for order in orders
+    ]
+    rows = [{**order.model_dump(), "payment_status": bool(order.payment_status)} for order in orders]
+
+    ids = await _insert_orders(session, rows)
+    added = [order_rollup_keys(order, order_id) for order_id, order in zip(ids, orders)]
+    await apply_rollup_changes(session, [], added)
+    return ids
+
+
+async def _insert_orders(session: AsyncSession, rows: list[dict]) -> list[int]:
+    """INSERT `rows` into orders and return their ids in input order"""
+    table = Orders.__table__
+    if session.get_bind().dialect.insert_returning:
+        # RETURNING rows come back in no guaranteed order; sort_by_parameter_order
+        # has SQLAlchemy match each id to the parameter set it was inserted from
+        result = await session.execute(
+            insert(Orders).returning(Orders.id, sort_by_parameter_order=True), rows
+        )
+        return list(result.scalars())
+
+    # MySQL gives the rows of one multi-row INSERT consecutive ids starting at
+    # lastrowid, but only when auto_increment_increment is 1 (Galera and
+    # multi-primary setups raise it); otherwise insert one row at a time
+    increment = await session.scalar(text("SELECT @@auto_increment_increment"))
+    if increment == 1:
+        result = await session.execute(insert(table).values(rows))
+        return list(range(result.lastrowid, result.lastrowid + len(rows)))
+    return [(await session.execute(insert(table).values(row))).lastrowid for row in rows]
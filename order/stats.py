@@ -0,0 +1,315 @@
+import asyncio
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import date, datetime
+
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import (
+    Orders,
+    RevenueDailyManager,
+    RevenueDailyManagerRebuild,
+    RevenueDailyPayment,
+    RevenueDailyPaymentRebuild,
+    RevenueDailyTour,
+    RevenueDailyTourRebuild,
+    RollupRebuild,
+    TourCatalog,
+)
+from db_helper import db_helper
+from schemas import SRevenueStat
+from settings import ROLLUP_BACKFILL_BATCH_SIZE
+
+# rollup model -> name of its key column besides `day`
+ROLLUPS = {
+    RevenueDailyTour: "tour_id",
+    RevenueDailyManager: "manager_id",
+    RevenueDailyPayment: "payment_status",
+}
+# rollup model -> staging table backfill_rollups builds it in
+STAGING = {
+    RevenueDailyTour: RevenueDailyTourRebuild,
+    RevenueDailyManager: RevenueDailyManagerRebuild,
+    RevenueDailyPayment: RevenueDailyPaymentRebuild,
+}
+
+
+def order_day(order_date) -> date | None:
+    """Day an order counts towards; order_date may be a datetime or an ISO string
+    (unsaved orders built from form data)"""
+    if not order_date:
+        return None
+    if isinstance(order_date, datetime):
+        return order_date.date()
+    return datetime.fromisoformat(str(order_date)).date()
+
+
+def order_rollup_keys(order, order_id: int | None = None) -> dict | None:
+    """Snapshot of the order fields the rollups are keyed on; `order_id`
+    for orders (schemas) that do not carry their id"""
+    day = order_day(order.order_date)
+    if day is None:
+        return None
+    return {
+        "order_id": order.id if order_id is None else order_id,
+        "day": day,
+        "tour_id": order.tour_id or 0,
+        "manager_id": order.manager_id or 0,
+        "payment_status": bool(order.payment_status),
+        "amount": order.total_amount or 0,
+    }
+
+
+def _upsert_increment(dialect: str, model, key: str):
+    """INSERT ... ON DUPLICATE KEY / ON CONFLICT that adds to the existing counters"""
+    table = model.__table__
+    if dialect == "mysql":
+        stmt = mysql.insert(table)
+        new = stmt.inserted
+        return stmt.on_duplicate_key_update(
+            orders_count=table.c.orders_count + new.orders_count,
+            revenue=table.c.revenue + new.revenue,
+        )
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    stmt = insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=["day", key],
+        set_={
+            "orders_count": table.c.orders_count + stmt.excluded.orders_count,
+            "revenue": table.c.revenue + stmt.excluded.revenue,
+        },
+    )
+
+
+async def add_to_rollups(session: AsyncSession, deltas: dict, staging: bool = False) -> None:
+    """Apply `{(day, tour_id, manager_id, paid): [orders, revenue]}` to every
+    rollup, or to their staging tables"""
+    if not deltas:
+        return
+    dialect = session.get_bind().dialect.name
+    for live, key in ROLLUPS.items():
+        model = STAGING[live] if staging else live
+        grouped = defaultdict(lambda: [0, 0])
+        for (day, tour_id, manager_id, paid), (count, revenue) in deltas.items():
+            value = {"tour_id": tour_id, "manager_id": manager_id, "payment_status": paid}[key]
+            grouped[(day, value)][0] += count
+            grouped[(day, value)][1] += revenue
+        rows = [
+            {"day": day, key: value, "orders_count": count, "revenue": revenue}
+            for (day, value), (count, revenue) in grouped.items()
+            if count or revenue
+        ]
+        if rows:
+            await session.execute(_upsert_increment(dialect, model, key), rows)
+
+
+def rollup_deltas(orders: Iterable[dict | None], sign: int = 1, deltas: dict | None = None) -> dict:
+    """Add `sign` times every order's rollup keys (see order_rollup_keys) to
+    `deltas`, the `{(day, tour_id, manager_id, paid): [orders, revenue]}`
+    mapping add_to_rollups takes; orders without keys are skipped"""
+    if deltas is None:
+        deltas = defaultdict(lambda: [0, 0])
+    for keys in orders:
+        if keys:
+            group = (keys["day"], keys["tour_id"], keys["manager_id"], keys["payment_status"])
+            deltas[group][0] += sign
+            deltas[group][1] += sign * keys["amount"]
+    return deltas
+
+
+async def apply_rollup_changes(
+    session: AsyncSession, removed: Iterable[dict | None], added: Iterable[dict | None]
+) -> None:
+    """Take the `removed` rollup keys out of the rollups and add the `added` ones.
+
+    While backfill_rollups runs, changes to orders it has already counted
+    go to its staging tables as well. The progress row is read with a
+    shared lock held until commit, so a rebuild batch waits for this
+    transaction instead of reading the order before it changes.
+    """
+    removed, added = list(removed), list(added)
+    progress = await session.execute(
+        select(RollupRebuild.scanned_upto).where(RollupRebuild.id == 1).with_for_update(read=True)
+    )
+    progress = progress.first()
+
+    deltas = rollup_deltas(added, 1, rollup_deltas(removed, -1))
+    await add_to_rollups(session, {k: v for k, v in deltas.items() if v != [0, 0]})
+    if progress is not None:
+        upto = progress.scanned_upto
+
+        def counted(keys):
+            return keys is not None and (upto is None or keys["order_id"] <= upto)
+
+        staged = rollup_deltas(filter(counted, added), 1, rollup_deltas(filter(counted, removed), -1))
+        await add_to_rollups(session, {k: v for k, v in staged.items() if v != [0, 0]}, staging=True)
+
+
+async def record_order_change(
+    session: AsyncSession, old: dict | None, new: dict | None
+) -> None:
+    """Move an order's contribution from its `old` rollup keys to its `new` ones"""
+    await apply_rollup_changes(session, [old], [new])
+
+
+async def tour_price(session: AsyncSession, tour_id: int | None) -> int:
+    """Current total cost of a tour, used to price orders created without an amount"""
+    if not tour_id:
+        return 0
+    total = await session.execute(
+        select(TourCatalog.total_cost).where(TourCatalog.id == tour_id)
+    )
+    return total.scalar_one_or_none() or 0
+
+
+async def get_revenue_stats(
+    session: AsyncSession,
+    group_by: str,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    limit: int = 100,
+) -> list[SRevenueStat]:
+    """Aggregate a rollup table by day, tour, manager or payment status"""
+    if group_by == "day":
+        model, key_column = RevenueDailyPayment, RevenueDailyPayment.day
+    else:
+        model = next(m for m, key in ROLLUPS.items() if key == group_by)
+        key_column = getattr(model, group_by)
+
+    orders_count = func.sum(model.orders_count).label("orders_count")
+    revenue = func.sum(model.revenue).label("revenue")
+    stmt = (
+        select(key_column, orders_count, revenue)
+        .group_by(key_column)
+        .having(orders_count > 0)
+    )
+    if date_from:
+        stmt = stmt.where(model.day >= date_from)
+    if date_to:
+        stmt = stmt.where(model.day <= date_to)
+    if group_by == "day":
+        stmt = stmt.order_by(key_column)
+    else:
+        stmt = stmt.order_by(revenue.desc())
+    rows = await session.execute(stmt.limit(limit))
+    return [
+        SRevenueStat(
+            **{group_by: key}, orders_count=count or 0, revenue=total or 0
+        )
+        for key, count, total in rows.all()
+    ]
+
+
+async def _next_batch_end(session: AsyncSession, last_id: int, batch_size: int) -> int | None:
+    """Id of the `batch_size`-th order after `last_id`; None when fewer are left"""
+    end = await session.execute(
+        select(Orders.id)
+        .where(Orders.id > last_id)
+        .order_by(Orders.id)
+        .offset(batch_size - 1)
+        .limit(1)
+    )
+    return end.scalar_one_or_none()
+
+
+async def backfill_rollups(session: AsyncSession, batch_size: int) -> int:
+    """Rebuild every rollup from the orders table while orders keep changing.
+
+    The staging tables are filled `batch_size` orders at a time, in id
+    order, one transaction per batch, with the last counted id kept in
+    rollup_rebuild. Each batch first moves that mark, which waits for
+    order writes in flight (see apply_rollup_changes); writes after it
+    update the staging tables for orders it covers. A last short
+    transaction replaces the rollups with the staging rows, so
+    /order/stats serves the old totals until then. Run one at a time.
+    """
+    await session.execute(delete(RollupRebuild))
+    for staging in STAGING.values():
+        await session.execute(delete(staging))
+    await session.execute(insert(RollupRebuild).values(id=1, scanned_upto=0))
+    end = await _next_batch_end(session, 0, batch_size)
+    await session.commit()
+
+    last_id, processed = 0, 0
+    while True:
+        # Lock the mark before reading the batch; NULL covers every later order
+        await session.execute(
+            update(RollupRebuild).where(RollupRebuild.id == 1).values(scanned_upto=end)
+        )
+        stmt = (
+            select(
+                Orders.id,
+                Orders.order_date,
+                Orders.tour_id,
+                Orders.manager_id,
+                Orders.payment_status,
+                Orders.total_amount,
+                TourCatalog.total_cost,
+            )
+            .outerjoin(TourCatalog, TourCatalog.id == Orders.tour_id)
+            .where(Orders.id > last_id)
+            .order_by(Orders.id)
+        )
+        if end is not None:
+            stmt = stmt.where(Orders.id <= end)
+        batch = (await session.execute(stmt)).all()
+
+        deltas = defaultdict(lambda: [0, 0])
+        unpriced = {}
+        for row in batch:
+            amount = row.total_amount
+            if amount is None:
+                # Freeze the price so later updates subtract what was added
+                amount = unpriced[row.id] = row.total_cost or 0
+            day = order_day(row.order_date)
+            if day is None:
+                continue
+            group = (day, row.tour_id or 0, row.manager_id or 0, bool(row.payment_status))
+            deltas[group][0] += 1
+            deltas[group][1] += amount
+
+        if unpriced:
+            orders = Orders.__table__
+            await session.execute(
+                orders.update()
+                .where(orders.c.id == bindparam("order_id"))
+                .values(total_amount=bindparam("amount")),
+                [{"order_id": k, "amount": v} for k, v in unpriced.items()],
+            )
+        await add_to_rollups(session, deltas, staging=True)
+        processed += len(batch)
+        if end is None:
+            await session.commit()
+            break
+        last_id = end
+        end = await _next_batch_end(session, last_id, batch_size)
+        await session.commit()
+
+    # Dropping the progress row first waits for writes still updating staging
+    await session.execute(delete(RollupRebuild))
+    for live, staging in STAGING.items():
+        columns = ["day", ROLLUPS[live], "orders_count", "revenue"]
+        await session.execute(delete(live))
+        await session.execute(
+            insert(live).from_select(columns, select(*[staging.__table__.c[c] for c in columns]))
+        )
+        await session.execute(delete(staging))
+    await session.commit()
+    return processed
+
+
+async def main():
+    """Create missing rollup tables and rebuild them from order history"""
+    async with db_helper.engine.begin() as conn:
+        for model in [*ROLLUPS, *STAGING.values(), RollupRebuild]:
+            await conn.run_sync(model.__table__.create, checkfirst=True)
+    async with db_helper.async_session() as session:
+        processed = await backfill_rollups(session, ROLLUP_BACKFILL_BATCH_SIZE)
+    await db_helper.engine.dispose()
+    print(f"revenue rollups rebuilt from {processed} orders")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
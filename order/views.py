@@ -1,22 +1,90 @@
-from fastapi import APIRouter, Depends, Request
+from datetime import date
+from typing import Annotated, Literal
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from db_helper import db_helper
 from database import Orders
-from starlette.templating import Jinja2Templates
-from schemas import SOrders, SOrdersAdd, STours
-from order.crud import get_orders
-
-templates = Jinja2Templates(directory="templates")
+from templating import templates
+from schemas import SOrderBatchResult, SOrders, SOrdersAdd, SOrdersFilter, STours, SPage, SRevenueStat
+from order.crud import InvalidOrderReferences, add_orders, get_orders, order_filters, orders_export_query
+from export import ExportFormat, export_response
+from order.stats import get_revenue_stats
+from settings import ORDER_BATCH_MAX_SIZE
 
 router = APIRouter(tags=["orders"])
 
 
 @router.get("/")
 async def read_orders(
-    request: Request, orders_list: list[SOrders] = Depends(get_orders)
+    request: Request, orders_page: SPage[SOrders] = Depends(get_orders)
 ):
 
     return templates.TemplateResponse(
-        "order.html", {"request": request, "orders": orders_list}
+        "order.html",
+        {
+            "request": request,
+            "orders": orders_page.items,
+            "next_cursor": orders_page.next_cursor,
+            "prev_cursor": orders_page.prev_cursor,
+            "limit": orders_page.limit,
+        },
+    )
+
+
+@router.get("/report/", response_model=SPage[SOrders])
+async def read_orders_report(orders_page: SPage[SOrders] = Depends(get_orders)):
+    """Orders report as JSON, with the same filters and cursors as the HTML page"""
+    return orders_page
+
+
+@router.post("/batch", response_model=SOrderBatchResult)
+async def create_orders_batch(
+    orders: Annotated[list[SOrdersAdd], Body(min_length=1, max_length=ORDER_BATCH_MAX_SIZE)],
+    session: AsyncSession = Depends(db_helper.session_dependency),
+):
+    """Create many orders in one transaction; all or nothing"""
+    try:
+        ids = await add_orders(orders, session)
+    except InvalidOrderReferences as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=e.errors
+        )
+    await session.commit()
+    return SOrderBatchResult(ids=ids)
+
+
+@router.get("/export")
+async def export_orders(
+    filters: SOrdersFilter = Depends(order_filters),
+    format: ExportFormat = "csv",
+):
+    """Stream every order matching the filters as CSV or NDJSON"""
+    return export_response(orders_export_query(filters), "orders", format)
+
+
+STATS_GROUPS = {
+    "daily": "day",
+    "tours": "tour_id",
+    "managers": "manager_id",
+    "payments": "payment_status",
+}
+
+
+@router.get(
+    "/stats/{group}",
+    response_model=list[SRevenueStat],
+    response_model_exclude_none=True,
+)
+async def read_order_stats(
+    group: Literal["daily", "tours", "managers", "payments"],
+    date_from: date | None = None,
+    date_to: date | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
+):
+    """Orders count and revenue from the rollup tables, grouped by day, tour, manager or payment status"""
+    return await get_revenue_stats(
+        session, STATS_GROUPS[group], date_from, date_to, limit
     )
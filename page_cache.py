@@ -0,0 +1,144 @@
+import gzip
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+
+from cache import TTLCache
+from conditional import ConditionalPage
+from data_version import data_versions
+from db_helper import primary_reads
+from settings import (
+    PAGE_CACHE_BROTLI_QUALITY,
+    PAGE_CACHE_GZIP_LEVEL,
+    PAGE_CACHE_MAXSIZE,
+    PAGE_CACHE_TTL,
+)
+
+try:
+    import brotli
+except ImportError:  # optional, see the "brotli" extra in pyproject.toml
+    brotli = None
+
+# Most preferred first
+ENCODINGS = ("br", "gzip") if brotli else ("gzip",)
+_SKIPPED_HEADERS = {b"content-length", b"content-encoding", b"vary"}
+
+
+class CachedPage:
+    """Rendered response with its body precompressed in every supported encoding"""
+
+    __slots__ = ("headers", "bodies")
+
+    def __init__(self, headers: list[tuple[bytes, bytes]], body: bytes):
+        self.headers = [(k, v) for k, v in headers if k.lower() not in _SKIPPED_HEADERS]
+        self.bodies = {None: body, "gzip": gzip.compress(body, PAGE_CACHE_GZIP_LEVEL, mtime=0)}
+        if brotli:
+            self.bodies["br"] = brotli.compress(body, quality=PAGE_CACHE_BROTLI_QUALITY)
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """Best of ENCODINGS the client accepts (q > 0), or None for identity"""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    for encoding in ENCODINGS:
+        if accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+
+class PageCacheMiddleware:
+    """Pure ASGI middleware serving registered anonymous pages from memory.
+
+    Entries are keyed by path, query string and the pages' data versions,
+    so a catalog write makes the next request render afresh and old
+    entries age out of the LRU. Misses render from the primary, where the
+    versions are read, so a lagging replica cannot store an old page under
+    a new key. Only 200 HTML responses without cookies are stored.
+    X-Page-Cache says whether a response was a hit.
+    """
+
+    def __init__(self, app, pages: list[ConditionalPage], cache: TTLCache | None = None):
+        self.app = app
+        self.pages = [page for page in pages if not page.personal]
+        self.cache = cache or page_cache
+
+    def _match(self, path: str) -> ConditionalPage | None:
+        for page in self.pages:
+            if page.regex.match(path):
+                return page
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            return await self.app(scope, receive, send)
+        page = self._match(scope["path"])
+        if page is None:
+            return await self.app(scope, receive, send)
+
+        versions = await data_versions.get(*page.entities)
+        key = "{}?{}|{}".format(
+            scope["path"],
+            scope["query_string"].decode("latin-1"),
+            ",".join(str(versions[entity][0]) for entity in page.entities),
+        )
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+
+        entry = self.cache.get(key)
+        if entry is not None:
+            return await self._send(entry, encoding, scope["method"], send, b"hit")
+
+        start, chunks = None, []
+
+        async def capture(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            else:
+                chunks.append(message.get("body", b""))
+
+        with primary_reads():
+            await self.app(scope, receive, capture)
+        headers = Headers(raw=start["headers"])
+        body = b"".join(chunks)
+        if (
+            start["status"] == 200
+            and scope["method"] == "GET"
+            and headers.get("content-type", "").startswith("text/html")
+            and "set-cookie" not in headers
+        ):
+            # Compression takes milliseconds on large pages; keep it off the event loop
+            entry = await run_in_threadpool(CachedPage, start["headers"], body)
+            self.cache.set(key, entry)
+            return await self._send(entry, encoding, "GET", send, b"miss")
+
+        await send(start)
+        await send({"type": "http.response.body", "body": body})
+
+    @staticmethod
+    async def _send(entry: CachedPage, encoding: str | None, method: str, send, status: bytes):
+        body = entry.bodies.get(encoding)
+        if body is None:
+            encoding, body = None, entry.bodies[None]
+        headers = [
+            *entry.headers,
+            (b"content-length", str(len(body)).encode()),
+            (b"vary", b"Accept-Encoding"),
+            (b"x-page-cache", status),
+        ]
+        if encoding:
+            headers.append((b"content-encoding", encoding.encode()))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": body if method == "GET" else b""})
+
+
+page_cache = TTLCache(maxsize=PAGE_CACHE_MAXSIZE, ttl=PAGE_CACHE_TTL)
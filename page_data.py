@@ -0,0 +1,28 @@
+import asyncio
+from typing import Any, Awaitable, Callable
+
+from db_helper import db_helper
+from settings import PAGE_QUERY_CONCURRENCY
+
+Query = tuple[Callable[..., Awaitable[Any]], ...]
+
+
+async def load_page_data(**queries: Query) -> dict[str, Any]:
+    """Run independent read helpers concurrently, each on its own session.
+
+    Every keyword maps a result name to `(crud_function, *args)`; the
+    function is called as `crud_function(*args, session)`. At most
+    PAGE_QUERY_CONCURRENCY sessions are open at once for a single call so
+    one page cannot take over the whole connection pool. Sessions come from
+    `db_helper.read_session()`, so they use a replica unless this request
+    just committed a write.
+    """
+    semaphore = asyncio.Semaphore(PAGE_QUERY_CONCURRENCY)
+
+    async def run(fn, *args):
+        async with semaphore:
+            async with db_helper.read_session() as session:
+                return await fn(*args, session)
+
+    results = await asyncio.gather(*[run(*query) for query in queries.values()])
+    return dict(zip(queries.keys(), results))
@@ -0,0 +1,174 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Sequence
+
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel
+from sqlalchemy import Select, func, literal, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from schemas import SPage
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class PageParams(BaseModel):
+    cursor: str | None = None
+    limit: int = DEFAULT_PAGE_SIZE
+
+
+def page_params(
+    cursor: str | None = Query(None, description="Opaque cursor from a previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+) -> PageParams:
+    """Dependency to read cursor pagination parameters from the query string"""
+    return PageParams(cursor=cursor, limit=limit)
+
+
+class NullsAs:
+    """Sort key for a nullable column that sorts and seeks NULL as `sentinel`.
+
+    A row-value comparison against NULL is NULL, so a page ending on a NULL
+    key would otherwise seek to nothing. The sentinel must sort before (or
+    after) every real value and survive the cursor round trip.
+    """
+
+    def __init__(self, column, sentinel: Any):
+        self.column = column
+        self.sentinel = sentinel
+        self.key = column.key
+        self.expression = func.coalesce(column, literal(sentinel, column.type))
+
+    def value(self, row) -> Any:
+        value = getattr(row, self.key)
+        return self.sentinel if value is None else value
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(values: Sequence[Any], direction: str) -> str:
+    """Pack the sort key values of a boundary row into an opaque cursor"""
+    payload = {"k": [_encode_value(v) for v in values], "d": direction}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def key_type(key) -> type | None:
+    """Python type of a sort key's values, None if the column type has none"""
+    column_type = (key.column if isinstance(key, NullsAs) else key).type
+    # A TypeDecorator reports `object`; its values are those of the type it wraps
+    column_type = getattr(column_type, "impl_instance", column_type)
+    try:
+        return column_type.python_type
+    except NotImplementedError:
+        return None
+
+
+def _has_type(value: Any, expected: type | None) -> bool:
+    if expected is None:
+        return True
+    # JSON true/false decode to bool, which is also an int
+    if isinstance(value, bool) and expected is not bool:
+        return False
+    return isinstance(value, expected)
+
+
+def decode_cursor(cursor: str, key_types: Sequence[type | None]) -> tuple[list[Any], str]:
+    """Unpack a cursor, raising 400 if it is malformed or built for another sort.
+
+    `key_types` are the Python types of the sort keys, see `key_type`; a
+    value of another type would fail in the database or seek to a wrong page.
+    """
+    invalid = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+    )
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = [_decode_value(v) for v in payload["k"]]
+        direction = payload["d"]
+    except (ValueError, KeyError, TypeError):
+        raise invalid
+    if len(values) != len(key_types) or direction not in ("next", "prev"):
+        raise invalid
+    if not all(_has_type(v, t) for v, t in zip(values, key_types)):
+        raise invalid
+    return values, direction
+
+
+async def paginate(
+    session: AsyncSession,
+    stmt: Select,
+    params: PageParams,
+    id_column,
+    sort_keys: Sequence = (),
+    descending: bool = False,
+    to_schema: Callable[[Any], Any] | None = None,
+    entities: bool = False,
+) -> SPage:
+    """Fetch one page of `stmt` by seeking on (sort_keys..., id) instead of OFFSET.
+
+    `id_column` is appended to the sort keys as a tie-breaker so the order is
+    total; every key is sorted in the same direction so the seek predicate
+    can be a single row-value comparison served by an index on those columns.
+    Pass `entities=True` when `stmt` selects one ORM entity to page over the
+    objects instead of result rows.
+    """
+    keys = [*sort_keys, id_column]
+    columns = [key.expression if isinstance(key, NullsAs) else key for key in keys]
+    backwards = False
+
+    if params.cursor:
+        values, direction = decode_cursor(params.cursor, [key_type(key) for key in keys])
+        backwards = direction == "prev"
+        # Walking back over a descending sort is an ascending seek and vice versa
+        seek_up = descending == backwards
+        boundary = tuple_(*columns)
+        seek = tuple_(*values)
+        stmt = stmt.where(boundary > seek if seek_up else boundary < seek)
+
+    scan_descending = descending != backwards
+    stmt = stmt.order_by(
+        *[column.desc() if scan_descending else column.asc() for column in columns]
+    )
+    stmt = stmt.limit(params.limit + 1)
+
+    result = (await session.execute(stmt)).unique()
+    rows = result.scalars().all() if entities else result.all()
+    has_more = len(rows) > params.limit
+    rows = list(rows[: params.limit])
+    if backwards:
+        rows.reverse()
+
+    def row_key(row) -> list[Any]:
+        return [
+            key.value(row) if isinstance(key, NullsAs) else getattr(row, key.key)
+            for key in keys
+        ]
+
+    next_cursor = prev_cursor = None
+    if rows:
+        if has_more or (backwards and params.cursor):
+            next_cursor = encode_cursor(row_key(rows[-1]), "next")
+        if (params.cursor and not backwards) or (backwards and has_more):
+            prev_cursor = encode_cursor(row_key(rows[0]), "prev")
+
+    items = [to_schema(row) for row in rows] if to_schema else rows
+    return SPage(
+        items=items,
+        next_cursor=next_cursor,
+        prev_cursor=prev_cursor,
+        limit=params.limit,
+    )
@@ -0,0 +1,112 @@
+import asyncio
+import base64
+import hashlib
+import os
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+
+from settings import (
+    PASSWORD_HASH_MAX_PENDING,
+    PASSWORD_HASH_WORKERS,
+    PASSWORD_SCRYPT_N,
+    PASSWORD_SCRYPT_P,
+    PASSWORD_SCRYPT_R,
+)
+
+SCHEME = "scrypt"
+KEY_LENGTH = 32
+SALT_LENGTH = 16
+
+# hashlib.scrypt releases the GIL, so threads give real parallelism and the
+# event loop keeps serving other requests while a hash is computed.
+# More workers than cores would only take CPU time away from the event loop.
+# PASSWORD_HASH_WORKERS = 0 hashes inline (only useful for comparisons).
+_executor = (
+    ThreadPoolExecutor(
+        max_workers=min(PASSWORD_HASH_WORKERS, os.cpu_count() or 1),
+        thread_name_prefix="passwords",
+    )
+    if PASSWORD_HASH_WORKERS
+    else None
+)
+_pending = 0
+
+
+class PasswordHasherBusy(Exception):
+    """Too many hashes are already queued; the caller should retry later"""
+
+
+def _b64(raw: bytes) -> str:
+    return base64.b64encode(raw).decode()
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        password.encode(),
+        salt=salt,
+        n=n,
+        r=r,
+        p=p,
+        dklen=KEY_LENGTH,
+        maxmem=128 * n * r * p + 1024 * 1024,
+    )
+
+
+def _hash_sync(password: str) -> str:
+    salt = secrets.token_bytes(SALT_LENGTH)
+    n, r, p = PASSWORD_SCRYPT_N, PASSWORD_SCRYPT_R, PASSWORD_SCRYPT_P
+    key = _scrypt(password, salt, n, r, p)
+    return f"{SCHEME}${n}${r}${p}${_b64(salt)}${_b64(key)}"
+
+
+def _verify_sync(password: str, stored: str) -> tuple[bool, bool]:
+    if not stored.startswith(SCHEME + "$"):
+        # Legacy row with a plaintext password
+        ok = secrets.compare_digest(password.encode(), stored.encode())
+        return ok, ok
+    try:
+        _, n, r, p, salt, key = stored.split("$")
+        n, r, p = int(n), int(r), int(p)
+        computed = _scrypt(password, base64.b64decode(salt), n, r, p)
+        ok = secrets.compare_digest(computed, base64.b64decode(key))
+    except ValueError:
+        # Corrupt row (wrong field count, bad base64, invalid cost): not a match
+        return False, False
+    outdated = (n, r, p) != (PASSWORD_SCRYPT_N, PASSWORD_SCRYPT_R, PASSWORD_SCRYPT_P)
+    return ok, ok and outdated
+
+
+async def _run(fn, *args):
+    global _pending
+    if _executor is None:
+        return fn(*args)
+    # Shed load instead of letting a login burst queue up unbounded work
+    if _pending >= PASSWORD_HASH_MAX_PENDING:
+        raise PasswordHasherBusy("Too many logins in progress, try again shortly")
+    _pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+    finally:
+        _pending -= 1
+
+
+async def hash_password(password: str) -> str:
+    """Hash a password with the current scrypt cost parameters"""
+    return await _run(_hash_sync, password)
+
+
+async def verify_password(password: str, stored: str | None) -> tuple[bool, bool]:
+    """Check a password against a stored hash.
+
+    Returns (matches, needs_rehash); needs_rehash is set for a correct
+    password stored in plaintext or with outdated cost parameters. With no
+    stored hash a dummy hash is checked so unknown emails take as long as
+    wrong passwords.
+    """
+    if stored is None:
+        await _run(_verify_sync, password, _DUMMY_HASH)
+        return False, False
+    return await _run(_verify_sync, password, stored)
+
+
+_DUMMY_HASH = _hash_sync(secrets.token_hex(8))
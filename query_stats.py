@@ -0,0 +1,182 @@
+import logging
+import os
+import re
+import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+from greenlet import getcurrent
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from settings import N_PLUS_ONE_THRESHOLD, QUERY_STATS_STRICT
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+_LIBRARY_DIRS = ("site-packages", "dist-packages", f"{os.sep}lib{os.sep}python")
+
+# `IN (?, ?, ?)` and `IN (%s, %s)` lists of any length have the same shape
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*,)+\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class NPlusOneDetected(AssertionError):
+    """Raised in strict mode when one statement shape repeats too often in a request"""
+
+
+class QueryStats:
+    """Statements executed in one request (or `query_budget` block), grouped by shape.
+
+    Stats nest: every statement also counts towards the enclosing stats, so
+    a budget around a whole ASGI call sees the queries of the request.
+    """
+
+    def __init__(self, parent: "QueryStats | None" = None):
+        self.parent = parent
+        self.count = 0
+        self.total_time = 0.0
+        self.shapes: dict[str, int] = {}
+        # shape -> call site where it crossed N_PLUS_ONE_THRESHOLD
+        self.repeated: dict[str, str] = {}
+
+    def record(self, shape: str, elapsed: float) -> None:
+        site = None
+        stats = self
+        while stats is not None:
+            stats.count += 1
+            stats.total_time += elapsed
+            seen = stats.shapes[shape] = stats.shapes.get(shape, 0) + 1
+            if seen == N_PLUS_ONE_THRESHOLD and not _batched.get():
+                site = site or _call_site()
+                stats.repeated[shape] = site
+                if stats is self:
+                    logger.warning(
+                        "Possible N+1: statement ran %d times from %s: %s",
+                        seen, site, shape[:200],
+                    )
+                if QUERY_STATS_STRICT:
+                    raise NPlusOneDetected(f"{shape[:200]} repeated from {site}")
+            stats = stats.parent
+
+    def report(self) -> str:
+        lines = [f"{self.count} statements in {self.total_time * 1000:.1f} ms"]
+        for shape, seen in sorted(self.shapes.items(), key=lambda item: -item[1]):
+            site = self.repeated.get(shape)
+            lines.append(f"  {seen}x {shape[:160]}" + (f"  <- {site}" if site else ""))
+        return "\n".join(lines)
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+_batched: ContextVar[bool] = ContextVar("query_stats_batched", default=False)
+
+
+def statement_shape(statement: str) -> str:
+    return _PLACEHOLDER_LIST.sub("(?)", _WHITESPACE.sub(" ", statement).strip())
+
+
+def _frames():
+    # Async SQLAlchemy runs the cursor in a child greenlet; the awaiting
+    # application coroutines are on the parent greenlet's stack
+    frame, current = sys._getframe(), getcurrent()
+    while True:
+        while frame is not None:
+            yield frame
+            frame = frame.f_back
+        current = current.parent
+        if current is None:
+            return
+        frame = current.gr_frame
+
+
+def _call_site() -> str:
+    """First project frame (outside this module) that led to the current statement"""
+    for frame in _frames():
+        filename = frame.f_code.co_filename
+        if (
+            filename.startswith(PROJECT_ROOT)
+            and filename != __file__
+            and not any(part in filename for part in _LIBRARY_DIRS)
+        ):
+            path = os.path.relpath(filename, PROJECT_ROOT)
+            return f"{path}:{frame.f_lineno} in {frame.f_code.co_name}"
+    return "unknown"
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current.get() is not None:
+        context._query_stats_started = perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = getattr(context, "_query_stats_started", None)
+    if stats is not None and started is not None:
+        stats.record(statement_shape(statement), perf_counter() - started)
+
+
+@contextmanager
+def collect_queries():
+    """Collect the statements run inside the block into a new QueryStats"""
+    stats = QueryStats(parent=_current.get())
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def batched_queries():
+    """Mark a deliberate loop of chunked statements (bulk imports) so it is
+    still counted but not reported as an N+1"""
+    token = _batched.set(True)
+    try:
+        yield
+    finally:
+        _batched.reset(token)
+
+
+@contextmanager
+def query_budget(max_queries: int, allow_repeated: bool = False):
+    """Test helper: fail if the block runs more than `max_queries` statements
+    or, unless `allow_repeated`, repeats a statement shape N_PLUS_ONE_THRESHOLD times.
+
+        with query_budget(3):
+            await client.get("/order/")
+    """
+    with collect_queries() as stats:
+        yield stats
+    if stats.count > max_queries:
+        raise AssertionError(f"Query budget {max_queries} exceeded: {stats.report()}")
+    if stats.repeated and not allow_repeated:
+        raise NPlusOneDetected(f"Repeated statements: {stats.report()}")
+
+
+class QueryStatsMiddleware:
+    """Pure ASGI middleware adding X-DB-Queries, X-DB-Time (ms) and, when a
+    statement shape repeated, X-DB-Repeated to every HTTP response"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        with collect_queries() as stats:
+
+            async def send_with_headers(message):
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-db-queries", str(stats.count).encode()))
+                    headers.append((b"x-db-time", f"{stats.total_time * 1000:.2f}".encode()))
+                    if stats.repeated:
+                        headers.append((b"x-db-repeated", str(len(stats.repeated)).encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_with_headers)
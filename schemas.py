@@ -1,6 +1,6 @@
-from typing import Optional
-from pydantic import BaseModel, EmailStr, ConfigDict
-from datetime import datetime
+from typing import Generic, Literal, Optional, TypeVar
+from pydantic import BaseModel, EmailStr, ConfigDict, field_validator
+from datetime import date, datetime
 
 
 class SToursAdd(BaseModel):
@@ -58,6 +58,8 @@ class STransferAdd(BaseModel):
 class STransfer(STransferAdd):
     model_config = ConfigDict(from_attributes=True)
     id: int
+    # Nullable columns: rows written outside the API (imports, SQL) may lack them
+    type: str | None
 
 
 class SHotelsAdd(BaseModel):
@@ -71,6 +73,9 @@ class SHotelsAdd(BaseModel):
 class SHotels(SHotelsAdd):
     model_config = ConfigDict(from_attributes=True)
     id: int
+    # Nullable columns
+    name: str | None
+    location: str | None
 
 
 class SCustomersAdd(BaseModel):
@@ -86,6 +91,36 @@ class SCustomersAdd(BaseModel):
 class SCustomers(SCustomersAdd):
     model_config = ConfigDict(from_attributes=True)
     id: int
+    # Nullable columns
+    name: str | None
+    surname: str | None
+    status: str | None
+    email: str | None
+    phone: str | None
+
+
+class SCustomerPublic(BaseModel):
+    """SCustomers without the password hash, as served by the JSON API"""
+
+    model_config = ConfigDict(from_attributes=True)
+    # Nullable columns
+    name: str | None
+    surname: str | None
+    status: str | None
+    email: str | None
+    phone: str | None
+    id: int
+
+
+class SCustomerIdentity(BaseModel):
+    """Customer fields carried in the signed login cookie"""
+
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    # Nullable in customers, so legacy rows may have neither
+    name: str | None
+    surname: str | None
+    email: str
 
 
 class SOrdersAdd(BaseModel):
@@ -100,11 +135,43 @@ class SOrdersAdd(BaseModel):
 class SOrders(SOrdersAdd):
     model_config = ConfigDict(from_attributes=True)
     id: int
-    customer: SCustomers | None = None
+    customer: SCustomerPublic | None = None
     tour: STours | None = None
     manager: SManagers | None = None
 
 
+class SOrderBatchResult(BaseModel):
+    ids: list[int]
+
+
+class SOrdersFilter(BaseModel):
+    customer_id: int | None = None
+    manager_id: int | None = None
+    payment_status: bool | None = None
+    date_from: date | None = None
+    date_to: date | None = None
+    sort: Literal["id", "order_date"] = "id"
+    direction: Literal["asc", "desc"] = "desc"
+
+    @field_validator(
+        "customer_id", "manager_id", "payment_status", "date_from", "date_to",
+        mode="before",
+    )
+    @classmethod
+    def empty_to_none(cls, value):
+        # Empty HTML form fields mean "no filter"
+        return None if value == "" else value
+
+
+class SRevenueStat(BaseModel):
+    day: date | None = None
+    tour_id: int | None = None
+    manager_id: int | None = None
+    payment_status: bool | None = None
+    orders_count: int
+    revenue: int
+
+
 class SManagersAdd(BaseModel):
     name: str
     surname: str
@@ -115,3 +182,34 @@ class SManagersAdd(BaseModel):
 class SManagers(SManagersAdd):
     model_config = ConfigDict(from_attributes=True)
     id: int
+    # Nullable columns
+    name: str | None
+    surname: str | None
+    email: str | None
+    phone: str | None
+
+
+T = TypeVar("T")
+
+
+class SPage(BaseModel, Generic[T]):
+    items: list[T]
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+    limit: int
+
+
+class SImportRowError(BaseModel):
+    row: int
+    errors: list[str]
+
+
+class SImportReport(BaseModel):
+    rows: int = 0
+    inserted: int = 0
+    updated: int = 0
+    # Rows replaced by a later row with the same id in the same chunk
+    superseded: int = 0
+    failed: int = 0
+    errors: list[SImportRowError] = []
+    errors_truncated: bool = False
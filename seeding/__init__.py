@@ -0,0 +1,2 @@
+from .generators import customer_email, generate_batch
+from .loader import LEVELS, PRESETS, seed_database
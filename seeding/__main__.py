@@ -0,0 +1,59 @@
+"""Bulk-load referentially consistent synthetic data into the base tables.
+
+    python -m seeding --preset large --reset
+    python -m seeding --db-url sqlite+aiosqlite:///load.db --orders 5000000 --workers 8 --reset
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import settings
+from seeding.generators import COLUMNS
+from seeding.loader import PRESETS, seed_database
+
+
+async def main(args) -> None:
+    sizes = dict(PRESETS[args.preset])
+    for table in COLUMNS:
+        if getattr(args, table) is not None:
+            sizes[table] = getattr(args, table)
+
+    engine = create_async_engine(args.db_url)
+    try:
+        timings = await seed_database(
+            engine,
+            sizes,
+            seed=args.seed,
+            batch_size=args.batch_size,
+            workers=args.workers,
+            reset=args.reset,
+            password=args.password,
+            derived=not args.skip_derived,
+        )
+    finally:
+        await engine.dispose()
+
+    rows = sum(sizes.values())
+    loaded = timings["total"] - timings.get("derived", 0)
+    for table in COLUMNS:
+        print(f"{table:16} {sizes[table]:>10} rows")
+    if "derived" in timings:
+        print(f"{'derived tables':16} {timings['derived']:>10.1f}s")
+    print(f"{rows} rows in {loaded:.1f}s ({rows / loaded:,.0f} rows/s), {timings['total']:.1f}s total")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m seeding", description=__doc__.splitlines()[0])
+    parser.add_argument("--db-url", default=settings.MY_DATABASE_URL)
+    parser.add_argument("--preset", choices=list(PRESETS), default="small")
+    for table in COLUMNS:
+        parser.add_argument(f"--{table}", type=int, help=f"rows in {table} (overrides the preset)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--workers", type=int, help="generator processes and MySQL writers (default: CPU count)")
+    parser.add_argument("--reset", action="store_true", help="drop and recreate every table first")
+    parser.add_argument("--password", default="password", help="plain password shared by all customers")
+    parser.add_argument("--skip-derived", action="store_true", help="do not rebuild tour_catalog and rollups")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,134 @@
+"""Deterministic row generators for the seeder.
+
+Every batch gets its own RNG seeded from (seed, table, first id), so the
+data does not depend on how batches are spread over worker processes.
+Foreign keys are drawn from 1..size of the parent table, which the loader
+fills completely before any child table. Only the standard library is
+imported here so worker processes start quickly.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+START = datetime(2024, 1, 1)
+SQLITE_DATETIME = "%Y-%m-%d %H:%M:%S.%f"
+
+CITIES = [
+    "Paris", "Rome", "Barcelona", "Lisbon", "Prague", "Vienna", "Berlin", "Athens",
+    "Istanbul", "Dubrovnik", "Amsterdam", "Budapest", "Krakow", "Split", "Nice",
+    "Porto", "Seville", "Munich", "Zurich", "Venice", "Florence", "Antalya", "Cairo",
+]
+HOTEL_WORDS = ["Grand", "Royal", "Palace", "Park", "Plaza", "Garden", "Sea View", "Central"]
+FIRST_NAMES = ["Anna", "Oleh", "Maria", "Ivan", "Sofia", "Andrii", "Olena", "Taras", "Iryna", "Dmytro"]
+SURNAMES = ["Shevchenko", "Kovalenko", "Bondarenko", "Tkachenko", "Kravchenko", "Melnyk", "Boyko"]
+TRANSFER_TYPES = ["bus", "taxi", "shuttle", "minivan"]
+TRANSPORT_TYPES = ["plane", "train", "bus", "ferry"]
+CARRIERS = ["SkyUp", "Wizz Air", "Ryanair", "FlixBus", "Intercity", "LOT", "Turkish Airlines"]
+STATUSES = ["new", "regular", "vip"]
+
+COLUMNS = {
+    "hotels": ("id", "name", "location", "rating", "price", "description"),
+    "transfers": ("id", "type", "price"),
+    "transportations": (
+        "id", "type", "company", "price", "from_location", "to_location", "from_date", "to_date",
+    ),
+    "managers": ("id", "name", "surname", "email", "phone"),
+    "customers": ("id", "name", "surname", "status", "email", "phone", "password"),
+    "tours": ("id", "name", "description", "transfer_id", "hotels_id", "transport_id"),
+    "orders": (
+        "id", "order_date", "customer_id", "tour_id", "total_amount", "payment_status", "manager_id",
+    ),
+}
+
+
+def customer_email(i: int) -> str:
+    return f"customer{i}@example.com"
+
+
+def _phone(rng: random.Random) -> str:
+    return f"+380{rng.randrange(10**8, 10**9)}"
+
+
+def _hotels(rng, ids, sizes, options):
+    for i in ids:
+        city = rng.choice(CITIES)
+        yield (
+            i, f"{rng.choice(HOTEL_WORDS)} {city} {i}", city, rng.randint(1, 5),
+            rng.randint(40, 600), f"{rng.randint(20, 400)} rooms in {city}",
+        )
+
+
+def _transfers(rng, ids, sizes, options):
+    for i in ids:
+        yield (i, rng.choice(TRANSFER_TYPES), rng.randint(5, 120))
+
+
+def _transportations(rng, ids, sizes, options):
+    for i in ids:
+        departure = START + timedelta(days=rng.randint(0, 730), hours=rng.randint(0, 23))
+        yield (
+            i, rng.choice(TRANSPORT_TYPES), rng.choice(CARRIERS), rng.randint(30, 1200),
+            rng.choice(CITIES), rng.choice(CITIES),
+            departure, departure + timedelta(days=rng.randint(3, 21)),
+        )
+
+
+def _managers(rng, ids, sizes, options):
+    for i in ids:
+        yield (i, rng.choice(FIRST_NAMES), rng.choice(SURNAMES), f"manager{i}@example.com", _phone(rng))
+
+
+def _customers(rng, ids, sizes, options):
+    password = options["password_hash"]
+    for i in ids:
+        yield (
+            i, rng.choice(FIRST_NAMES), rng.choice(SURNAMES), rng.choice(STATUSES),
+            customer_email(i), _phone(rng), password,
+        )
+
+
+def _tours(rng, ids, sizes, options):
+    for i in ids:
+        city = rng.choice(CITIES)
+        yield (
+            i, f"{city} getaway {i}", f"{rng.randint(3, 21)} days in {city}",
+            rng.randint(1, sizes["transfers"]), rng.randint(1, sizes["hotels"]),
+            rng.randint(1, sizes["transportations"]),
+        )
+
+
+def _orders(rng, ids, sizes, options):
+    minutes = 730 * 24 * 60
+    for i in ids:
+        yield (
+            i, START + timedelta(minutes=rng.randrange(minutes)),
+            rng.randint(1, sizes["customers"]), rng.randint(1, sizes["tours"]),
+            rng.randint(150, 4000), rng.random() < 0.7, rng.randint(1, sizes["managers"]),
+        )
+
+
+GENERATORS = {
+    "hotels": _hotels,
+    "transfers": _transfers,
+    "transportations": _transportations,
+    "managers": _managers,
+    "customers": _customers,
+    "tours": _tours,
+    "orders": _orders,
+}
+
+
+def generate_batch(table: str, first_id: int, count: int, seed: int, sizes: dict, options: dict) -> list[tuple]:
+    """Rows `first_id .. first_id + count - 1` of `table` as tuples in COLUMNS order.
+
+    With options["text_datetimes"] datetimes are rendered the way
+    SQLAlchemy stores them in SQLite.
+    """
+    rng = random.Random(f"{seed}:{table}:{first_id}")
+    rows = GENERATORS[table](rng, range(first_id, first_id + count), sizes, options)
+    if options.get("text_datetimes"):
+        rows = (
+            tuple(v.strftime(SQLITE_DATETIME) if isinstance(v, datetime) else v for v in row)
+            for row in rows
+        )
+    return list(rows)
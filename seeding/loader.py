@@ -0,0 +1,207 @@
+import asyncio
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from data_version import touch_on_commit
+from database import Base
+from seeding.generators import COLUMNS, generate_batch
+
+# Parents before children; tables on the same level are loaded together.
+# customers.order_id is left NULL, which breaks the customers <-> orders cycle.
+LEVELS = [
+    ["hotels", "transfers", "transportations", "managers", "customers"],
+    ["tours"],
+    ["orders"],
+]
+
+PRESETS = {
+    "small": {
+        "hotels": 100, "transfers": 50, "transportations": 50, "tours": 1000,
+        "managers": 20, "customers": 1000, "orders": 10000,
+    },
+    "medium": {
+        "hotels": 500, "transfers": 250, "transportations": 250, "tours": 5000,
+        "managers": 50, "customers": 10000, "orders": 100000,
+    },
+    "large": {
+        "hotels": 1000, "transfers": 500, "transportations": 500, "tours": 10000,
+        "managers": 100, "customers": 50000, "orders": 1000000,
+    },
+}
+
+PLACEHOLDERS = {
+    "qmark": lambda i: "?",
+    "format": lambda i: "%s",
+    "pyformat": lambda i: "%s",
+    "numeric": lambda i: f":{i}",
+    "numeric_dollar": lambda i: f"${i}",
+}
+
+
+def insert_statement(dialect, table: str) -> str:
+    """Positional INSERT for executemany of plain tuples, bypassing ORM and Core compilation."""
+    quote = dialect.identifier_preparer.quote
+    placeholder = PLACEHOLDERS[dialect.paramstyle]
+    columns = COLUMNS[table]
+    return (
+        f"INSERT INTO {quote(table)} ({', '.join(quote(c) for c in columns)}) "
+        f"VALUES ({', '.join(placeholder(i) for i in range(1, len(columns) + 1))})"
+    )
+
+
+async def _prepare_writer(conn) -> None:
+    # Safe because the generated data is consistent by construction.
+    if conn.dialect.name == "mysql":
+        await conn.exec_driver_sql("SET foreign_key_checks = 0, unique_checks = 0")
+    elif conn.dialect.name == "sqlite":
+        await conn.exec_driver_sql("PRAGMA synchronous = OFF")
+
+
+async def _restore_writer(conn) -> None:
+    # Pooled connections outlive the seeder, so put the session settings back.
+    if conn.dialect.name == "mysql":
+        await conn.exec_driver_sql("SET foreign_key_checks = 1, unique_checks = 1")
+    elif conn.dialect.name == "sqlite":
+        await conn.exec_driver_sql("PRAGMA synchronous = FULL")
+
+
+def deferred_indexes(dialect, tables: list[str]) -> list:
+    """Secondary indexes to build after the load instead of maintaining them row by row.
+
+    InnoDB needs an index led by every foreign key column, so those stay on MySQL.
+    """
+    indexes = []
+    for name in tables:
+        for index in Base.metadata.tables[name].indexes:
+            leading = next(iter(index.columns))
+            if dialect.name == "mysql" and leading.foreign_keys:
+                continue
+            indexes.append(index)
+    return indexes
+
+
+async def _existing_rows(engine: AsyncEngine) -> dict[str, int]:
+    tables = Base.metadata.tables
+    async with engine.connect() as conn:
+        return {
+            name: await conn.scalar(select(func.count()).select_from(tables[name]))
+            for name in COLUMNS
+        }
+
+
+async def seed_database(
+    engine: AsyncEngine,
+    sizes: dict,
+    seed: int = 0,
+    batch_size: int = 10000,
+    workers: int | None = None,
+    reset: bool = False,
+    password: str = "password",
+    derived: bool = True,
+    progress=None,
+) -> dict[str, float]:
+    """Fill the seven base tables with `sizes` rows each, ids 1..n.
+
+    Batches are generated in a pool of `workers` processes and written with
+    driver-level executemany, over `workers` connections on MySQL and one on
+    SQLite (a single writer is all it allows). Secondary indexes are dropped
+    for the load and rebuilt once per level. With `reset` every table is
+    dropped and recreated first, otherwise the base tables must be empty.
+    `derived` rebuilds tour_catalog and the revenue rollups afterwards.
+    Returns seconds spent on each table's level, plus "derived" and "total".
+    """
+    from passwords import hash_password
+
+    workers = workers or os.cpu_count() or 1
+    writers = 1 if engine.dialect.name == "sqlite" else workers
+    started = time.perf_counter()
+
+    async with engine.begin() as conn:
+        if reset:
+            await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    if not reset:
+        filled = {name: n for name, n in (await _existing_rows(engine)).items() if n}
+        if filled:
+            raise ValueError(f"tables are not empty: {filled}; pass reset=True to recreate them")
+
+    options = {
+        "password_hash": await hash_password(password),
+        "text_datetimes": engine.dialect.name == "sqlite",
+    }
+    statements = {table: insert_statement(engine.dialect, table) for table in COLUMNS}
+    timings = {}
+    loop = asyncio.get_running_loop()
+
+    with ProcessPoolExecutor(workers) as pool:
+        for level in LEVELS:
+            queue = asyncio.Queue(maxsize=writers * 2)
+            level_started = time.perf_counter()
+            indexes = deferred_indexes(engine.dialect, level)
+            async with engine.begin() as conn:
+                for index in indexes:
+                    await conn.run_sync(index.drop, checkfirst=True)
+
+            async def produce():
+                pending = deque()
+                for table in level:
+                    for first_id in range(1, sizes[table] + 1, batch_size):
+                        count = min(batch_size, sizes[table] - first_id + 1)
+                        pending.append((table, loop.run_in_executor(
+                            pool, generate_batch, table, first_id, count, seed, sizes, options
+                        )))
+                        if len(pending) > workers * 2:
+                            name, rows = pending.popleft()
+                            await queue.put((name, await rows))
+                while pending:
+                    name, rows = pending.popleft()
+                    await queue.put((name, await rows))
+                for _ in range(writers):
+                    await queue.put(None)
+
+            async def write():
+                async with engine.connect() as conn:
+                    await _prepare_writer(conn)
+                    try:
+                        while (item := await queue.get()) is not None:
+                            table, rows = item
+                            await conn.exec_driver_sql(statements[table], rows)
+                            await conn.commit()
+                            if progress:
+                                progress(table, len(rows))
+                    except BaseException:
+                        # Never return a connection with the checks still off to the pool
+                        await conn.invalidate()
+                        raise
+                    await _restore_writer(conn)
+                    await conn.commit()
+
+            await asyncio.gather(produce(), *[write() for _ in range(writers)])
+            async with engine.begin() as conn:
+                for index in indexes:
+                    await conn.run_sync(index.create, checkfirst=True)
+            for table in level:
+                timings[table] = time.perf_counter() - level_started
+
+    if derived:
+        from order.stats import backfill_rollups
+        from tour.catalog import rebuild_tour_catalog
+
+        derived_started = time.perf_counter()
+        async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+            await rebuild_tour_catalog(session)
+            await session.commit()
+            await backfill_rollups(session, batch_size)
+        timings["derived"] = time.perf_counter() - derived_started
+
+    # Rows went in below the ORM, so bump the data versions explicitly
+    async with async_sessionmaker(engine)() as session:
+        touch_on_commit(session, "tours", "hotels", "transfers", "transports")
+        await session.commit()
+    timings["total"] = time.perf_counter() - started
+    return timings
@@ -0,0 +1,223 @@
+import json
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from datetime import UTC, datetime, timedelta
+from time import monotonic, perf_counter
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from database import WebSessions
+from db_helper import db_helper
+from settings import (
+    SESSION_MAX_ENTRIES,
+    SESSION_STORE_BACKEND,
+    SESSION_STORE_URL,
+    SESSION_SWEEP_INTERVAL,
+    SESSION_TTL,
+)
+
+
+class SessionStore(ABC):
+    """Server-side session storage keyed by session id.
+
+    Sessions are JSON-serializable dicts that expire after `ttl` seconds
+    without a lookup. Subclasses implement `_get`, `set`, `delete` and `count`.
+    """
+
+    backend = "base"
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.lookups = 0
+        self.evictions = 0
+        self._latencies: deque[float] = deque(maxlen=1000)
+
+    async def get(self, session_id: str) -> dict | None:
+        started = perf_counter()
+        try:
+            return await self._get(session_id)
+        finally:
+            self.lookups += 1
+            self._latencies.append(perf_counter() - started)
+
+    @abstractmethod
+    async def _get(self, session_id: str) -> dict | None:
+        ...
+
+    @abstractmethod
+    async def set(self, session_id: str, data: dict) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, session_id: str) -> None:
+        ...
+
+    @abstractmethod
+    async def count(self) -> int:
+        ...
+
+    async def stats(self) -> dict:
+        latencies = sorted(self._latencies)
+
+        def percentile(q: float) -> float | None:
+            if not latencies:
+                return None
+            return round(latencies[int(q * (len(latencies) - 1))] * 1000, 3)
+
+        return {
+            "backend": self.backend,
+            "sessions": await self.count(),
+            "ttl": self.ttl,
+            "lookups": self.lookups,
+            "evictions": self.evictions,
+            "lookup_p50_ms": percentile(0.5),
+            "lookup_p99_ms": percentile(0.99),
+        }
+
+
+class MemorySessionStore(SessionStore):
+    """Per-process store bounded to `maxsize` sessions.
+
+    Every lookup renews the expiry and moves the session to the end, so the
+    OrderedDict is sorted by expiry as well as by recency: expired and least
+    recently used sessions are both evicted from the front in O(1).
+    """
+
+    backend = "memory"
+
+    def __init__(self, maxsize: int, ttl: float):
+        super().__init__(ttl)
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+    def _expire(self) -> None:
+        now = monotonic()
+        while self._data and next(iter(self._data.values()))[0] <= now:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    async def _get(self, session_id: str) -> dict | None:
+        self._expire()
+        entry = self._data.get(session_id)
+        if entry is None:
+            return None
+        self._data[session_id] = (monotonic() + self.ttl, entry[1])
+        self._data.move_to_end(session_id)
+        return entry[1]
+
+    async def set(self, session_id: str, data: dict) -> None:
+        self._expire()
+        self._data[session_id] = (monotonic() + self.ttl, data)
+        self._data.move_to_end(session_id)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, session_id: str) -> None:
+        self._data.pop(session_id, None)
+
+    async def count(self) -> int:
+        self._expire()
+        return len(self._data)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+class DatabaseSessionStore(SessionStore):
+    """Store in the `web_sessions` table, shared by every worker using the same database.
+
+    With no `engine` the application database is used (the table comes from
+    the migrations); a dedicated engine, e.g. a local SQLite file, gets its
+    table created on first use. Expiry is renewed at most once per half TTL
+    to keep lookups read-only, and expired rows are swept every
+    SESSION_SWEEP_INTERVAL seconds.
+    """
+
+    backend = "database"
+
+    def __init__(self, ttl: float, engine: AsyncEngine | None = None, sweep_interval: float = 60):
+        super().__init__(ttl)
+        self._engine = engine
+        self._table_ready = engine is None
+        self.sweep_interval = sweep_interval
+        self._next_sweep = 0.0
+        self.table = WebSessions.__table__
+
+    @property
+    def engine(self) -> AsyncEngine:
+        return self._engine or db_helper.engine
+
+    async def _prepare(self) -> None:
+        if not self._table_ready:
+            async with self.engine.begin() as conn:
+                await conn.run_sync(self.table.create, checkfirst=True)
+            self._table_ready = True
+
+    async def _get(self, session_id: str) -> dict | None:
+        await self._prepare()
+        now = _utcnow()
+        t = self.table
+        async with self.engine.connect() as conn:
+            row = await conn.execute(
+                select(t.c.data, t.c.expires_at).where(
+                    t.c.session_id == session_id, t.c.expires_at > now
+                )
+            )
+            row = row.first()
+            if row is None:
+                return None
+            if row.expires_at - now < timedelta(seconds=self.ttl / 2):
+                await conn.execute(
+                    update(t)
+                    .where(t.c.session_id == session_id)
+                    .values(expires_at=now + timedelta(seconds=self.ttl))
+                )
+                await conn.commit()
+        return json.loads(row.data)
+
+    async def set(self, session_id: str, data: dict) -> None:
+        await self._prepare()
+        t = self.table
+        now = _utcnow()
+        async with self.engine.begin() as conn:
+            await conn.execute(delete(t).where(t.c.session_id == session_id))
+            await conn.execute(
+                insert(t).values(
+                    session_id=session_id,
+                    data=json.dumps(data),
+                    expires_at=now + timedelta(seconds=self.ttl),
+                )
+            )
+            if monotonic() >= self._next_sweep:
+                self._next_sweep = monotonic() + self.sweep_interval
+                swept = await conn.execute(delete(t).where(t.c.expires_at <= now))
+                self.evictions += swept.rowcount
+
+    async def delete(self, session_id: str) -> None:
+        await self._prepare()
+        async with self.engine.begin() as conn:
+            await conn.execute(delete(self.table).where(self.table.c.session_id == session_id))
+
+    async def count(self) -> int:
+        await self._prepare()
+        async with self.engine.connect() as conn:
+            total = await conn.execute(
+                select(func.count()).where(self.table.c.expires_at > _utcnow())
+            )
+        return total.scalar_one()
+
+
+def create_session_store() -> SessionStore:
+    """Build the store selected by SESSION_STORE_BACKEND ("memory" or "database")"""
+    if SESSION_STORE_BACKEND == "memory":
+        return MemorySessionStore(maxsize=SESSION_MAX_ENTRIES, ttl=SESSION_TTL)
+    if SESSION_STORE_BACKEND == "database":
+        engine = create_async_engine(SESSION_STORE_URL) if SESSION_STORE_URL else None
+        return DatabaseSessionStore(SESSION_TTL, engine, SESSION_SWEEP_INTERVAL)
+    raise ValueError(f"Unknown SESSION_STORE_BACKEND {SESSION_STORE_BACKEND!r}")
+
+
+session_store = create_session_store()
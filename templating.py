@@ -0,0 +1,48 @@
+import os
+from time import perf_counter
+
+import jinja2
+from starlette.templating import Jinja2Templates
+
+from metrics import TEMPLATE_RENDER
+from settings import TEMPLATES_AUTO_RELOAD, TEMPLATES_BYTECODE_CACHE_DIR, TEMPLATES_DIR
+
+
+class TimedTemplate(jinja2.Template):
+    """Template that records every render in the template_render_seconds histogram"""
+
+    def render(self, *args, **kwargs) -> str:
+        started = perf_counter()
+        try:
+            return super().render(*args, **kwargs)
+        finally:
+            TEMPLATE_RENDER.observe(perf_counter() - started, self.name)
+
+
+def _bytecode_cache() -> jinja2.BytecodeCache | None:
+    if not TEMPLATES_BYTECODE_CACHE_DIR:
+        return None
+    os.makedirs(TEMPLATES_BYTECODE_CACHE_DIR, exist_ok=True)
+    return jinja2.FileSystemBytecodeCache(TEMPLATES_BYTECODE_CACHE_DIR)
+
+
+environment = jinja2.Environment(
+    loader=jinja2.FileSystemLoader(TEMPLATES_DIR),
+    autoescape=True,
+    auto_reload=TEMPLATES_AUTO_RELOAD,
+    bytecode_cache=_bytecode_cache(),
+    cache_size=-1,
+)
+environment.template_class = TimedTemplate
+
+# The one Jinja2Templates every router renders with
+templates = Jinja2Templates(env=environment)
+
+
+def precompile_templates() -> int:
+    """Load every template into the environment cache, writing bytecode for
+    later workers; returns the number of templates"""
+    names = environment.list_templates()
+    for name in names:
+        environment.get_template(name)
+    return len(names)
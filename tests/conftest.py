@@ -0,0 +1,38 @@
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+import settings
+
+# Before any app module builds its engines from these
+settings.MY_DATABASE_URL = "sqlite+aiosqlite://"
+settings.DB_REPLICA_URLS = []
+settings.DB_ECHO = False
+
+from database import Base  # noqa: E402
+from dataloader import attach_loaders, close_loaders  # noqa: E402
+
+
+@asynccontextmanager
+async def _sqlite_session():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    try:
+        async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+            attach_loaders(session)
+            try:
+                yield session
+            finally:
+                await close_loaders(session)
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture
+def sqlite_session():
+    """`async with sqlite_session() as session:` on a private in-memory database
+    with every table created"""
+    return _sqlite_session
@@ -0,0 +1,41 @@
+import asyncio
+import io
+
+from fastapi import UploadFile
+from sqlalchemy import select, text
+
+from csv_import import import_csv
+from database import Hotels
+from schemas import SHotelsAdd
+
+CSV = b"""id,name,location,price
+1,Old name,Riga,100
+,Rejected,Riga,100
+1,New name,Riga,120
+2,Second,Tallinn,90
+,Added,Vilnius,80
+"""
+
+
+async def import_hotels(sqlite_session):
+    async with sqlite_session() as session:
+        session.add(Hotels(id=2, name="Existing", location="Tallinn"))
+        await session.commit()
+        await session.execute(text(
+            "CREATE TRIGGER reject_hotel BEFORE INSERT ON hotels WHEN NEW.name = 'Rejected' "
+            "BEGIN SELECT RAISE(ABORT, 'rejected by trigger'); END"
+        ))
+        await session.commit()
+
+        report = await import_csv(UploadFile(io.BytesIO(CSV)), session, Hotels.__table__, SHotelsAdd)
+        hotels = await session.execute(select(Hotels.name, Hotels.price).order_by(Hotels.id))
+        return report, hotels.all()
+
+
+def test_duplicate_ids_and_rejected_rows_are_reported_per_row(sqlite_session):
+    report, hotels = asyncio.run(import_hotels(sqlite_session))
+    assert (report.rows, report.inserted, report.updated, report.superseded, report.failed) == (5, 2, 1, 1, 1)
+    assert [(error.row, error.errors) for error in report.errors] == [
+        (3, ["database: rejected by trigger"])
+    ]
+    assert hotels == [("New name", 120), ("Second", 90), ("Added", 80)]
@@ -0,0 +1,17 @@
+from types import SimpleNamespace
+
+import pytest
+
+from customer_token import sign_customer_token, verify_customer_token
+
+
+def test_round_trip_with_legacy_nullable_names():
+    customer = SimpleNamespace(id=7, name=None, surname=None, email="old@example.com")
+    identity = verify_customer_token(sign_customer_token(customer))
+    assert (identity.id, identity.name, identity.surname) == (7, None, None)
+
+
+@pytest.mark.parametrize("tamper", [lambda t: t[:-1] + "é", lambda t: t.replace(".", ".ü", 1), lambda t: t[:-2]])
+def test_tampered_token_is_logged_out(tamper):
+    customer = SimpleNamespace(id=7, name="Ann", surname="Lee", email="ann@example.com")
+    assert verify_customer_token(tamper(sign_customer_token(customer))) is None
@@ -0,0 +1,30 @@
+import asyncio
+
+from sqlalchemy import select
+
+from data_version import touch_on_commit
+from database import DataVersions
+from db_helper import DBHelper, primary_reads
+
+
+async def bump_twice(sqlite_session):
+    async with sqlite_session() as session:
+        for entities in (("tours", "hotels"), ("tours",)):
+            touch_on_commit(session, *entities)
+            await session.commit()
+        rows = await session.execute(
+            select(DataVersions.entity, DataVersions.version).order_by(DataVersions.entity)
+        )
+        return rows.all()
+
+
+def test_first_and_later_writes_bump_versions(sqlite_session):
+    assert asyncio.run(bump_twice(sqlite_session)) == [("hotels", 1), ("tours", 2)]
+
+
+def test_primary_reads_skip_the_replicas():
+    helper = DBHelper("sqlite+aiosqlite://", replica_urls=["sqlite+aiosqlite://"])
+    assert helper.choose_replica() is helper.replicas[0]
+    with primary_reads():
+        assert helper.choose_replica() is None
+    assert helper.choose_replica() is helper.replicas[0]
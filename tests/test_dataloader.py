@@ -0,0 +1,54 @@
+import asyncio
+
+from dataloader import DataLoader
+
+
+def test_loads_in_one_tick_are_batched():
+    batches = []
+
+    async def batch_load(keys):
+        batches.append(keys)
+        return {key: key * 10 for key in keys}
+
+    async def main():
+        loader = DataLoader(batch_load)
+        return await asyncio.gather(loader.load(1), loader.load(2), loader.load(1))
+
+    assert asyncio.run(main()) == [10, 20, 10]
+    assert batches == [[1, 2]]
+
+
+def test_close_waits_for_running_batches():
+    finished = []
+
+    async def batch_load(keys):
+        await asyncio.sleep(0.01)
+        finished.extend(keys)
+        return {}
+
+    async def main():
+        loader = DataLoader(batch_load)
+        loader.load(1)
+        await asyncio.sleep(0)  # dispatch the batch without awaiting its result
+        await loader.close()
+        assert finished == [1]
+
+        queued = loader.load(2)
+        await loader.close()
+        assert queued.cancelled()
+        await asyncio.sleep(0.02)
+        assert finished == [1]
+
+    asyncio.run(main())
+
+
+def test_close_after_the_batch_resolved():
+    async def batch_load(keys):
+        return {key: key for key in keys}
+
+    async def main():
+        loader = DataLoader(batch_load)
+        assert await loader.load(1) == 1
+        await asyncio.wait_for(loader.close(), timeout=1)
+
+    asyncio.run(main())
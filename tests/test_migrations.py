@@ -0,0 +1,120 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy import DateTime, inspect, select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from database import Base, Orders
+from migrations.runner import discover_migrations, upgrade
+from migrations.versions.m0003_datetime_columns import (
+    _add_shadow,
+    _column_types,
+    _copy_batches,
+    convert_column,
+)
+
+
+async def convert_with_bad_value():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE orders (id INTEGER PRIMARY KEY, order_date VARCHAR(50))"))
+        await conn.execute(
+            text("INSERT INTO orders VALUES (1, '2024-01-02T10:30:00'), (2, 'soon'), (3, NULL), (4, '')")
+        )
+
+    # Nothing is dropped while a value cannot be converted
+    with pytest.raises(RuntimeError, match=r"1 unparseable value\(s\): id 2: 'soon'"):
+        await convert_column(engine, "orders", "order_date")
+    async with engine.begin() as conn:
+        kept = await conn.execute(text("SELECT order_date FROM orders WHERE id = 2"))
+        assert kept.scalar_one() == "soon"
+        await conn.execute(text("UPDATE orders SET order_date = '2024-03-04' WHERE id = 2"))
+
+    # Re-running after fixing the row finishes the conversion
+    await convert_column(engine, "orders", "order_date")
+    async with engine.connect() as conn:
+        columns = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_columns("orders"))
+        rows = await conn.execute(text("SELECT id, order_date FROM orders ORDER BY id"))
+        rows = rows.all()
+    await engine.dispose()
+    return {c["name"]: c["type"] for c in columns}, rows
+
+
+def test_datetime_conversion_aborts_on_unparseable_values():
+    types, rows = asyncio.run(convert_with_bad_value())
+    assert set(types) == {"id", "order_date"}
+    assert isinstance(types["order_date"], DateTime)
+    assert [(row_id, value and value[:19]) for row_id, value in rows] == [
+        (1, "2024-01-02 10:30:00"),
+        (2, "2024-03-04 00:00:00"),
+        (3, None),
+        (4, None),
+    ]
+
+
+async def convert_while_the_app_writes():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE orders (id INTEGER PRIMARY KEY, order_date VARCHAR(50))"))
+        await conn.execute(text("INSERT INTO orders VALUES (1, '2024-01-01'), (2, '2024-01-02')"))
+
+    # Copy once, then the app changes a copied row and adds a new one
+    types = await _column_types(engine, "orders")
+    await _add_shadow(engine, "orders", "order_date", types)
+    await _copy_batches(engine.begin, "orders", "order_date", "order_date_dt")
+    async with engine.begin() as conn:
+        await conn.execute(text("UPDATE orders SET order_date = '2024-05-05' WHERE id = 1"))
+        await conn.execute(text("INSERT INTO orders (id, order_date) VALUES (3, '2024-01-03')"))
+
+    await convert_column(engine, "orders", "order_date")
+    async with engine.connect() as conn:
+        rows = await conn.execute(text("SELECT id, order_date FROM orders ORDER BY id"))
+        rows = [(row_id, value[:10]) for row_id, value in rows]
+        triggers = await conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'"))
+        triggers = triggers.all()
+    await engine.dispose()
+    return rows, triggers
+
+
+def test_datetime_conversion_picks_up_writes_made_during_the_copy():
+    rows, triggers = asyncio.run(convert_while_the_app_writes())
+    assert rows == [(1, "2024-05-05"), (2, "2024-01-02"), (3, "2024-01-03")]
+    assert triggers == []
+
+
+async def migrate_fresh_database():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    applied = await upgrade(engine)
+    async with engine.connect() as conn:
+        schema = await conn.run_sync(
+            lambda sync_conn: {
+                name: {c["name"] for c in inspect(sync_conn).get_columns(name)}
+                for name in inspect(sync_conn).get_table_names()
+            }
+        )
+    await engine.dispose()
+    return applied, schema
+
+
+def test_migrations_build_the_model_schema():
+    applied, schema = asyncio.run(migrate_fresh_database())
+    assert applied == sorted(module.VERSION for module in discover_migrations())
+    assert schema.pop("schema_migrations")
+    assert schema == {
+        table.name: {c.name for c in table.columns} for table in Base.metadata.tables.values()
+    }
+
+
+async def read_unconverted_dates(sqlite_session):
+    async with sqlite_session() as session:
+        await session.execute(
+            text("INSERT INTO orders (id, order_date, payment_status) VALUES (1, '2024-01-02T10:30', 0), (2, 'soon', 0)")
+        )
+        rows = await session.execute(select(Orders.order_date).order_by(Orders.id))
+        return rows.scalars().all()
+
+
+def test_models_read_dates_still_stored_as_strings(sqlite_session):
+    assert asyncio.run(read_unconverted_dates(sqlite_session)) == [datetime(2024, 1, 2, 10, 30), None]
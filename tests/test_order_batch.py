@@ -0,0 +1,41 @@
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import select
+
+from database import Orders, RevenueDailyTour, TourCatalog
+from order.crud import add_orders
+from order.stats import backfill_rollups
+from schemas import SOrdersAdd
+
+
+async def add_and_rebuild(sqlite_session):
+    """Ids and stored amounts after add_orders, and the tour rollup before and after a rebuild"""
+    async with sqlite_session() as session:
+        session.add(TourCatalog(id=7, name="Alps", total_cost=500))
+        await session.commit()
+
+        orders = [
+            SOrdersAdd(order_date=datetime(2024, 1, 1), tour_id=7),
+            SOrdersAdd(order_date=datetime(2024, 1, 1), tour_id=7, total_amount=300, payment_status=1),
+            SOrdersAdd(tour_id=7),
+            SOrdersAdd(order_date=datetime(2024, 1, 2), total_amount=50),
+        ]
+        ids = await add_orders(orders, session)
+        await session.commit()
+
+        stored = await session.execute(select(Orders.id, Orders.total_amount).order_by(Orders.id))
+        rollup = select(
+            RevenueDailyTour.day, RevenueDailyTour.tour_id, RevenueDailyTour.orders_count, RevenueDailyTour.revenue
+        ).order_by(RevenueDailyTour.day, RevenueDailyTour.tour_id)
+        added = (await session.execute(rollup)).all()
+        await backfill_rollups(session, batch_size=2)
+        rebuilt = (await session.execute(rollup)).all()
+        return ids, stored.all(), added, rebuilt
+
+
+def test_batch_ids_amounts_and_rollups_match_a_rebuild(sqlite_session):
+    ids, stored, added, rebuilt = asyncio.run(add_and_rebuild(sqlite_session))
+    assert stored == [(ids[0], 500), (ids[1], 300), (ids[2], 500), (ids[3], 50)]
+    assert [(row.orders_count, row.revenue) for row in added] == [(2, 800), (1, 50)]
+    assert added == rebuilt
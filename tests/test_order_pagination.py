@@ -0,0 +1,81 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from database import Customers, Orders
+from order.crud import get_orders
+from pagination import PageParams, encode_cursor
+from schemas import SOrders, SOrdersFilter, SPage
+
+
+async def walk_orders(sqlite_session, direction: str) -> tuple[list[int], list[int]]:
+    """Ids of every order by following next cursors, then prev cursors back"""
+    async with sqlite_session() as session:
+        dates = [datetime(2024, 1, 3), None, datetime(2024, 1, 1), None, None, datetime(2024, 1, 2)]
+        session.add_all([Orders(order_date=date) for date in dates])
+        await session.commit()
+
+        filters = SOrdersFilter(sort="order_date", direction=direction)
+        forward, pages, cursor = [], [], None
+        while True:
+            page = await get_orders(filters, PageParams(cursor=cursor, limit=2), session)
+            forward += [order.id for order in page.items]
+            pages.append(page)
+            if page.next_cursor is None:
+                break
+            cursor = page.next_cursor
+
+        backward, page = [], pages[-1]
+        while page.prev_cursor is not None:
+            page = await get_orders(filters, PageParams(cursor=page.prev_cursor, limit=2), session)
+            backward = [order.id for order in page.items] + backward
+        return forward, backward
+
+
+@pytest.mark.parametrize(
+    "direction, expected",
+    [("asc", [2, 4, 5, 3, 6, 1]), ("desc", [1, 6, 3, 5, 4, 2])],
+)
+def test_order_date_pages_reach_orders_without_a_date(sqlite_session, direction, expected):
+    forward, backward = asyncio.run(walk_orders(sqlite_session, direction))
+    assert forward == expected
+    assert backward == expected[:-2]
+
+
+async def report_page(sqlite_session):
+    async with sqlite_session() as session:
+        session.add(Customers(id=1, name="Ann", email="ann@example.com", password="scrypt$secret"))
+        session.add(Orders(customer_id=1, order_date=datetime(2024, 1, 1)))
+        await session.commit()
+        page = await get_orders(SOrdersFilter(), PageParams(limit=10), session)
+        return SPage[SOrders].model_validate(page).model_dump(mode="json")
+
+
+def test_orders_report_leaves_out_customer_passwords(sqlite_session):
+    page = asyncio.run(report_page(sqlite_session))
+    customer = page["items"][0]["customer"]
+    assert customer["email"] == "ann@example.com"
+    assert "password" not in customer
+
+
+@pytest.mark.parametrize(
+    "sort, keys",
+    [
+        ("id", [[1, 2]]),
+        ("id", ["1"]),
+        ("id", [True]),
+        ("order_date", [5, 1]),
+        ("order_date", [datetime(2024, 1, 1), "1"]),
+    ],
+)
+def test_cursor_keys_of_the_wrong_type_are_rejected(sqlite_session, sort, keys):
+    async def fetch():
+        async with sqlite_session() as session:
+            cursor = encode_cursor(keys, "next")
+            await get_orders(SOrdersFilter(sort=sort), PageParams(cursor=cursor), session)
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(fetch())
+    assert raised.value.status_code == 400
@@ -0,0 +1,21 @@
+import asyncio
+
+import pytest
+
+from passwords import hash_password, verify_password
+
+
+def test_correct_password_matches():
+    async def main():
+        stored = await hash_password("secret")
+        return await verify_password("secret", stored), await verify_password("wrong", stored)
+
+    assert asyncio.run(main()) == ((True, False), (False, False))
+
+
+@pytest.mark.parametrize(
+    "stored",
+    ["scrypt$", "scrypt$16384$8$1$c2FsdA==", "scrypt$x$8$1$c2FsdA==$a2V5", "scrypt$3$8$1$c2FsdA==$a2V5", "scrypt$16384$8$1$!!$a2V5"],
+)
+def test_malformed_hash_is_a_failed_verification(stored):
+    assert asyncio.run(verify_password("secret", stored)) == (False, False)
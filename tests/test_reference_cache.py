@@ -0,0 +1,119 @@
+import asyncio
+
+from cache import TTLCache
+
+
+def test_concurrent_misses_load_once():
+    cache = TTLCache(maxsize=8, ttl=60)
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0)
+        return ["row"]
+
+    async def main():
+        return await asyncio.gather(*[cache.get_or_load("hotels", load) for _ in range(5)])
+
+    assert asyncio.run(main()) == [["row"]] * 5
+    assert calls == 1
+
+
+def test_load_overlapping_invalidation_is_not_stored():
+    cache = TTLCache(maxsize=8, ttl=60)
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def old_load():
+        started.set()
+        await release.wait()
+        return ["before commit"]
+
+    async def main():
+        reader = asyncio.create_task(cache.get_or_load("hotels", old_load))
+        await started.wait()
+        # A write commits while the read above is still running
+        cache.invalidate("hotels")
+        release.set()
+        assert await reader == ["before commit"]
+        assert cache.get("hotels") is None
+
+        async def new_load():
+            return ["after commit"]
+
+        assert await cache.get_or_load("hotels", new_load) == ["after commit"]
+        assert cache.get("hotels") == ["after commit"]
+
+    asyncio.run(main())
+
+
+def test_failed_load_lets_waiters_retry():
+    cache = TTLCache(maxsize=8, ttl=60)
+
+    async def failing():
+        await asyncio.sleep(0)
+        raise RuntimeError("connection lost")
+
+    async def working():
+        return ["row"]
+
+    async def main():
+        first = asyncio.create_task(cache.get_or_load("hotels", failing))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(cache.get_or_load("hotels", working))
+        results = await asyncio.gather(first, second, return_exceptions=True)
+        assert isinstance(results[0], RuntimeError)
+        assert results[1] == ["row"]
+
+    asyncio.run(main())
+
+
+class FakeVersions:
+    """Stands in for the shared data_versions table"""
+
+    def __init__(self):
+        self.version = 0
+
+    async def get(self, *entities):
+        return {entity: (self.version, None) for entity in entities}
+
+
+def test_write_by_another_worker_reloads_the_entry():
+    versions = FakeVersions()
+    cache = TTLCache(maxsize=8, ttl=60, versions=versions)
+    rows = ["before"]
+
+    async def load():
+        return list(rows)
+
+    async def main():
+        assert await cache.get_or_load("hotels", load) == ["before"]
+        # Committed elsewhere: this worker's cache saw no invalidation
+        rows[:] = ["after"]
+        assert await cache.get_or_load("hotels", load) == ["before"]
+        versions.version += 1
+        assert await cache.get_or_load("hotels", load) == ["after"]
+
+    asyncio.run(main())
+
+
+def test_load_overlapping_a_version_bump_is_loaded_again():
+    versions = FakeVersions()
+    cache = TTLCache(maxsize=8, ttl=60, versions=versions)
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            # Another worker commits while this load runs
+            versions.version += 1
+        return [calls]
+
+    async def main():
+        assert await cache.get_or_load("hotels", load) == [1]
+        assert await cache.get_or_load("hotels", load) == [2]
+        assert await cache.get_or_load("hotels", load) == [2]
+
+    asyncio.run(main())
@@ -0,0 +1,58 @@
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import select
+
+import order.stats
+from crud import add_order, update_order
+from database import RevenueDailyPayment, RevenueDailyPaymentRebuild, RollupRebuild
+from order.stats import backfill_rollups
+from schemas import SOrdersAdd
+
+DAY = datetime(2024, 3, 1)
+
+
+async def rollups(session):
+    rows = await session.execute(
+        select(RevenueDailyPayment.payment_status, RevenueDailyPayment.orders_count, RevenueDailyPayment.revenue)
+        .order_by(RevenueDailyPayment.payment_status)
+    )
+    return rows.all()
+
+
+async def rebuild_while_orders_change(sqlite_session):
+    async with sqlite_session() as session:
+        for amount in (10, 20, 30, 40):
+            await add_order(SOrdersAdd(order_date=DAY, total_amount=amount), session)
+        await session.commit()
+
+        next_batch_end = order.stats._next_batch_end
+        writes = iter([
+            # Order 1 was counted by the first batch, order 4 is not scanned yet
+            lambda: update_order(1, SOrdersAdd(order_date=DAY, total_amount=10, payment_status=1), session),
+            lambda: update_order(4, SOrdersAdd(order_date=DAY, total_amount=45, payment_status=0), session),
+            lambda: add_order(SOrdersAdd(order_date=DAY, total_amount=50, payment_status=1), session),
+        ])
+
+        async def write_between_batches(*args):
+            write = next(writes, None)
+            if write is not None:
+                await write()
+            return await next_batch_end(*args)
+
+        order.stats._next_batch_end = write_between_batches
+        try:
+            await backfill_rollups(session, batch_size=2)
+        finally:
+            order.stats._next_batch_end = next_batch_end
+        during = await rollups(session)
+        leftovers = await session.execute(select(RollupRebuild.id).union_all(select(RevenueDailyPaymentRebuild.id)))
+
+        await backfill_rollups(session, batch_size=100)
+        return during, await rollups(session), leftovers.all()
+
+
+def test_rebuild_counts_orders_changed_while_it_runs(sqlite_session):
+    during, quiet, leftovers = asyncio.run(rebuild_while_orders_change(sqlite_session))
+    assert during == quiet == [(False, 3, 95), (True, 2, 60)]
+    assert leftovers == []
@@ -0,0 +1,41 @@
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import select
+
+from database import Hotels, Tours, Transfers, Transportations
+from tour.catalog import CATALOG_ROW, catalog_row_to_schema, rebuild_tour_catalog
+
+
+async def catalog_tours(sqlite_session):
+    async with sqlite_session() as session:
+        session.add_all([
+            Hotels(id=1, name=None, price=381),
+            Transfers(id=1, type=None, price=63),
+            Transportations(
+                id=1, type="bus", price=152, from_location="Riga", to_location="Vilnius",
+                from_date=datetime(2024, 6, 1, 8), to_date=datetime(2024, 6, 1, 12),
+            ),
+            Tours(id=1, name="Baltic", hotels_id=1, transfer_id=1, transport_id=1),
+            # References to rows that do not exist
+            Tours(id=2, name="Dangling", hotels_id=9, transfer_id=9, transport_id=9),
+        ])
+        await session.flush()
+        await rebuild_tour_catalog(session)
+        rows = await session.execute(select(*CATALOG_ROW).order_by(CATALOG_ROW[0]))
+        return [catalog_row_to_schema(row) for row in rows]
+
+
+def test_catalog_keeps_joined_rows_with_null_fields(sqlite_session):
+    baltic, dangling = asyncio.run(catalog_tours(sqlite_session))
+    assert baltic.total_cost == 381 + 63 + 152
+    assert baltic.hotel.id == 1 and baltic.hotel.name is None
+    assert baltic.transfer.id == 1 and baltic.transfer.type is None
+    assert baltic.transport.model_dump(include={"from_location", "to_location", "from_date", "to_date"}) == {
+        "from_location": "Riga",
+        "to_location": "Vilnius",
+        "from_date": datetime(2024, 6, 1, 8),
+        "to_date": datetime(2024, 6, 1, 12),
+    }
+    assert (dangling.hotel, dangling.transfer, dangling.transport) == (None, None, None)
+    assert dangling.total_cost == 0
@@ -0,0 +1,47 @@
+import asyncio
+
+from database import Hotels, Tours, Transfers, Transportations
+from query_stats import query_budget
+from tour.catalog import rebuild_tour_catalog
+from tour.crud import get_tour_by_id, get_tours_detailed
+
+
+async def seed_tours(session, count: int) -> list[int]:
+    """`count` tours, each with its own hotel, transfer and transportation"""
+    tours = [
+        Tours(
+            name=f"Tour {i}",
+            hotel=Hotels(name=f"Hotel {i}", location="Riga", rating=4, price=100),
+            transfer=Transfers(type="bus", price=20),
+            transport=Transportations(type="plane", company="Air", price=300),
+        )
+        for i in range(count)
+    ]
+    session.add_all(tours)
+    await session.flush()
+    await rebuild_tour_catalog(session)
+    await session.commit()
+    return [tour.id for tour in tours]
+
+
+async def count_queries(sqlite_session, tours: int) -> tuple[int, int]:
+    """Statements run by get_tours_detailed and by get_tour_by_id for every tour"""
+    async with sqlite_session() as session:
+        ids = await seed_tours(session, tours)
+
+        with query_budget(1) as listed:
+            detailed = await get_tours_detailed(session)
+        assert len(detailed) == tours
+        assert all(tour.total_cost == 420 for tour in detailed)
+
+        with query_budget(1) as by_id:
+            loaded = await asyncio.gather(*[get_tour_by_id(i, session) for i in ids])
+        assert [tour.id for tour in loaded] == ids
+        assert all(tour.hotel and tour.transfer and tour.transport for tour in loaded)
+        return listed.count, by_id.count
+
+
+def test_tour_query_count_does_not_grow_with_catalog(sqlite_session):
+    small = asyncio.run(count_queries(sqlite_session, 3))
+    large = asyncio.run(count_queries(sqlite_session, 30))
+    assert small == large == (1, 1)
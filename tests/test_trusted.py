@@ -0,0 +1,34 @@
+import pytest
+from pydantic import TypeAdapter, ValidationError
+
+from database import Customers, Hotels, Managers, Transfers, Transportations
+from trusted import (
+    customer_public_schema,
+    customer_schema,
+    hotel_schema,
+    manager_schema,
+    transfer_schema,
+    transport_schema,
+)
+
+
+@pytest.mark.parametrize(
+    "schema, model",
+    [
+        (hotel_schema, Hotels),
+        (transfer_schema, Transfers),
+        (transport_schema, Transportations),
+        (customer_schema, Customers),
+        (customer_public_schema, Customers),
+        (manager_schema, Managers),
+    ],
+)
+def test_nullable_columns_map_to_optional_fields(schema, model):
+    """Trusted rows skip validation, so a NULL must already be a valid value"""
+    columns = model.__table__.columns
+    for name, field in schema.model.model_fields.items():
+        if name in columns and columns[name].nullable:
+            try:
+                TypeAdapter(field.annotation).validate_python(None)
+            except ValidationError:
+                pytest.fail(f"{schema.model.__name__}.{name} is NOT NULL but {model.__name__}.{name} is nullable")
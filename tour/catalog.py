@@ -0,0 +1,223 @@
+import asyncio
+from operator import attrgetter
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from data_version import touch_on_commit
+from database import Hotels, TourCatalog, Tours, Transfers, Transportations
+from db_helper import db_helper
+from schemas import SHotels, STours, STransfer, STransport
+from trusted import construct
+
+CATALOG_COLUMNS = [
+    "id",
+    "name",
+    "description",
+    "hotels_id",
+    "has_hotel",
+    "hotel_name",
+    "hotel_location",
+    "hotel_rating",
+    "hotel_price",
+    "hotel_description",
+    "transfer_id",
+    "has_transfer",
+    "transfer_type",
+    "transfer_price",
+    "transport_id",
+    "has_transport",
+    "transport_type",
+    "transport_company",
+    "transport_price",
+    "transport_from_location",
+    "transport_to_location",
+    "transport_from_date",
+    "transport_to_date",
+    "total_cost",
+]
+# Every tour_catalog column, for SELECTs that want rows rather than ORM objects
+CATALOG_ROW = [getattr(TourCatalog, name) for name in CATALOG_COLUMNS]
+
+
+def catalog_select():
+    """SELECT that produces tour_catalog rows from the normalized tables"""
+    total_cost = (
+        func.coalesce(Hotels.price, 0)
+        + func.coalesce(Transfers.price, 0)
+        + func.coalesce(Transportations.price, 0)
+    )
+    return (
+        select(
+            Tours.id,
+            Tours.name,
+            Tours.description,
+            Tours.hotels_id,
+            Hotels.id.is_not(None),
+            Hotels.name,
+            Hotels.location,
+            Hotels.rating,
+            Hotels.price,
+            Hotels.description,
+            Tours.transfer_id,
+            Transfers.id.is_not(None),
+            Transfers.type,
+            Transfers.price,
+            Tours.transport_id,
+            Transportations.id.is_not(None),
+            Transportations.type,
+            Transportations.company,
+            Transportations.price,
+            Transportations.from_location,
+            Transportations.to_location,
+            Transportations.from_date,
+            Transportations.to_date,
+            total_cost,
+        )
+        .select_from(Tours)
+        .outerjoin(Hotels, Hotels.id == Tours.hotels_id)
+        .outerjoin(Transfers, Transfers.id == Tours.transfer_id)
+        .outerjoin(Transportations, Transportations.id == Tours.transport_id)
+    )
+
+
+async def refresh_tour_catalog(session: AsyncSession, *criteria) -> None:
+    """Recompute the catalog rows of the tours matching `criteria`.
+
+    Must run in the same transaction as the write that changed the inputs,
+    after it has been flushed, so readers never see a stale total_cost.
+    """
+    touch_on_commit(session, "tours")
+    affected = select(Tours.id).where(*criteria)
+    await session.execute(delete(TourCatalog).where(TourCatalog.id.in_(affected)))
+    await session.execute(
+        insert(TourCatalog).from_select(
+            CATALOG_COLUMNS, catalog_select().where(*criteria)
+        )
+    )
+
+
+async def refresh_catalog_for_tour(session: AsyncSession, tour_id: int) -> None:
+    await refresh_tour_catalog(session, Tours.id == tour_id)
+
+
+async def refresh_catalog_for_hotel(session: AsyncSession, hotel_id: int) -> None:
+    await refresh_tour_catalog(session, Tours.hotels_id == hotel_id)
+
+
+async def remove_from_catalog(session: AsyncSession, tour_id: int) -> None:
+    touch_on_commit(session, "tours")
+    await session.execute(delete(TourCatalog).where(TourCatalog.id == tour_id))
+
+
+async def rebuild_tour_catalog(session: AsyncSession) -> int:
+    """Drop every catalog row and rebuild it from the source tables"""
+    touch_on_commit(session, "tours")
+    await session.execute(delete(TourCatalog))
+    await session.execute(
+        insert(TourCatalog).from_select(CATALOG_COLUMNS, catalog_select())
+    )
+    count = await session.execute(select(func.count()).select_from(TourCatalog))
+    return count.scalar_one()
+
+
+def catalog_row_to_schema(row) -> STours:
+    """Build the STours shape used by the templates from a `select(*CATALOG_ROW)`
+    row, trusting the values as stored"""
+    (
+        tour_id,
+        name,
+        description,
+        hotels_id,
+        has_hotel,
+        hotel_name,
+        hotel_location,
+        hotel_rating,
+        hotel_price,
+        hotel_description,
+        transfer_id,
+        has_transfer,
+        transfer_type,
+        transfer_price,
+        transport_id,
+        has_transport,
+        transport_type,
+        transport_company,
+        transport_price,
+        transport_from_location,
+        transport_to_location,
+        transport_from_date,
+        transport_to_date,
+        total_cost,
+    ) = row
+    hotel = None
+    if has_hotel:
+        hotel = construct(
+            SHotels,
+            {
+                "name": hotel_name,
+                "location": hotel_location,
+                "rating": hotel_rating,
+                "price": hotel_price,
+                "description": hotel_description,
+                "id": hotels_id,
+            },
+        )
+    transfer = None
+    if has_transfer:
+        transfer = construct(
+            STransfer, {"type": transfer_type, "price": transfer_price, "id": transfer_id}
+        )
+    transport = None
+    if has_transport:
+        transport = construct(
+            STransport,
+            {
+                "type": transport_type,
+                "company": transport_company,
+                "price": transport_price,
+                "from_location": transport_from_location,
+                "to_location": transport_to_location,
+                "from_date": transport_from_date,
+                "to_date": transport_to_date,
+                "id": transport_id,
+            },
+        )
+    return construct(
+        STours,
+        {
+            "name": name,
+            "description": description,
+            "transfer_id": transfer_id,
+            "hotels_id": hotels_id,
+            "transport_id": transport_id,
+            "id": tour_id,
+            "hotel": hotel,
+            "transfer": transfer,
+            "transport": transport,
+            "total_cost": total_cost,
+        },
+    )
+
+
+_catalog_values = attrgetter(*CATALOG_COLUMNS)
+
+
+def catalog_to_schema(row: TourCatalog) -> STours:
+    """catalog_row_to_schema for a TourCatalog ORM object"""
+    return catalog_row_to_schema(_catalog_values(row))
+
+
+async def main():
+    """Recreate tour_catalog from scratch, e.g. after a failed deploy or manual SQL"""
+    async with db_helper.engine.begin() as conn:
+        await conn.run_sync(TourCatalog.__table__.create, checkfirst=True)
+    async with db_helper.async_session() as session:
+        count = await rebuild_tour_catalog(session)
+        await session.commit()
+    await db_helper.engine.dispose()
+    print(f"tour_catalog rebuilt: {count} rows")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
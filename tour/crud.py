@@ -1,4 +1,5 @@
 from sqlalchemy import select
+from sqlalchemy.orm import joinedload
 from database import (
     Base,
     Tours,
@@ -8,9 +9,15 @@ from database import (
     Transfers,
     Hotels,
     Transportations,
+    TourCatalog,
 )
-from crud import get_transfers_by_id
 from .dependency import get_tour_by_id_dependency
+from .catalog import (
+    CATALOG_ROW,
+    catalog_row_to_schema,
+    refresh_catalog_for_tour,
+    remove_from_catalog,
+)
 from schemas import (
     SToursAdd,
     STours,
@@ -24,60 +31,64 @@ from schemas import (
     SCustomersAdd,
     SCustomers,
     SOrdersAdd,
+    SPage,
 )
 from db_helper import db_helper
+from pagination import PageParams, paginate
+from dataloader import get_loader
+from trusted import TrustedSchema, hotel_schema, transfer_schema, transport_schema
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
+def tour_details_options():
+    """Loader options that fetch hotel, transfer and transportation together with the tour"""
+    return (
+        joinedload(Tours.hotel),
+        joinedload(Tours.transfer),
+        joinedload(Tours.transport),
+    )
+
+
+def _total_cost(tour: Tours) -> int:
+    parts = (tour.hotel, tour.transfer, tour.transport)
+    return sum(part.price for part in parts if part is not None and part.price)
+
+
+# Tours ORM object with loaded relations -> STours with its total cost
+tour_to_schema = TrustedSchema(
+    STours,
+    hotel=hotel_schema.optional("hotel"),
+    transfer=transfer_schema.optional("transfer"),
+    transport=transport_schema.optional("transport"),
+    total_cost=_total_cost,
+)
+
+
 async def get_tours_detailed(
     session: AsyncSession = Depends(db_helper.session_dependency),
 ) -> list[STours]:
     """Fetch all tours with related hotel, transfer, and transportation details"""
 
-    tours = await session.execute(select(Tours))
-    tours = tours.scalars().all()
-
-    result = []
-
-    for tour in tours:
-        # Convert Tours ORM model to STours Pydantic schema using model_validate
-        tour_schema = STours.model_validate(tour)
-
-        # Fetch and add hotel details if hotels_id exists
-        if tour.hotels_id:
-            hotel = await session.execute(
-                select(Hotels).where(Hotels.id == tour.hotels_id)
-            )
-            hotel = hotel.scalar_one_or_none()
-            if hotel:
-                tour_schema.hotel = SHotels.model_validate(hotel)
-
-        # Fetch and add transfer details if transfer_id exists
-        if tour.transfer_id:
-            transfer = await get_transfers_by_id(tour.transfer_id, session)
-            tour_schema.transfer = STransfer.model_validate(transfer)
-
-        # Fetch and add transport details if transport_id exists
-        if tour.transport_id:
-            transport = await session.execute(
-                select(Transportations).where(Transportations.id == tour.transport_id)
-            )
-            transport = transport.scalar_one_or_none()
-            if transport:
-                tour_schema.transport = STransport.model_validate(transport)
-        # Calculate total cost
-        total_cost = 0
-        if tour_schema.hotel and tour_schema.hotel.price:
-            total_cost += tour_schema.hotel.price
-        if tour_schema.transfer and tour_schema.transfer.price:
-            total_cost += tour_schema.transfer.price
-        if tour_schema.transport and tour_schema.transport.price:
-            total_cost += tour_schema.transport.price
-        tour_schema.total_cost = total_cost
-        result.append(tour_schema)
-
-    return result
+    # tour_catalog already holds the joined fields and total cost; plain
+    # column rows skip building an ORM object per tour
+    tours = await session.execute(select(*CATALOG_ROW).order_by(TourCatalog.id))
+
+    return [catalog_row_to_schema(tour) for tour in tours]
+
+
+async def get_tours_page(
+    page: PageParams,
+    session: AsyncSession = Depends(db_helper.session_dependency),
+) -> SPage[STours]:
+    """Fetch one page of tours with related details"""
+    return await paginate(
+        session,
+        select(*CATALOG_ROW),
+        page,
+        TourCatalog.id,
+        to_schema=catalog_row_to_schema,
+    )
 
 
 async def update_tour(
@@ -97,6 +108,7 @@ async def update_tour(
 
     
     await session.flush()
+    await refresh_catalog_for_tour(session, tour_obj.id)
     await session.commit()
     return tour_obj
 
@@ -112,6 +124,7 @@ async def delete_tour(
         return False
 
     await session.delete(tour)
+    await remove_from_catalog(session, tour_id)
     await session.commit()
     return True
 
@@ -119,40 +132,9 @@ async def delete_tour(
 async def get_tour_by_id(
     tour_id: int, session: AsyncSession = Depends(db_helper.session_dependency)
 ) -> STours | None:
-    """Fetch a single tour with all related data"""
-    tour = await session.execute(select(Tours).where(Tours.id == tour_id))
-    tour = tour.scalar_one_or_none()
-
-    if not tour:
-        return None
-    tour_schema = STours.model_validate(tour)
-
-    # Fetch related hotel
-    if tour.hotels_id:
-        hotel = await session.execute(select(Hotels).where(Hotels.id == tour.hotels_id))
-        hotel = hotel.scalar_one_or_none()
-        if hotel:
-            tour_schema.hotel = SHotels.model_validate(hotel)
-
-    # Fetch related transport
-    if tour.transport_id:
-        transport = await session.execute(
-            select(Transportations).where(Transportations.id == tour.transport_id)
-        )
-        transport = transport.scalar_one_or_none()
-        if transport:
-            tour_schema.transport = STransport.model_validate(transport)
-
-    # Fetch related transfer
-    if tour.transfer_id:
-        transfer = await session.execute(
-            select(Transfers).where(Transfers.id == tour.transfer_id)
-        )
-        transfer = transfer.scalar_one_or_none()
-        if transfer:
-            tour_schema.transfer = STransfer.model_validate(transfer)
-
-    return tour_schema
+    """Fetch a single tour with all related data, batched with other lookups in the same request"""
+    loader = get_loader(session, Tours, tour_to_schema, tour_details_options())
+    return await loader.load(tour_id)
 
 
 async def add_tour(
@@ -162,6 +144,7 @@ async def add_tour(
     new_tour = Tours(**tour.model_dump())
     session.add(new_tour)
     await session.flush()
+    await refresh_catalog_for_tour(session, new_tour.id)
     return new_tour
 
 
@@ -1,6 +1,14 @@
-from fastapi import APIRouter, Depends, Request, Form
-from fastapi.templating import Jinja2Templates
-from crud import add_transfer, add_transport, get_transfers, get_transports
+from fastapi import APIRouter, Depends, Request, Form, UploadFile
+from templating import templates
+from crud import (
+    add_transfer,
+    add_transport,
+    get_transfers,
+    get_transports,
+    get_transfers_page,
+    get_transports_page,
+    import_transports,
+)
 from db_helper import db_helper
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated, Optional
@@ -13,11 +21,13 @@ from database import (
     Hotels,
     Transportations,
     Transfers,
+    TourCatalog,
 )
 from sqlalchemy import select
 from hotel.crud import get_hotels
 from tour.crud import (
     get_tours_detailed,
+    get_tours_page,
     add_tour,
     get_tour_by_id,
     update_tour,
@@ -38,10 +48,16 @@ from schemas import (
     SCustomersAdd,
     SOrdersAdd,
     STransportUpdate,
+    STransport,
+    STransfer,
+    SImportReport,
+    SPage,
 )
 from tour.dependency import get_tour_by_id_dependency
-
-templates = Jinja2Templates(directory="templates")
+from tour.catalog import CATALOG_COLUMNS
+from pagination import PageParams, page_params
+from page_data import load_page_data
+from export import ExportFormat, export_response
 
 router = APIRouter(tags=["tour"])
 
@@ -113,17 +129,19 @@ async def create_tour(
         await session.commit()
 
         # Fetch fresh data for response
-        hotels_list = await get_hotels(session)
-        transfers_list = await get_transfers(session)
-        transportations_list = await get_transports(session)
+        data = await load_page_data(
+            hotels=(get_hotels,),
+            transfers=(get_transfers,),
+            transportations=(get_transports,),
+        )
 
         return templates.TemplateResponse(
             "addtour.html",
             {
                 "request": request,
-                "hotels": hotels_list,
-                "transfers": transfers_list,
-                "transportations": transportations_list,
+                "hotels": data["hotels"],
+                "transfers": data["transfers"],
+                "transportations": data["transportations"],
                 "success": "Tour created successfully! 🎉",
                 "success_show": True,
             },
@@ -132,17 +150,19 @@ async def create_tour(
         await session.rollback()
 
         # Fetch fresh data for error response
-        hotels_list = await get_hotels(session)
-        transfers_list = await get_transfers(session)
-        transportations_list = await get_transports(session)
+        data = await load_page_data(
+            hotels=(get_hotels,),
+            transfers=(get_transfers,),
+            transportations=(get_transports,),
+        )
 
         return templates.TemplateResponse(
             "addtour.html",
             {
                 "request": request,
-                "hotels": hotels_list,
-                "transfers": transfers_list,
-                "transportations": transportations_list,
+                "hotels": data["hotels"],
+                "transfers": data["transfers"],
+                "transportations": data["transportations"],
                 "error": f"Error creating tour: {str(e)}",
                 "error_show": True,
             },
@@ -151,42 +171,85 @@ async def create_tour(
 
 @router.get("/update/")
 async def update_tours_page(
-    request: Request, session: AsyncSession = Depends(db_helper.session_dependency)
+    request: Request,
+    page: PageParams = Depends(page_params),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
 ):
     """Display list of tours for updating"""
-    result = await get_tours_detailed(session)
+    result = await get_tours_page(page, session)
     return templates.TemplateResponse(
-        "update_tours.html", {"request": request, "tours": result}
+        "update_tours.html",
+        {
+            "request": request,
+            "tours": result.items,
+            "next_cursor": result.next_cursor,
+            "prev_cursor": result.prev_cursor,
+            "limit": result.limit,
+        },
     )
 
 
+@router.get("/transports/", response_model=SPage[STransport])
+async def read_transports(
+    page: PageParams = Depends(page_params),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
+):
+    """List transportations one page at a time"""
+    return await get_transports_page(page, session)
+
+
+@router.post("/transport/import", response_model=SImportReport)
+async def import_transports_csv(
+    file: UploadFile,
+    session: AsyncSession = Depends(db_helper.session_dependency),
+):
+    """Bulk insert/update transportations from a CSV file; returns a per-row error report"""
+    return await import_transports(file, session)
+
+
+@router.get("/transfers/", response_model=SPage[STransfer])
+async def read_transfers(
+    page: PageParams = Depends(page_params),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
+):
+    """List transfers one page at a time"""
+    return await get_transfers_page(page, session)
+
+
+@router.get("/export")
+async def export_tours(format: ExportFormat = "csv"):
+    """Stream the whole tour catalog with costs as CSV or NDJSON"""
+    columns = [TourCatalog.__table__.c[name] for name in CATALOG_COLUMNS]
+    stmt = select(*columns).order_by(TourCatalog.id)
+    return export_response(stmt, "tours", format)
+
+
 @router.get("/{tour_id}")
 async def tour_page(
     request: Request,
     tour_id: int,
-    session: AsyncSession = Depends(db_helper.session_dependency),
 ):
     """Display tour details and update form"""
-    tour = await get_tour_by_id(tour_id, session)
+    data = await load_page_data(
+        tour=(get_tour_by_id, tour_id),
+        hotels=(get_hotels,),
+        transfers=(get_transfers,),
+        transportations=(get_transports,),
+    )
 
-    if not tour:
+    if not data["tour"]:
         return templates.TemplateResponse(
             "tour.html", {"request": request, "tour": None}
         )
 
-    hotels_list = await get_hotels(session)
-    transfers_list = await get_transfers(session)
-    transportations_list = await get_transports(session)
-
-
     return templates.TemplateResponse(
         "tour.html",
         {
             "request": request,
-            "tour": tour,
-            "hotels": hotels_list,
-            "transfers": transfers_list,
-            "transportations": transportations_list,
+            "tour": data["tour"],
+            "hotels": data["hotels"],
+            "transfers": data["transfers"],
+            "transportations": data["transportations"],
         },
     )
 
@@ -296,24 +359,28 @@ async def delete_tour_handler(
             return RedirectResponse(url="/update-tours/", status_code=303)
         else:
             # Tour not found
-            result = await get_tours_detailed(session)
+            result = await get_tours_page(PageParams(), session)
             return templates.TemplateResponse(
                 "update_tours.html",
                 {
                     "request": request,
-                    "tours": result,
+                    "tours": result.items,
+                    "next_cursor": result.next_cursor,
+                    "limit": result.limit,
                     "error": "Tour not found",
                     "error_show": True,
                 },
             )
     except Exception as e:
         # Error during deletion
-        result = await get_tours_detailed(session)
+        result = await get_tours_page(PageParams(), session)
         return templates.TemplateResponse(
             "update_tours.html",
             {
                 "request": request,
-                "tours": result,
+                "tours": result.items,
+                "next_cursor": result.next_cursor,
+                "limit": result.limit,
                 "error": f"Error deleting tour: {str(e)}",
                 "error_show": True,
             },
@@ -0,0 +1,100 @@
+"""Schema objects built from our own rows without running validation.
+
+The database already enforces each column's type, so calling
+`SHotels.model_validate(row)` on every row that comes back only re-checks
+what the driver returns; for customers the EmailStr check alone costs
+~60µs a row. That holds only while every field typed by a schema accepts
+whatever its column can hold: rows also arrive through CSV imports, the
+seeder and manual SQL, so a nullable column must map to an Optional field
+(tests/test_trusted.py checks the schemas below). The builders here fill
+the model's `__dict__` directly, like `model_construct` without its
+per-field default handling. Never use them on request input.
+"""
+
+from operator import attrgetter
+from typing import Any, Callable, Generic, Iterable, TypeVar
+
+from pydantic import BaseModel
+
+from schemas import SCustomerPublic, SCustomers, SHotels, SManagers, STransfer, STransport
+
+M = TypeVar("M", bound=BaseModel)
+
+_setattr = object.__setattr__
+# BaseModel's slots, set through their descriptors: cheaper than object.__setattr__
+_set_fields_set = BaseModel.__dict__["__pydantic_fields_set__"].__set__
+_set_extra = BaseModel.__dict__["__pydantic_extra__"].__set__
+_set_private = BaseModel.__dict__["__pydantic_private__"].__set__
+
+
+def construct(model: type[M], values: dict[str, Any]) -> M:
+    """`model` instance holding `values` as they are.
+
+    `values` must have every field of `model`, in declaration order (the
+    order they are serialized in), each already of the field's type.
+    """
+    obj = model.__new__(model)
+    _setattr(obj, "__dict__", values)
+    _set_fields_set(obj, set(values))
+    _set_extra(obj, None)
+    _set_private(obj, None)
+    return obj
+
+
+class TrustedSchema(Generic[M]):
+    """Builds `model` from ORM objects read by attribute name, or from result
+    tuples of `select(*schema.columns(Entity))` read by position.
+
+    `sources` replace the attribute read for individual fields, e.g. to
+    build a nested schema or compute a value the object does not have;
+    schemas with sources only build from ORM objects.
+    """
+
+    def __init__(self, model: type[M], **sources: Callable[[Any], Any]):
+        self.model = model
+        self.fields = tuple(model.model_fields)
+        unknown = set(sources) - set(self.fields)
+        if unknown:
+            raise ValueError(f"{model.__name__} has no field(s) {sorted(unknown)}")
+        self.sources = sources
+        self._getters = tuple(
+            (name, sources.get(name) or attrgetter(name)) for name in self.fields
+        )
+
+    def columns(self, entity) -> list:
+        """`entity`'s columns in field order, for SELECTs read by `from_row`"""
+        if self.sources:
+            raise TypeError(f"{self.model.__name__} has computed fields; select the entity")
+        return [getattr(entity, name) for name in self.fields]
+
+    def __call__(self, obj) -> M:
+        return construct(self.model, {name: get(obj) for name, get in self._getters})
+
+    def from_row(self, row) -> M:
+        # Row attribute access goes through Python code, tuple iteration does not
+        return construct(self.model, dict(zip(self.fields, row)))
+
+    def many(self, objs: Iterable) -> list[M]:
+        return [self(obj) for obj in objs]
+
+    def from_rows(self, rows: Iterable) -> list[M]:
+        model, fields = self.model, self.fields
+        return [construct(model, dict(zip(fields, row))) for row in rows]
+
+    def optional(self, attribute: str) -> Callable[[Any], M | None]:
+        """Source for a nested field built from `obj.<attribute>`, None when unset"""
+        get = attrgetter(attribute)
+
+        def nested(obj):
+            value = get(obj)
+            return None if value is None else self(value)
+
+        return nested
+
+
+hotel_schema = TrustedSchema(SHotels)
+transfer_schema = TrustedSchema(STransfer)
+transport_schema = TrustedSchema(STransport)
+customer_schema = TrustedSchema(SCustomers)
+customer_public_schema = TrustedSchema(SCustomerPublic)
+manager_schema = TrustedSchema(SManagers)